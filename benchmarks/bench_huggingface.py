@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+HuggingFaceProvider on CPU: one pipeline call per field per record (the old
+loop) vs. batched + deduplicated prompts. Uses a tiny randomly initialised
+GPT-2 and a BPE tokenizer trained on the spot, so nothing is downloaded.
+
+    python benchmarks/bench_huggingface.py --records 200 --batch-size 16 [--int8] [--threads 4] [--inference-mode]
+
+Needs transformers, torch and tokenizers.
+"""
+
+import argparse, json, os, sys, tempfile, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def build_tiny_model(path: str) -> None:
+    from tokenizers import Tokenizer, models, pre_tokenizers, trainers, decoders
+    from transformers import GPT2Config, GPT2LMHeadModel, PreTrainedTokenizerFast
+
+    tok = Tokenizer(models.BPE())
+    tok.pre_tokenizer = pre_tokenizers.ByteLevel(add_prefix_space=False)
+    tok.decoder = decoders.ByteLevel()
+    corpus = ["Name of the entity", "Numeric value associated with the entity",
+              "List of tags associated with the entity", "A test RFD for mock data"] * 50
+    tok.train_from_iterator(corpus, trainers.BpeTrainer(vocab_size=512, special_tokens=["<|endoftext|>"]))
+    fast = PreTrainedTokenizerFast(tokenizer_object=tok, eos_token="<|endoftext|>", bos_token="<|endoftext|>")
+    fast.save_pretrained(path)
+
+    cfg = GPT2Config(vocab_size=fast.vocab_size, n_positions=128, n_embd=64, n_layer=2, n_head=2,
+                     bos_token_id=fast.eos_token_id, eos_token_id=fast.eos_token_id)
+    GPT2LMHeadModel(cfg).save_pretrained(path)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--records", type=int, default=200)
+    ap.add_argument("--batch-size", type=int, default=16)
+    ap.add_argument("--rfd", default="sample_rfd.json")
+    ap.add_argument("--int8", action="store_true", help="dynamic int8 quantization")
+    ap.add_argument("--threads", type=int, default=0, help="torch.set_num_threads")
+    ap.add_argument("--inference-mode", action="store_true")
+    args = ap.parse_args()
+
+    with open(args.rfd) as fh:
+        rfd = {**json.load(fh), "num_records": args.records}
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        build_tiny_model(model_dir)
+        os.environ.update(
+            HUGGINGFACE_MODEL=model_dir, HF_BATCH_SIZE=str(args.batch_size), HF_MAX_LENGTH="32",
+            HF_CACHE="0",                              # measure generation, not the prompt cache
+            HF_QUANTIZE="int8" if args.int8 else "", HF_NUM_THREADS=str(args.threads),
+            HF_INFERENCE_MODE="1" if args.inference_mode else "0",
+        )
+
+        from datasolver.providers.huggingface import HuggingFaceProvider, get_pipeline
+        pipe = get_pipeline(model_dir, quantize=args.int8)
+        props = rfd["schema"]["properties"]
+        prompts = [s.get("description", f"Generate {f}") for f, s in props.items() if s.get("type") == "string"]
+
+        t = time.perf_counter()
+        for _ in range(args.records):                 # the old provider loop
+            for prompt in prompts:
+                pipe(prompt, max_length=32, num_return_sequences=1)
+        old = time.perf_counter() - t
+
+        provider = HuggingFaceProvider()
+        t = time.perf_counter()
+        provider.generate_dataset(rfd)
+        new = time.perf_counter() - t
+
+    print(f"{args.records} records × {len(prompts)} text fields")
+    print(f"per-call loop     {old:8.2f}s  {args.records / old:8.1f} records/sec")
+    print(f"batched + dedupe  {new:8.2f}s  {args.records / new:8.1f} records/sec  ({old / new:.1f}x)")
+    print(f"pipeline throughput {provider.tokens_per_sec():.1f} tokens/sec")
+
+
+if __name__ == "__main__":
+    main()
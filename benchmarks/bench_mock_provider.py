@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+MockProvider throughput (records/sec) on sample_rfd.json scaled up.
+
+    python benchmarks/bench_mock_provider.py --records 1000000
+"""
+
+import argparse, json, os, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datasolver.providers.mock import MockProvider
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--records", type=int, default=1_000_000)
+    ap.add_argument("--rfd", default="sample_rfd.json")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--workers", type=int, default=1, help="processes for sharded generation")
+    args = ap.parse_args()
+
+    with open(args.rfd) as fh:
+        rfd = {**json.load(fh), "num_records": args.records, "seed": args.seed}
+
+    provider = MockProvider(workers=args.workers)
+    n, t = 0, time.perf_counter()
+    for item in provider.iter_records(rfd):
+        n += len(item) if isinstance(item, list) else 1
+    secs = time.perf_counter() - t
+    print(f"{args.workers} worker(s): {n:,} records in {secs:.2f}s  →  {n / secs:,.0f} records/sec")
+
+
+if __name__ == "__main__":
+    main()
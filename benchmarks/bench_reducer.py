@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Reducer throughput: the old per-key rescan vs. the exact and streaming engines.
+
+    python benchmarks/bench_reducer.py --records 1000000
+"""
+
+import argparse, os, random, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datasolver.aggregate import aggregate, aggregate_stream
+
+
+def rescan_mean(records):
+    """ReduceAvgTool before the aggregate engine: one full rescan per key."""
+    keys = set().union(*records)
+    out = {}
+    for k in keys:
+        nums = [row[k] for row in records if isinstance(row.get(k), (int, float))]
+        if nums:
+            out[k] = sum(nums) / len(nums)
+    return [out]
+
+
+def timed(label, fn, n):
+    t = time.perf_counter()
+    fn()
+    secs = time.perf_counter() - t
+    print(f"{label:<40} {secs:6.2f}s  →  {n / secs:,.0f} records/sec")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--records", type=int, default=1_000_000)
+    ap.add_argument("--fields", type=int, default=5)
+    ap.add_argument("--groups", type=int, default=100)
+    args = ap.parse_args()
+
+    rng = random.Random(0)
+    records = [
+        {"g": i % args.groups, "name": "x", **{f"f{j}": rng.random() for j in range(args.fields)}}
+        for i in range(args.records)
+    ]
+    n = len(records)
+    timed("rescan mean (old ReduceAvgTool)", lambda: rescan_mean(records), n)
+    timed("aggregate mean", lambda: aggregate(records, ["mean"]), n)
+    timed("aggregate mean/sum/min/max/stddev/p95", lambda: aggregate(records, ["mean", "sum", "min", "max", "stddev", "p95"]), n)
+    timed(f"  … grouped by {args.groups} groups", lambda: aggregate(records, ["mean", "sum", "min", "max", "stddev", "p95"], group_by=["g"]), n)
+    timed("streaming mean/sum/min/max/stddev/p95", lambda: aggregate_stream(records, ["mean", "sum", "min", "max", "stddev", "p95"]), n)
+    timed(f"  … grouped by {args.groups} groups", lambda: aggregate_stream(records, ["mean", "sum", "min", "max", "stddev", "p95"], group_by=["g"]), n)
+
+
+if __name__ == "__main__":
+    main()
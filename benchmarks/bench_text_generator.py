@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+TextGeneratorTool throughput (records/sec) on a people/reviews schema.
+
+    python benchmarks/bench_text_generator.py --records 1000000
+"""
+
+import argparse, os, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datasolver.providers.mcp.tools.text_generator import TextGeneratorTool
+
+SCHEMA = {
+    "properties": {
+        "name":    {"type": "string"},
+        "email":   {"type": "string", "format": "email"},
+        "city":    {"type": "string"},
+        "sku":     {"type": "string", "template": "{choice:AX|BX|CX}-{digits:6}"},
+        "title":   {"type": "string", "description": "short product title"},
+        "review":  {"type": "string", "description": "customer review text"},
+    }
+}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--records", type=int, default=1_000_000)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--workers", type=int, default=1, help="processes for sharded generation")
+    ap.add_argument("--no-review", action="store_true", help="drop the Markov text field")
+    args = ap.parse_args()
+
+    schema = {"properties": dict(SCHEMA["properties"])}
+    if args.no_review:
+        schema["properties"].pop("review")
+    rfd = {"schema": schema, "num_records": args.records, "seed": args.seed}
+
+    tool = TextGeneratorTool()
+    n, t = 0, time.perf_counter()
+    for item in tool.iter_records(rfd, workers=args.workers):
+        n += len(item) if isinstance(item, list) else 1
+    secs = time.perf_counter() - t
+    print(f"{args.workers} worker(s): {n:,} records in {secs:.2f}s  →  {n / secs:,.0f} records/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Write speed / file size of the dataset output formats vs. the historical
+json.dump(indent=2). Records come from MockProvider on sample_rfd.json.
+
+    python benchmarks/bench_writers.py --records 200000
+"""
+
+import argparse, json, os, sys, tempfile, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datasolver.providers.mock import MockProvider
+from datasolver.writers import FORMATS, open_writer
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--records", type=int, default=100_000)
+    ap.add_argument("--rfd", default="sample_rfd.json")
+    args = ap.parse_args()
+
+    with open(args.rfd) as fh:
+        rfd = {**json.load(fh), "num_records": args.records}
+    dataset = MockProvider().generate_dataset(rfd)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        t = time.perf_counter()
+        base = os.path.join(tmp, "baseline.json")
+        with open(base, "w") as f:
+            json.dump(dataset, f, indent=2)
+        base_secs, base_size = time.perf_counter() - t, os.path.getsize(base)
+
+        print(f"{args.records:,} records")
+        print(f"{'format':<22}{'secs':>8}{'MB':>10}{'size':>8}{'speed':>8}")
+        print(f"{'json.dump(indent=2)':<22}{base_secs:>8.2f}{base_size / 1e6:>10.1f}{'1.00x':>8}{'1.00x':>8}")
+        for fmt, cls in FORMATS.items():
+            if not cls.available():
+                print(f"{fmt:<22}{'(not installed)':>34}")
+                continue
+            t = time.perf_counter()
+            with open_writer(fmt, os.path.join(tmp, fmt.replace(".", "_"))) as writer:
+                writer.write(dataset["data"])
+            secs, size = time.perf_counter() - t, os.path.getsize(writer.path)
+            print(f"{fmt:<22}{secs:>8.2f}{size / 1e6:>10.1f}"
+                  f"{size / base_size:>7.2f}x{base_secs / secs:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
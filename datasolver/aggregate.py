@@ -0,0 +1,397 @@
+"""Columnar aggregation over record streams.
+
+Two engines share the aggregate names and output layout:
+
+ColumnBuilder (exact) reads records column by column into NumPy arrays (with
+the group code of every value) and reduces each column with vectorised NumPy
+calls. It keeps every value until reduce().
+
+StreamingAggregator (online) folds each batch into per-group, per-field
+sketches (datasolver.sketches) and drops the rows. Its state is mergeable,
+so partial aggregates built in parallel combine without the raw data.
+
+    mean  sum  min  max  count  stddev (population)   exact in both engines
+    median, pNN (e.g. p95, p99.9)                       exact / t-digest
+    distinct                                           streaming only, HyperLogLog
+
+Group-by keys are taken verbatim from the records; rows missing a key fall in
+the None group. Groups come out in first-seen order.
+"""
+
+import numbers
+import re
+from itertools import chain
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .sketches import HyperLogLog, Moments, TDigest, hash64
+
+BASIC_AGGREGATES = ("mean", "sum", "min", "max", "count", "stddev")
+STREAMING_ONLY = ("distinct",)
+_PERCENTILE = re.compile(r"^p(\d{1,2}(?:\.\d+)?|100)$")
+
+DEFAULT_KEY_FORMAT = "{field}_{agg}"
+
+
+def parse_aggregate(agg: str) -> Tuple[str, Optional[float]]:
+    """("percentile", q) for median/pNN, (agg, None) for the others."""
+    agg = agg.lower()
+    if agg == "median":
+        return "percentile", 50.0
+    match = _PERCENTILE.match(agg)
+    if match:
+        return "percentile", float(match.group(1))
+    if agg not in BASIC_AGGREGATES + STREAMING_ONLY:
+        raise ValueError(
+            f"Unknown aggregate: {agg} (choose from {', '.join(BASIC_AGGREGATES + STREAMING_ONLY)}, median, pNN)"
+        )
+    return agg, None
+
+
+def _numeric_column(values: List[Any]) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+    """(array, mask of the rows kept) for the numeric entries of `values`; mask None = all kept.
+
+    Numeric means numbers.Real, so NumPy scalars count; plain int/float columns
+    take a fast path on their exact types.
+    """
+    types = set(map(type, values))
+    if types <= {int, bool}:
+        try:
+            return np.array(values, dtype=np.int64), None
+        except OverflowError:
+            return np.array(values, dtype=np.float64), None
+    if types <= {int, float, bool}:
+        return np.array(values, dtype=np.float64), None
+    mask = np.fromiter((isinstance(v, numbers.Real) for v in values), dtype=bool, count=len(values))
+    if not mask.any():
+        return None, None
+    if mask.all():
+        return np.array(values, dtype=np.float64), None
+    return np.array([v for v, keep in zip(values, mask) if keep], dtype=np.float64), mask
+
+
+def _batch_fields(batch: List[Dict[str, Any]], fields: Optional[Sequence[str]],
+                  group_by: Sequence[str]) -> Sequence[str]:
+    if fields is not None:
+        return fields
+    return [f for f in dict.fromkeys(chain.from_iterable(batch)) if f not in group_by]
+
+
+def iter_batches(records: Iterable[Any], batch_size: int = 10_000) -> Iterator[List[Dict[str, Any]]]:
+    """Lists of up to batch_size records; list items in `records` pass through as batches."""
+    batch: List[Dict[str, Any]] = []
+    for record in records:
+        if isinstance(record, list):
+            if batch:
+                yield batch
+                batch = []
+            if record:
+                yield record
+            continue
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class ColumnBuilder:
+    """Collects numeric columns (and their group codes) from records.
+
+    Feed it batches with add() as often as needed, then call reduce(). Each
+    batch is read column by column: one list comprehension per field, then
+    NumPy, so the per-record work stays in C.
+    """
+
+    def __init__(self, group_by: Sequence[str] = (), fields: Optional[Sequence[str]] = None):
+        self.group_by = tuple(group_by)
+        self.fields = tuple(fields) if fields is not None else None
+        self.groups: Dict[Tuple[Any, ...], int] = {}
+        self._values: Dict[str, List[np.ndarray]] = {}
+        self._codes: Dict[str, List[np.ndarray]] = {}
+        self.rows = 0
+
+    def add(self, records: Iterable[Dict[str, Any]]) -> None:
+        batch = records if isinstance(records, list) else list(records)
+        if not batch:
+            return
+        self.rows += len(batch)
+        codes = self._group_codes(batch)
+
+        for field in _batch_fields(batch, self.fields, self.group_by):
+            values, mask = _numeric_column([r.get(field) for r in batch])
+            if values is None:
+                continue
+            self._values.setdefault(field, []).append(values)
+            self._codes.setdefault(field, []).append(codes if mask is None else codes[mask])
+
+    def _group_codes(self, batch: List[Dict[str, Any]]) -> np.ndarray:
+        groups = self.groups
+        if not self.group_by:
+            groups.setdefault((), 0)
+            return np.zeros(len(batch), dtype=np.int64)
+        keys = list(zip(*[[r.get(g) for r in batch] for g in self.group_by]))
+        for key in dict.fromkeys(keys):
+            if key not in groups:
+                groups[key] = len(groups)
+        return np.fromiter(map(groups.__getitem__, keys), dtype=np.int64, count=len(keys))
+
+    def columns(self) -> Iterable[Tuple[str, np.ndarray, np.ndarray]]:
+        for field, chunks in self._values.items():
+            yield field, np.concatenate(chunks), np.concatenate(self._codes[field])
+
+    def reduce(self, aggregates: Sequence[str] = ("mean",), key_format: str = DEFAULT_KEY_FORMAT) -> List[Dict[str, Any]]:
+        """One output record per group: group-by keys plus key_format(field, agg) values."""
+        parsed = [(agg, *parse_aggregate(agg)) for agg in aggregates]
+        if any(kind in STREAMING_ONLY for _, kind, _ in parsed):
+            raise ValueError(f"{', '.join(STREAMING_ONLY)} needs StreamingAggregator")
+        out: List[Dict[str, Any]] = [dict(zip(self.group_by, key)) for key in self.groups]
+        for field, values, codes in self.columns():
+            stats = reduce_column(values, codes, len(self.groups), [(kind, q) for _, kind, q in parsed])
+            for (agg, _, _), per_group in zip(parsed, stats):
+                name = key_format.format(field=field, agg=agg)
+                for code, value in per_group:
+                    out[code][name] = value
+        return out
+
+
+def reduce_column(values: np.ndarray, codes: np.ndarray, n_groups: int,
+                  aggregates: Sequence[Tuple[str, Optional[float]]]) -> List[List[Tuple[int, Any]]]:
+    """Reduce one column per group.
+
+    Args:
+        values: Numeric values
+        codes: Group code of each value
+        n_groups: Number of groups
+        aggregates: Parsed aggregates, as returned by parse_aggregate
+
+    Returns:
+        For each aggregate, (group code, value) for every group that has values
+    """
+    if n_groups > 1:
+        order = np.argsort(codes, kind="stable")
+        values, codes = values[order], codes[order]
+    present = np.flatnonzero(np.bincount(codes, minlength=n_groups))
+    starts = np.searchsorted(codes, present)
+    counts = np.diff(np.append(starts, len(values)))
+
+    cache: Dict[str, np.ndarray] = {}
+
+    def total() -> np.ndarray:
+        if "sum" not in cache:
+            cache["sum"] = np.add.reduceat(values, starts)
+        return cache["sum"]
+
+    def mean() -> np.ndarray:
+        if "mean" not in cache:
+            cache["mean"] = total() / counts
+        return cache["mean"]
+
+    qs = [q for kind, q in aggregates if kind == "percentile"]
+    if qs:                                             # all percentiles of a group from one sort
+        percentiles = np.array([np.percentile(values[s:s + n], qs) for s, n in zip(starts, counts)]).T
+
+    results = []
+    for kind, q in aggregates:
+        if kind == "sum":
+            col = total()
+        elif kind == "mean":
+            col = mean()
+        elif kind == "min":
+            col = np.minimum.reduceat(values, starts)
+        elif kind == "max":
+            col = np.maximum.reduceat(values, starts)
+        elif kind == "count":
+            col = counts
+        elif kind == "stddev":
+            deviations = values - np.repeat(mean(), counts)
+            col = np.sqrt(np.add.reduceat(deviations * deviations, starts) / counts)
+        else:
+            col = percentiles[qs.index(q)]
+        results.append(list(zip(present.tolist(), col.tolist())))
+    return results
+
+
+def aggregate(records: Iterable[Dict[str, Any]], aggregates: Sequence[str] = ("mean",),
+              group_by: Sequence[str] = (), fields: Optional[Sequence[str]] = None,
+              key_format: str = DEFAULT_KEY_FORMAT) -> List[Dict[str, Any]]:
+    """Aggregate the numeric fields of `records`.
+
+    Args:
+        records: Records (dicts); non-numeric values are ignored
+        aggregates: Aggregates to compute for every field
+        group_by: Fields whose values define the groups
+        fields: Fields to aggregate (default: every numeric field seen)
+        key_format: Output key for each (field, agg)
+
+    Returns:
+        One record per group ([{}] when there are no records and no groups)
+    """
+    builder = ColumnBuilder(group_by, fields)
+    builder.add(records)
+    return builder.reduce(aggregates, key_format) or ([{}] if not group_by else [])
+
+
+class _FieldState:
+    __slots__ = ("moments", "digest", "hll")
+
+    def __init__(self, moments: Optional[Moments], digest: Optional[TDigest], hll: Optional[HyperLogLog]):
+        self.moments, self.digest, self.hll = moments, digest, hll
+
+    def merge(self, other: "_FieldState") -> None:
+        for name in self.__slots__:
+            mine = getattr(self, name)
+            if mine is not None:
+                mine.merge(getattr(other, name))
+
+
+class StreamingAggregator:
+    """Online, mergeable version of ColumnBuilder.
+
+    add() folds record batches into per-group sketches and keeps no rows;
+    merge() combines aggregators built over disjoint parts of the data (in
+    any order); result() produces the same layout as aggregate().
+    """
+
+    def __init__(self, aggregates: Sequence[str] = ("mean",), group_by: Sequence[str] = (),
+                 fields: Optional[Sequence[str]] = None, compression: float = 400, hll_precision: int = 14):
+        self.aggregates = tuple(aggregates)
+        self._parsed = [(agg, *parse_aggregate(agg)) for agg in self.aggregates]
+        kinds = {kind for _, kind, _ in self._parsed}
+        self._numeric = bool(kinds - set(STREAMING_ONLY))
+        self._quantiles = "percentile" in kinds
+        self._distinct = "distinct" in kinds
+        self.group_by = tuple(group_by)
+        self.fields = tuple(fields) if fields is not None else None
+        self.compression = compression
+        self.hll_precision = hll_precision
+        self.groups: Dict[Tuple[Any, ...], Dict[str, _FieldState]] = {}
+        self.rows = 0
+
+    def _new_state(self) -> _FieldState:
+        return _FieldState(
+            Moments() if self._numeric else None,
+            TDigest(self.compression) if self._quantiles else None,
+            HyperLogLog(self.hll_precision) if self._distinct else None,
+        )
+
+    def update(self, records: Iterable[Any], batch_size: int = 10_000) -> "StreamingAggregator":
+        """Consume a record stream (records or lists of records) batch by batch."""
+        for batch in iter_batches(records, batch_size):
+            self.add(batch)
+        return self
+
+    def add(self, records: Iterable[Dict[str, Any]]) -> None:
+        batch = records if isinstance(records, list) else list(records)
+        if not batch:
+            return
+        self.rows += len(batch)
+        if self.group_by:
+            keys = list(zip(*[[r.get(g) for r in batch] for g in self.group_by]))
+            local = {key: i for i, key in enumerate(dict.fromkeys(keys))}
+            codes = np.fromiter(map(local.__getitem__, keys), dtype=np.int64, count=len(keys))
+            group_keys = list(local)
+        else:
+            codes, group_keys = np.zeros(len(batch), dtype=np.int64), [()]
+        states = [self.groups.setdefault(key, {}) for key in group_keys]
+
+        for field in _batch_fields(batch, self.fields, self.group_by):
+            column = [r.get(field) for r in batch]
+            if self._numeric:
+                values, mask = _numeric_column(column)
+                if values is not None:
+                    for state, segment in self._segments(states, field, values, codes if mask is None else codes[mask]):
+                        state.moments.update(segment)
+                        if state.digest is not None:
+                            state.digest.update(segment)
+            if self._distinct:
+                present = np.fromiter((v is not None for v in column), dtype=bool, count=len(column))
+                if present.any():
+                    hashes = hash64(v for v in column if v is not None)
+                    for state, segment in self._segments(states, field, hashes, codes[present]):
+                        state.hll.update_hashes(segment)
+
+    def _segments(self, states: List[Dict[str, _FieldState]], field: str,
+                  values: np.ndarray, codes: np.ndarray) -> Iterator[Tuple[_FieldState, np.ndarray]]:
+        if len(states) == 1:
+            segments = [(0, values)]
+        else:
+            order = np.argsort(codes, kind="stable")
+            values, codes = values[order], codes[order]
+            present = np.flatnonzero(np.bincount(codes, minlength=len(states)))
+            segments = zip(present.tolist(), np.split(values, np.searchsorted(codes, present)[1:]))
+        for code, segment in segments:
+            group = states[code]
+            state = group.get(field)
+            if state is None:
+                state = group[field] = self._new_state()
+            yield state, segment
+
+    def merge(self, other: "StreamingAggregator") -> "StreamingAggregator":
+        """Fold another aggregator (same aggregates and group_by) into this one."""
+        if (other.aggregates, other.group_by) != (self.aggregates, self.group_by):
+            raise ValueError("cannot merge aggregators with different aggregates or group_by")
+        for key, fields in other.groups.items():
+            mine = self.groups.setdefault(key, {})
+            for field, state in fields.items():
+                if field in mine:
+                    mine[field].merge(state)
+                else:
+                    mine[field] = state
+        self.rows += other.rows
+        return self
+
+    def result(self, key_format: str = DEFAULT_KEY_FORMAT) -> List[Dict[str, Any]]:
+        """One output record per group: group-by keys plus key_format(field, agg) values."""
+        out = []
+        for key, fields in self.groups.items():
+            row: Dict[str, Any] = dict(zip(self.group_by, key))
+            for field, state in fields.items():
+                for agg, kind, q in self._parsed:
+                    value = self._value(state, kind, q)
+                    if value is not None:
+                        row[key_format.format(field=field, agg=agg)] = value
+            out.append(row)
+        return out or ([{}] if not self.group_by else [])
+
+    @staticmethod
+    def _value(state: _FieldState, kind: str, q: Optional[float]) -> Any:
+        if kind == "distinct":
+            return state.hll.estimate()
+        m = state.moments
+        if not m.count:                                    # field had no numeric values
+            return None
+        if kind == "mean":
+            return m.mean
+        if kind == "sum":
+            return m.total
+        if kind == "min":
+            return m.min
+        if kind == "max":
+            return m.max
+        if kind == "count":
+            return m.count
+        if kind == "stddev":
+            return float(np.sqrt(m.variance))
+        return state.digest.quantile(q / 100)
+
+
+def aggregate_stream(records: Iterable[Any], aggregates: Sequence[str] = ("mean",),
+                     group_by: Sequence[str] = (), fields: Optional[Sequence[str]] = None,
+                     key_format: str = DEFAULT_KEY_FORMAT, batch_size: int = 10_000) -> List[Dict[str, Any]]:
+    """Streaming counterpart of aggregate(): constant memory in the number of records.
+
+    Args:
+        records: Records, or lists of records, from any iterable
+        aggregates: Aggregates to compute for every field
+        group_by: Fields whose values define the groups
+        fields: Fields to aggregate (default: every field seen)
+        key_format: Output key for each (field, agg)
+        batch_size: Records folded into the sketches at a time
+
+    Returns:
+        One record per group ([{}] when there are no records and no groups)
+    """
+    return StreamingAggregator(aggregates, group_by, fields).update(records, batch_size).result(key_format)
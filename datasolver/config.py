@@ -14,6 +14,7 @@ class DatasetConfig:
     """Dataset generation configuration"""
     provider_type: ProviderType
     output_dir: str = "data"
+    output_format: str = "json"      # see datasolver.writers.FORMATS
     
     def __post_init__(self):
         """Ensure output directory exists"""
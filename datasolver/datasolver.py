@@ -13,6 +13,7 @@ from .providers.mcp.tools.tool import MCPTool
 from .providers.huggingface import HuggingFaceProvider
 from .providers.mcp.client import MCPClient
 from .providers.mock import MockProvider
+from .writers import open_writer, resolve_format
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger('DataSolver')
@@ -69,15 +70,20 @@ class DataSolver:
             logger.warning(f"Invalid provider type {provider_type_str} (error: {e}). Defaulting to HUGGINGFACE.")
             provider_type = ProviderType.HUGGINGFACE
         mcp_tools = config.get("mcp_tools", [])
-        return cls(provider_type=provider_type, mcp_tools=mcp_tools)
+        # $DATASET_FORMAT is applied per RFD by resolve_format, ahead of this default
+        return cls(provider_type=provider_type, mcp_tools=mcp_tools, output_format=config.get("output_format"))
 
-    def __init__(self, provider_type: ProviderType = ProviderType.HUGGINGFACE, mcp_tools: Optional[List[Type]] = None):
+    def __init__(self, provider_type: ProviderType = ProviderType.HUGGINGFACE, mcp_tools: Optional[List[Type]] = None,
+                 output_format: Optional[str] = None):
         """Initialize solver with provider type
         
         Args:
             provider_type: Type of provider to use
             mcp_tools: List of MCP tool classes to use (only for MCP provider)
+            output_format: Default dataset format (see datasolver.writers); an RFD's
+                "output_format" and then $DATASET_FORMAT override it. Falls back to json.
         """
+        self.output_format = output_format
         if provider_type == ProviderType.MOCK:
             self.provider = MockProvider()
         elif provider_type == ProviderType.HUGGINGFACE:
@@ -99,20 +105,21 @@ class DataSolver:
         Returns:
             Path to generated dataset file
         """
+        writer = None
         try:
-            dataset = self.provider.generate_dataset(rfd)
-            if not dataset:
-                return None
-                
-            file_path = f"data/rfd_{rfd.get('rfd_id', 'unknown')}_solution.json"
+            fmt = resolve_format(rfd, self.output_format)
             os.makedirs("data", exist_ok=True)
             
-            with open(file_path, 'w') as f:
-                json.dump(dataset, f, indent=2)
+            # Records are written as the provider yields them, so memory stays
+            # bounded by the writer's batch size rather than num_records.
+            with open_writer(fmt, f"data/rfd_{rfd.get('rfd_id', 'unknown')}_solution") as writer:
+                writer.write(self.provider.iter_records(rfd))
             
-            logger.info(f"Dataset generated successfully at: {file_path}")
-            return file_path
+            logger.info(f"Dataset generated successfully at: {writer.path} ({writer.count} records)")
+            return writer.path
             
         except Exception as e:
             logger.error(f"Failed to generate dataset: {e}")
+            if writer is not None and os.path.exists(writer.path):
+                os.remove(writer.path)
             return None 
\ No newline at end of file
@@ -0,0 +1,108 @@
+# datasolver/deadline.py
+"""Per-RFD time budgets.
+
+A deadline is an absolute time.monotonic() value held in a context
+variable, so it follows the RFD through the router, its dependencies and
+asyncio tasks (threads started with contextvars.copy_context(), and
+asyncio.to_thread, inherit it too). Budgets only ever shrink: entering a
+budget inside another keeps the earlier deadline.
+
+Across process boundaries the budget travels in the RFD itself as
+"deadline_s" (seconds left). forward() stamps the remaining budget onto an
+outgoing RFD.
+
+Outbound calls size their timeouts with timeout(default), which caps the
+call's own default by the time that is left and raises DeadlineExceeded
+when nothing is left.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+RFD_KEY = "deadline_s"
+
+# What to do when the budget runs out part-way (RFD key "on_deadline"):
+#   "fail"     raise DeadlineExceeded (default)
+#   "partial"  return what was produced in time, marked "partial": true
+POLICIES = ("fail", "partial")
+
+_DEADLINE: ContextVar[Optional[float]] = ContextVar("rfd_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """The RFD's time budget ran out."""
+
+
+def current() -> Optional[float]:
+    """Absolute deadline (time.monotonic()) of the running RFD, or None."""
+    return _DEADLINE.get()
+
+
+def remaining() -> Optional[float]:
+    """Seconds left for the running RFD (may be negative), or None if unbounded."""
+    deadline = _DEADLINE.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def expired() -> bool:
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def check(what: str = "") -> None:
+    """Raise DeadlineExceeded if the budget is used up."""
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded(f"deadline exceeded{' before ' + what if what else ''} ({-left:.3f}s over)")
+
+
+def timeout(default: float) -> float:
+    """Timeout for an outbound call: its usual `default`, capped by the budget left."""
+    left = remaining()
+    if left is None:
+        return default
+    if left <= 0:
+        raise DeadlineExceeded(f"deadline exceeded ({-left:.3f}s over)")
+    return min(default, left)
+
+
+@contextmanager
+def until(deadline: Optional[float]) -> Iterator[Optional[float]]:
+    """Run the block under an absolute deadline (never later than the current one)."""
+    outer = _DEADLINE.get()
+    if deadline is None or (outer is not None and outer <= deadline):
+        yield outer
+        return
+    token = _DEADLINE.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _DEADLINE.reset(token)
+
+
+def budget(seconds: Optional[float]):
+    """Run the block with at most `seconds` left (None = keep the current deadline)."""
+    return until(None if seconds is None else time.monotonic() + float(seconds))
+
+
+def from_rfd(rfd: Dict[str, Any]) -> Optional[float]:
+    """The RFD's budget in seconds, or None."""
+    value = rfd.get(RFD_KEY)
+    return None if value is None else float(value)
+
+
+def policy(rfd: Dict[str, Any]) -> str:
+    value = rfd.get("on_deadline", "fail")
+    if value not in POLICIES:
+        raise ValueError(f"on_deadline must be one of {POLICIES}, got {value!r}")
+    return value
+
+
+def forward(rfd: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of `rfd` carrying the remaining budget, for sending to another process."""
+    left = remaining()
+    if left is None:
+        return rfd
+    return {**rfd, RFD_KEY: round(max(left, 0.0), 3)}
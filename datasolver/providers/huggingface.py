@@ -1,28 +1,134 @@
 """HuggingFace provider implementation for text generation."""
 
 import os
+import time
 import logging
-from typing import Dict, Any, List
+import threading
+import contextlib
+from collections import Counter, defaultdict
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+import numpy as np
 from .provider import DataProvider
+from ..util.prompt_cache import PromptCache, cache_key
 
 try:
     from transformers import pipeline, AutoModelForCausalLM, AutoTokenizer
 except ImportError:
     logging.warning("HuggingFace transformers not installed. Install with: pip install transformers")
 
+# Pipelines are loaded on first use and shared by every provider in the process
+_PIPELINES: Dict[Tuple[str, Any, bool], Any] = {}
+_PIPELINES_LOCK = threading.Lock()
+
+
+def _build_pipeline(model_name: str, token: Any, quantize: bool = False):
+    """Load model + tokenizer into a CPU text-generation pipeline.
+
+    quantize applies dynamic int8 quantization to nn.Linear layers (models
+    built on other projection types, e.g. GPT-2's Conv1D, are left as is).
+    """
+    model = AutoModelForCausalLM.from_pretrained(
+        model_name,
+        token=token,
+        trust_remote_code=True
+    )
+    if quantize:
+        import torch
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    tokenizer = AutoTokenizer.from_pretrained(
+        model_name,
+        token=token,
+        trust_remote_code=True
+    )
+    # Batched decoder-only generation needs a pad token and left padding
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+    tokenizer.padding_side = "left"
+
+    return pipeline(
+        "text-generation",
+        model=model,
+        tokenizer=tokenizer,
+        device="cpu"  # Use CPU for testing
+    )
+
+
+@contextlib.contextmanager
+def _seeded_rng(seed: int):
+    """Seed torch for the block and restore the previous global RNG state afterwards.
+
+    transformers.set_seed would reseed python, numpy and torch for the whole
+    process; generate() in the pinned transformers takes no torch.Generator.
+    """
+    import torch
+    with torch.random.fork_rng(devices=[]):
+        torch.manual_seed(seed)
+        yield
+
+
+def get_pipeline(model_name: str, token: Any = None, quantize: bool = False):
+    """Process-wide pipeline for `model_name`, loaded once."""
+    key = (model_name, token, quantize)
+    with _PIPELINES_LOCK:
+        if key not in _PIPELINES:
+            _PIPELINES[key] = _build_pipeline(model_name, token, quantize)
+        return _PIPELINES[key]
+
+
 class HuggingFaceProvider(DataProvider):
     """HuggingFace provider for text generation.
     
     This provider uses HuggingFace models to generate text data based on
     the RFD schema and requirements.
+    
+    Prompts are collected across records and fields and sent to the pipeline
+    in batches of HF_BATCH_SIZE. Identical prompts are generated once: with
+    greedy decoding (the default) the completion is reused, with sampling
+    (HF_DO_SAMPLE=1) one call returns as many sequences as there are copies,
+    at most HF_MAX_RETURN_SEQUENCES per call. A seeded sample (HF_SEED) runs
+    on a forked torch RNG, so the process's global random state is untouched;
+    each chunk of HF_CHUNK_RECORDS gets its own seed derived from HF_SEED and
+    the chunk's offset, so chunks don't repeat each other's samples.
+    
+    Completions persist in a prompt cache keyed by (model, prompt, generation
+    params, seed), with the per-chunk seed for sampled output; unseeded
+    sampling is never cached. Opt-in CPU modes:
+    HF_QUANTIZE=int8, HF_NUM_THREADS, HF_INFERENCE_MODE=1.
     """
     
     def __init__(self):
         super().__init__()
         self.token = os.getenv("HUGGINGFACE_TOKEN")
         self.model = os.getenv("HUGGINGFACE_MODEL", "gpt2")
+        self.batch_size = int(os.getenv("HF_BATCH_SIZE", "8"))
+        self.chunk_records = int(os.getenv("HF_CHUNK_RECORDS", "256"))
+        self.max_length = int(os.getenv("HF_MAX_LENGTH", "100"))
+        self.temperature = float(os.getenv("HF_TEMPERATURE", "0.7"))
+        self.do_sample = os.getenv("HF_DO_SAMPLE", "0") == "1"
+        self.max_return_sequences = max(1, int(os.getenv("HF_MAX_RETURN_SEQUENCES", "16")))
+        self.seed = int(os.environ["HF_SEED"]) if os.getenv("HF_SEED") else None
+        self.quantize = os.getenv("HF_QUANTIZE", "").lower() == "int8"
+        self.num_threads = int(os.getenv("HF_NUM_THREADS", "0"))
+        self.inference_mode = os.getenv("HF_INFERENCE_MODE", "0") == "1"
+        self.use_cache = os.getenv("HF_CACHE", "1") == "1"
+        self._cache: Optional[PromptCache] = None
+        self.stats = {"generated_tokens": 0, "generation_secs": 0.0, "cache_hits": 0, "cache_misses": 0}
         self._generator = None
-        self._initialize_generator()
+        self._completions: Dict[str, str] = {}
+    
+    @property
+    def cache(self) -> Optional[PromptCache]:
+        """The persistent prompt cache, opened on first use (None if HF_CACHE=0)."""
+        if self.use_cache and self._cache is None:
+            self._cache = PromptCache(os.getenv("HF_CACHE_PATH"), int(os.getenv("HF_CACHE_MAX_ENTRIES", "100000")))
+        return self._cache
+    
+    @property
+    def generator(self):
+        """The text-generation pipeline, loaded on first use."""
+        if self._generator is None:
+            self._initialize_generator()
+        return self._generator
     
     def _initialize_generator(self):
         """Initialize the text generation pipeline."""
@@ -30,28 +136,13 @@ class HuggingFaceProvider(DataProvider):
             if not self.token:
                 self.logger.warning("HUGGINGFACE_TOKEN not set. Using model without authentication.")
             
-            # Initialize model and tokenizer
-            model = AutoModelForCausalLM.from_pretrained(
-                self.model,
-                token=self.token,
-                trust_remote_code=True
-            )
-            tokenizer = AutoTokenizer.from_pretrained(
-                self.model,
-                token=self.token,
-                trust_remote_code=True
-            )
-            
-            # Create text generation pipeline
-            self._generator = pipeline(
-                "text-generation",
-                model=model,
-                tokenizer=tokenizer,
-                device="cpu"  # Use CPU for testing
-            )
+            if self.num_threads:
+                import torch
+                torch.set_num_threads(self.num_threads)
+            self._generator = get_pipeline(self.model, self.token, self.quantize)
             
             self.logger.info(f"Initialized HuggingFace provider with model: {self.model}")
-            
+        
         except Exception as e:
             self.logger.error(f"Failed to initialize HuggingFace provider: {e}")
             raise
@@ -61,49 +152,172 @@ class HuggingFaceProvider(DataProvider):
         
         Args:
             rfd: Request for data containing schema and requirements
-            
+        
         Returns:
             Generated text dataset
         """
         try:
-            if not self._generator:
-                raise RuntimeError("HuggingFace generator not initialized")
-            
-            schema = rfd.get("schema", {})
-            properties = schema.get("properties", {})
-            num_records = rfd.get("num_records", 3)
+            return {"data": [r for batch in self.iter_records(rfd) for r in batch]}
+        
+        except Exception as e:
+            self.logger.error(f"Failed to generate dataset: {e}")
+            raise
+    
+    def iter_records(self, rfd: Dict) -> Iterator[List[Dict[str, Any]]]:
+        """Yield generated records in chunks of HF_CHUNK_RECORDS.
+        
+        Args:
+            rfd: Request for data containing schema and requirements
+        
+        Yields:
+            Lists of generated text records
+        """
+        schema = rfd.get("schema", {})
+        properties = schema.get("properties", {})
+        num_records = rfd.get("num_records", 3)
+        
+        # Generate text based on field description
+        text_fields = {
+            field: field_schema.get("description", f"Generate {field}")
+            for field, field_schema in properties.items()
+            if field_schema.get("type") == "string"
+        }
+        
+        for start in range(0, num_records, self.chunk_records):
+            count = min(self.chunk_records, num_records - start)
+            prompts = [prompt for _ in range(count) for prompt in text_fields.values()]
+            texts = iter(self._complete(prompts, start))
             
             records = []
-            for _ in range(num_records):
+            for _ in range(count):
                 record = {}
                 for field, field_schema in properties.items():
-                    if field_schema.get("type") == "string":
-                        # Generate text based on field description
-                        prompt = field_schema.get("description", f"Generate {field}")
-                        generated = self._generator(
-                            prompt,
-                            max_length=100,
-                            num_return_sequences=1,
-                            temperature=0.7
-                        )
-                        record[field] = generated[0]["generated_text"].strip()
+                    if field in text_fields:
+                        record[field] = next(texts)
                     else:
                         # For non-string fields, use default values
                         record[field] = self._get_default_value(field_schema)
                 records.append(record)
-            
-            return {"data": records}
-            
-        except Exception as e:
-            self.logger.error(f"Failed to generate dataset: {e}")
-            raise
+            yield records
+        
+        self.logger.info(
+            f"{self.stats['generated_tokens']} tokens generated at {self.tokens_per_sec():.1f} tokens/sec; "
+            f"prompt cache {self.stats['cache_hits']} hits / {self.stats['cache_misses']} misses"
+        )
+    
+    def _complete(self, prompts: List[str], offset: int = 0) -> List[str]:
+        """Completions for `prompts`, in order, with duplicates generated once.
+        
+        Args:
+            prompts: Prompts, typically the same few repeated per record
+            offset: Index of the chunk's first record; seeds sampling for the chunk
+        
+        Returns:
+            One generated text per prompt
+        """
+        if not prompts:
+            return []
+        
+        if not self.do_sample:
+            missing = [p for p in dict.fromkeys(prompts) if p not in self._completions]
+            if missing:
+                texts = self._cached_generate(missing, 1, {"max_length": self.max_length}, self.seed)
+                for prompt in missing:
+                    self._completions[prompt] = texts[prompt][0]
+            return [self._completions[p] for p in prompts]
+        
+        # Sampling: one call per distinct prompt asks for as many sequences as copies
+        by_count: Dict[int, List[str]] = defaultdict(list)
+        for prompt, n in Counter(prompts).items():
+            by_count[n].append(prompt)
+        
+        seed = self._chunk_seed(offset)
+        samples: Dict[str, List[str]] = {}
+        for n, unique in by_count.items():
+            params = {"max_length": self.max_length, "do_sample": True, "temperature": self.temperature}
+            for prompt, texts in self._cached_generate(unique, n, params, seed).items():
+                samples[prompt] = list(texts)
+        return [samples[p].pop() for p in prompts]
+    
+    def _chunk_seed(self, offset: int) -> Optional[int]:
+        """Sampling seed for the chunk starting at record `offset` (None if HF_SEED is unset)."""
+        if self.seed is None:
+            return None
+        return int(np.random.SeedSequence([self.seed, offset]).generate_state(1)[0])
+    
+    def _cached_generate(self, prompts: List[str], n: int, params: Dict[str, Any],
+                         seed: Optional[int] = None) -> Dict[str, List[str]]:
+        """n completions per prompt, from the prompt cache where possible.
+        
+        Args:
+            prompts: Distinct prompts
+            n: Sequences per prompt
+            params: Generation parameters passed to the pipeline
+            seed: Seed for sampling (and part of the cache key)
+        
+        Returns:
+            Prompt → list of n completions
+        """
+        cacheable = self.cache is not None and (not params.get("do_sample") or seed is not None)
+        keys = {p: cache_key(self.model, p, {**params, "n": n}, seed) for p in prompts} if cacheable else {}
+        hits = self.cache.get_many(keys.values()) if cacheable else {}
+        result = {p: hits[keys[p]] for p in prompts if keys.get(p) in hits}
+        missing = [p for p in prompts if p not in result]
+        self.stats["cache_hits"] += len(result)
+        self.stats["cache_misses"] += len(missing)
+        if not missing:
+            return result
+        
+        seeded = params.get("do_sample") and seed is not None
+        t = time.perf_counter()
+        outputs: List[List[Dict[str, Any]]] = [[] for _ in missing]
+        with self._inference_context(), (_seeded_rng(seed) if seeded else contextlib.nullcontext()):
+            # num_return_sequences multiplies the batch in memory, so large n is split across calls
+            for done in range(0, n, self.max_return_sequences):
+                chunk = self.generator(
+                    missing,
+                    batch_size=self.batch_size,
+                    num_return_sequences=min(self.max_return_sequences, n - done),
+                    **params
+                )
+                for out, part in zip(outputs, chunk):
+                    out.extend(part)
+        self.stats["generation_secs"] += time.perf_counter() - t
+        
+        fresh = {}
+        for prompt, out in zip(missing, outputs):
+            fresh[prompt] = [o["generated_text"].strip() for o in out]
+            prompt_tokens = self._count_tokens(prompt)
+            self.stats["generated_tokens"] += sum(
+                max(self._count_tokens(o["generated_text"]) - prompt_tokens, 0) for o in out
+            )
+        if cacheable:
+            self.cache.put_many({keys[p]: texts for p, texts in fresh.items()})
+        return {**result, **fresh}
+    
+    def _inference_context(self):
+        if not self.inference_mode:
+            return contextlib.nullcontext()
+        import torch
+        return torch.inference_mode()
+    
+    def _count_tokens(self, text: str) -> int:
+        tokenizer = getattr(self.generator, "tokenizer", None)
+        if tokenizer is None:
+            return len(text.split())
+        return len(tokenizer(text)["input_ids"])
+    
+    def tokens_per_sec(self) -> float:
+        """Generated tokens per second of pipeline time (cache hits excluded)."""
+        secs = self.stats["generation_secs"]
+        return self.stats["generated_tokens"] / secs if secs else 0.0
     
     def _get_default_value(self, field_schema: Dict[str, Any]) -> Any:
         """Get a default value for a non-string field.
         
         Args:
             field_schema: The schema for the field
-            
+        
         Returns:
             Default value based on field type
         """
@@ -116,4 +330,4 @@ class HuggingFaceProvider(DataProvider):
             return False
         elif field_type == "string" and "date" in field_schema.get("format", ""):
             return "2024-01-01"
-        return None 
\ No newline at end of file
+        return None
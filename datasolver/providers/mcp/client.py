@@ -1,9 +1,9 @@
 import os
 import logging
-from typing import Dict, Any, Optional, List, Type
+from typing import Dict, Any, Iterator, Optional, List, Type
 
 from .provider import MCPProvider
-from .tools.tool import MCPTool
+from .tools.tool import MCPTool, adapt_tool
 
 logger = logging.getLogger('MCPClient')
 
@@ -70,9 +70,13 @@ class MCPClient(MCPProvider):
     def register_tool(self, tool: MCPTool):
         """Register a new MCP tool with both the local registry and the client.
         
+        Tools that predate the execution contract are wrapped in a
+        ToolAdapter.
+        
         Args:
             tool: MCP tool instance to register
         """
+        tool = adapt_tool(tool)
         if not hasattr(self, '_tools'):
              self._tools = {}
 
@@ -107,4 +111,20 @@ class MCPClient(MCPProvider):
     
     def generate_dataset(self, rfd: Dict) -> Dict[str, Any]:
         """Generate dataset using MCP tools"""
-        pass
\ No newline at end of file
+        return {"data": list(self.iter_records(rfd))}
+    
+    def iter_records(self, rfd: Dict) -> Iterator[Dict[str, Any]]:
+        """Stream records from the cheapest registered tool that accepts the RFD
+        
+        Args:
+            rfd: Request for data
+            
+        Yields:
+            Records produced by the tool
+        """
+        candidates = [t for t in self._tools.values() if t.validate_rfd(rfd)]
+        if not candidates:
+            raise RuntimeError(f"No MCP tool can satisfy RFD: {rfd.get('rfd_id', 'unknown')}")
+        tool = min(candidates, key=lambda t: t.cost(rfd) if hasattr(t, "cost") else 1.0)
+        logger.info(f"Streaming records from MCP tool: {tool.name}")
+        yield from tool.iter_records(rfd)
\ No newline at end of file
@@ -0,0 +1,159 @@
+# datasolver/providers/mcp/costmodel.py
+"""Observed-cost model for RFDRouter tool selection.
+
+Every tool run is recorded (wall time, success, records returned) under
+the tool's name and a coarse feature key of the RFD: its service and a
+power-of-two bucket of its size. Per key the model keeps EWMAs of latency,
+error rate and output size plus a window of recent latencies for a tail
+quantile, so estimates follow the current load rather than all history.
+
+score() blends a tool's declared cost() with the observed cost
+
+    observed = (ewma + tail · (pQ − ewma)) / unit_seconds + error_penalty · error_rate
+
+weighting the observation by n / (n + prior) · 0.5^(age / half_life), so a
+tool with no history is ranked by its declared cost alone, and one that
+has not run for a while drifts back to it: a tool sidelined by a failure
+or a slow call gets picked again instead of staying out for good. Old
+samples likewise fade when a new one arrives after a gap. Failures are
+charged in cost units, so a tool that fails fast does not look cheap. Keys
+with no samples yet fall back to the tool's estimate over all RFDs.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Hashable, Optional, Tuple
+
+
+def rfd_features(rfd: Dict[str, Any]) -> Tuple[Hashable, ...]:
+    """Coarse key of the RFD properties that drive runtime: service and size bucket."""
+    records = rfd.get("records")
+    if isinstance(records, list):
+        size = len(records)
+    else:
+        size = rfd.get("num_records") or len(rfd.get("dependencies") or ()) or 0
+    try:
+        bucket = int(size).bit_length()                  # 0, 1, 2-3, 4-7, …
+    except (TypeError, ValueError):
+        bucket = 0
+    return rfd.get("service") or rfd.get("task"), bucket
+
+
+def _fade(age: float, half_life: float) -> float:
+    return 0.5 ** (max(age, 0.0) / half_life) if half_life > 0 else 1.0
+
+
+@dataclass
+class ToolStats:
+    """Decayed statistics for one (tool, feature key)."""
+    samples:  int   = 0
+    latency:  float = 0.0                                 # EWMA seconds
+    errors:   float = 0.0                                 # EWMA of failure (0/1)
+    size:     float = 0.0                                 # EWMA records returned
+    last:     float = 0.0                                 # clock() of the newest sample
+    recent:   Deque[float] = field(default_factory=deque, repr=False)
+
+    def update(self, seconds: float, ok: bool, size: int, alpha: float, now: float, half_life: float) -> None:
+        if not self.samples:
+            self.latency, self.errors, self.size = seconds, float(not ok), float(size)
+        else:
+            # weight of the old estimate, shrunk further by the time since its last sample
+            keep = (1.0 - alpha) * _fade(now - self.last, half_life)
+            self.latency = keep * self.latency + (1.0 - keep) * seconds
+            self.errors  = keep * self.errors  + (1.0 - keep) * float(not ok)
+            self.size    = keep * self.size    + (1.0 - keep) * size
+        self.samples += 1
+        self.last = now
+        self.recent.append(seconds)
+
+    def quantile(self, q: float) -> float:
+        values = sorted(self.recent)
+        if not values:
+            return 0.0
+        pos = q * (len(values) - 1)
+        lo = int(pos)
+        hi = min(lo + 1, len(values) - 1)
+        return values[lo] + (values[hi] - values[lo]) * (pos - lo)
+
+
+class CostModel:
+    """Thread-safe per-tool latency / error / size estimates, blended with declared costs."""
+
+    def __init__(
+        self,
+        *,
+        alpha:         Optional[float] = None,            # EWMA weight of the newest sample
+        window:        Optional[int]   = None,            # latencies kept for the quantile
+        quantile:      float = 0.95,
+        tail:          float = 0.5,                       # how much of (pQ − mean) to add
+        error_penalty: float = 10.0,                      # cost units charged per failed run
+        prior:         Optional[float] = None,            # samples at which observed and declared weigh equally
+        unit_seconds:  Optional[float] = None,            # seconds that equal one unit of declared cost
+        half_life:     Optional[float] = None,            # seconds for an unrefreshed estimate to lose half its weight
+        clock:         Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.alpha         = alpha if alpha is not None else float(os.getenv("ROUTER_COST_ALPHA", "0.2"))
+        self.window        = window or int(os.getenv("ROUTER_COST_WINDOW", "128"))
+        self.quantile      = quantile
+        self.tail          = tail
+        self.error_penalty = error_penalty
+        self.prior         = prior if prior is not None else float(os.getenv("ROUTER_COST_PRIOR", "5"))
+        self.unit_seconds  = unit_seconds or float(os.getenv("ROUTER_COST_UNIT_SECONDS", "1.0"))
+        self.half_life     = half_life if half_life is not None else float(os.getenv("ROUTER_COST_HALF_LIFE_S", "60"))
+        self.clock         = clock
+        self._stats: Dict[Tuple[str, Any], ToolStats] = {}
+        self._lock = threading.Lock()
+
+    # -------- recording -------- #
+    def record(self, tool: str, rfd: Dict[str, Any], seconds: float, ok: bool = True, size: int = 0) -> None:
+        """Fold one run of `tool` on `rfd` into its feature key and its all-RFD estimate."""
+        now = self.clock()
+        with self._lock:
+            for key in ((tool, rfd_features(rfd)), (tool, None)):
+                stats = self._stats.get(key)
+                if stats is None:
+                    stats = self._stats[key] = ToolStats(recent=deque(maxlen=self.window))
+                stats.update(seconds, ok, size, self.alpha, now, self.half_life)
+
+    # -------- estimates -------- #
+    def stats(self, tool: str, rfd: Optional[Dict[str, Any]] = None) -> Optional[ToolStats]:
+        """Estimate for the RFD's feature key, else for the tool overall (None if never run)."""
+        with self._lock:
+            if rfd is not None:
+                stats = self._stats.get((tool, rfd_features(rfd)))
+                if stats is not None:
+                    return stats
+            return self._stats.get((tool, None))
+
+    def observed_cost(self, stats: ToolStats) -> float:
+        with self._lock:
+            seconds = stats.latency + self.tail * max(0.0, stats.quantile(self.quantile) - stats.latency)
+        return seconds / self.unit_seconds + self.error_penalty * stats.errors
+
+    def score(self, tool: Any, rfd: Dict[str, Any]) -> float:
+        """Declared cost blended with the observed one; lower is better."""
+        declared = float(tool.cost(rfd)) if hasattr(tool, "cost") else 1.0
+        stats = self.stats(tool.name, rfd)
+        if stats is None or not stats.samples:
+            return declared
+        weight = stats.samples / (stats.samples + self.prior) if self.prior > 0 else 1.0
+        weight *= _fade(self.clock() - stats.last, self.half_life)
+        return (1.0 - weight) * declared + weight * self.observed_cost(stats)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Per-tool view of the all-RFD estimates, for logs and metrics."""
+        with self._lock:
+            items = [(tool, s) for (tool, key), s in self._stats.items() if key is None]
+            return {
+                tool: {
+                    "samples":      s.samples,
+                    "latency_ewma": round(s.latency, 4),
+                    "latency_p%d" % round(self.quantile * 100): round(s.quantile(self.quantile), 4),
+                    "error_rate":   round(s.errors, 4),
+                    "size_ewma":    round(s.size, 1),
+                }
+                for tool, s in items
+            }
@@ -1,40 +1,94 @@
+import os
 import logging
 import time
-from typing import Dict, Any, List, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterator, List, Optional
 from .client import MCPClient
-from .tools.tool import MCPTool
+from .costmodel import CostModel
+from .tools.tool import MCPTool, as_records
+from ... import deadline
+from ...deadline import DeadlineExceeded
+from ...sharding import flatten_batches
 
 # Use a specific logger for the router
 log = logging.getLogger("RFDRouter")
+
+_END = object()
 # To see these logs during pytest, run: poetry run pytest -o log_cli=true -o log_cli_level=INFO
 
 class RFDRouter:
-    def __init__(self, mcp: MCPClient):
+    def __init__(self, mcp: MCPClient, costs: Optional[CostModel] = None):
         self.mcp = mcp
+        # Observed latency / errors / output size per tool, blended with declared cost() when choosing
+        self.costs = costs or CostModel()
 
     def fulfil(self, rfd: Dict[str, Any]) -> Dict[str, Any]:
+        """Fulfil an RFD and its dependencies.
+
+        rfd["deadline_s"] (or an enclosing deadline.budget()) bounds the whole
+        tree: dependencies and outbound calls only get the time that is left,
+        and work that has not started when it runs out is skipped. With
+        rfd["on_deadline"] = "partial" the records produced in time are
+        returned with "partial": True instead of raising DeadlineExceeded.
+        """
+        with deadline.budget(deadline.from_rfd(rfd)):
+            return self._fulfil(rfd)
+
+    def _fulfil(self, rfd: Dict[str, Any]) -> Dict[str, Any]:
         rfd_id = rfd.get("rfd_id", rfd.get("service", "unknown"))
         log.info(f"--- Fulfilling RFD: {rfd_id} ---")
-        
+
         start = time.time()
+        deadline.check(f"RFD {rfd_id}")
+        on_deadline = deadline.policy(rfd)
+        partial = False
+
+        tool = self._choose_tool(rfd)
+        if not tool:
+            log.error(f"[{rfd_id}] No tool found that can satisfy this RFD.")
+            raise RuntimeError(f"No tool can satisfy RFD: {rfd_id}")
+        
+        dependencies = rfd.get("dependencies", [])
+        if dependencies and getattr(tool, "consumes_dependencies", False) and hasattr(tool, "partial"):
+            # Mergeable reducer: each dependency streams into its own partial, nothing is materialised
+            log.info(f"[{rfd_id}] Chose tool: '{tool.name}' (streaming {len(dependencies)} dependencies)")
+            cut = threading.Event()
+            records = self._reduce_dependencies(rfd_id, tool, rfd, dependencies, on_deadline, cut)
+            return {
+                "elapsed": round(time.time() - start, 3),
+                "tool": tool.name,
+                "records": records,
+                "partial": cut.is_set(),
+            }
         
         # --- FIX: Only collect the 'records' from the dependency result, not the whole dictionary ---
         # The recursive call returns a full dictionary {'elapsed': ..., 'records': [...]}. We only want the records.
+        dep_results = self.fulfil_batch(rfd.get("dependencies", []), on_deadline=on_deadline)
         dependency_records = [
             record 
-            for dep_rfd in rfd.get("dependencies", []) 
-            for record in self.fulfil(dep_rfd)["records"]
+            for dep_result in dep_results if dep_result is not None
+            for record in dep_result["records"]
         ]
+        partial = any(r is None or r.get("partial") for r in dep_results)
         log.info(f"[{rfd_id}] Collected {len(dependency_records)} records from dependencies.")
 
-        tool = self._choose_tool(rfd)
-        if not tool:
-            log.error(f"[{rfd_id}] No tool found that can satisfy this RFD.")
-            raise RuntimeError(f"No tool can satisfy RFD: {rfd_id}")
-            
-        log.info(f"[{rfd_id}] Chose tool: '{tool.name}' (Cost: {tool.cost(rfd)})")
+        log.info(f"[{rfd_id}] Chose tool: '{tool.name}' (Cost: {self.costs.score(tool, rfd):.4g})")
         
-        generated_records = tool.generate(rfd)
+        if getattr(tool, "consumes_dependencies", False):
+            # Dependency records are the tool's input (e.g. a reducer), not part of the output
+            if dependency_records:
+                rfd = {**rfd, "records": dependency_records + list(rfd.get("records") or [])}
+                log.info(f"[{rfd_id}] Feeding {len(rfd['records'])} records into '{tool.name}'.")
+            dependency_records = []
+
+        try:
+            generated_records = self._run(tool, rfd)
+        except DeadlineExceeded:
+            if on_deadline != "partial":
+                raise
+            log.warning(f"[{rfd_id}] Deadline reached; returning dependency records without '{tool.name}'.")
+            generated_records, partial = [], True
         log.info(f"[{rfd_id}] Tool '{tool.name}' generated {len(generated_records)} records.")
 
         # The parts to be merged are now just the lists of records
@@ -52,10 +106,135 @@ class RFDRouter:
             "elapsed": round(time.time() - start, 3),
             "tool": tool.name,
             "records": merged_records,
+            "partial": partial,
         }
 
+    def fulfil_batch(self, rfds: List[Dict[str, Any]], on_deadline: str = "fail") -> List[Optional[Dict[str, Any]]]:
+        """Fulfil several RFDs, in order.
+
+        Leaf RFDs that pick the same batching tool (supports_batch) are answered
+        by one generate_batch() call; everything else goes through fulfil(),
+        including RFDs with their own deadline_s or on_deadline, which one
+        shared call could not honour.
+        With on_deadline="partial", RFDs cut off by the deadline come back as
+        None instead of raising DeadlineExceeded.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(rfds)
+        groups: Dict[str, Any] = {}
+        for i, rfd in enumerate(rfds):
+            if rfd.get("dependencies") or deadline.RFD_KEY in rfd or "on_deadline" in rfd:
+                continue
+            tool = self._choose_tool(rfd)
+            if tool is not None and getattr(tool, "supports_batch", False):
+                groups.setdefault(tool.name, (tool, []))[1].append(i)
+
+        for tool, idxs in groups.values():
+            if len(idxs) < 2:
+                continue
+            start = time.time()
+            try:
+                deadline.check(f"batch for '{tool.name}'")
+                outputs = [as_records(out) for out in tool.generate_batch([rfds[i] for i in idxs])]
+            except DeadlineExceeded:
+                if on_deadline != "partial":
+                    raise
+                log.warning(f"Deadline reached; skipped a batch of {len(idxs)} RFDs for '{tool.name}'.")
+                for i in idxs:
+                    results[i] = False                   # cut off, don't retry one by one
+                continue
+            except Exception:
+                for i in idxs:
+                    self.costs.record(tool.name, rfds[i], (time.time() - start) / len(idxs), ok=False)
+                raise
+            elapsed = time.time() - start
+            log.info(f"Tool '{tool.name}' answered {len(idxs)} RFDs in one batch.")
+            for i, out in zip(idxs, outputs):
+                # the batch's time is shared between its RFDs
+                self.costs.record(tool.name, rfds[i], elapsed / len(idxs), size=len(out))
+                results[i] = {"elapsed": round(elapsed, 3), "tool": tool.name, "records": out}
+
+        for i, rfd in enumerate(rfds):
+            if results[i] is None:
+                try:
+                    results[i] = self.fulfil(rfd)
+                except DeadlineExceeded:
+                    if on_deadline != "partial":
+                        raise
+                    log.warning(f"Deadline reached; skipped RFD {rfd.get('rfd_id', rfd.get('service', 'unknown'))}.")
+        return [res or None for res in results]
+
+    def iter_fulfil(self, rfd: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Stream an RFD's records; leaf RFDs come straight from the tool's iter_records.
+
+        The deadline is checked between batches, so a stream past its budget
+        stops early with DeadlineExceeded.
+        """
+        yield from self._stream(rfd, "fail", None)
+
+    def _stream(self, rfd: Dict[str, Any], on_deadline: str, cut: Optional[threading.Event]) -> Iterator[Any]:
+        # The tool runs under the RFD's deadline, but only while producing a batch:
+        # a context variable set in a generator would otherwise leak to the consumer.
+        with deadline.budget(deadline.from_rfd(rfd)):
+            until = deadline.current()
+        if rfd.get("dependencies"):
+            with deadline.until(until):
+                result = self.fulfil(rfd if on_deadline == "fail" else {**rfd, "on_deadline": on_deadline})
+            if cut is not None and result.get("partial"):
+                cut.set()
+            yield from result["records"]
+            return
+        tool = self._choose_tool(rfd)
+        if not tool:
+            raise RuntimeError(f"No tool can satisfy RFD: {rfd.get('rfd_id', rfd.get('service', 'unknown'))}")
+        batches = iter(tool.iter_records(rfd))
+        while True:
+            with deadline.until(until):
+                try:
+                    deadline.check(f"next batch from '{tool.name}'")
+                    batch = next(batches, _END)
+                except DeadlineExceeded:
+                    if on_deadline != "partial":
+                        raise
+                    if cut is not None:
+                        cut.set()
+                    return
+            if batch is _END:
+                return
+            yield from flatten_batches([batch])
+
+    def _reduce_dependencies(self, rfd_id: str, tool: MCPTool, rfd: Dict[str, Any],
+                             dependencies: List[Dict[str, Any]], on_deadline: str = "fail",
+                             cut: Optional[threading.Event] = None) -> List[Any]:
+        # One partial aggregate per dependency, built concurrently, then merged.
+        # Worker threads don't inherit context variables, so the deadline is passed in.
+        until = deadline.current()
+
+        def reduce_one(dep: Dict[str, Any]) -> Any:
+            with deadline.until(until):
+                return tool.partial(rfd, self._stream(dep, on_deadline, cut))
+
+        workers = max(1, min(len(dependencies), int(os.getenv("ROUTER_DEP_WORKERS", "4"))))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rfd-dep") as pool:
+            partials = list(pool.map(reduce_one, dependencies))
+        if rfd.get("records"):
+            partials.append(tool.partial(rfd, rfd["records"]))
+        log.info(f"[{rfd_id}] Merging {len(partials)} partial aggregates.")
+        return tool.combine(rfd, partials)
+
+    def _run(self, tool: MCPTool, rfd: Dict[str, Any]) -> List[Any]:
+        # generate() with its wall time, outcome and output size fed to the cost model
+        deadline.check(f"running '{tool.name}'")
+        start = time.time()
+        try:
+            records = as_records(tool.generate(rfd))
+        except Exception:
+            self.costs.record(tool.name, rfd, time.time() - start, ok=False)
+            raise
+        self.costs.record(tool.name, rfd, time.time() - start, size=len(records))
+        return records
+
     def _choose_tool(self, rfd) -> Optional[MCPTool]:
-        cands = [(t.cost(rfd), t) for t in self.mcp._tools.values() if t.validate_rfd(rfd)]
+        cands = [(self.costs.score(t, rfd), t) for t in self.mcp._tools.values() if t.validate_rfd(rfd)]
         return min(cands, key=lambda item: item[0], default=(None, None))[1] if cands else None
 
     def _merge(self, chunks: List[List[Any]], mode: str) -> List[Any]:
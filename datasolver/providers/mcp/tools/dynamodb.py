@@ -1,19 +1,60 @@
 """DynamoDB tool for MCP data generation."""
 
-import boto3
-from typing import Dict, Any, List, Optional
+import os
+import time
+import queue
+import logging
+import threading
+from decimal import Decimal
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterable, Iterator, List, Optional
 from .tool import MCPTool
+from datasolver.sharding import Shard, flatten_batches, generate_sharded
+from datasolver.util import aws
+
+_DONE = object()
+BATCH_WRITE_MAX = 25                                   # BatchWriteItem hard limit
 
 class DynamoDBTool(MCPTool):
-    """MCP tool for DynamoDB operations"""
+    """MCP tool for DynamoDB operations
+    
+    Query RFDs carry a "query" dict with "table_name" and one of:
+      key_condition   paginated Query (page_size items per request)
+      mode: "scan"    parallel Scan over `segments` threads
+      keys            BatchGetItem for a list of primary keys
+    Results are streamed page by page, never collected whole.
+    
+    Ingest RFDs carry an "ingest" dict with "table_name" and optionally
+    "records" (upstream data); without records the RFD's schema is generated.
+    Items are written in 25-item BatchWriteItem batches by `writers` threads
+    and the tool returns a single throughput report.
+    
+    boto3 handles are created on first use and shared process-wide (see
+    datasolver.util.aws), so constructing the tool per request is cheap.
+    """
+    
+    name: str = "dynamodb_tool"
+    description: str = "Query and generate DynamoDB data"
     
     def __init__(self):
-        super().__init__(
-            name="dynamodb_tool",
-            description="Query and generate DynamoDB data"
-        )
-        self.ddb = boto3.resource('dynamodb')
-        self.client = boto3.client('dynamodb')
+        self.logger = logging.getLogger(self.__class__.__name__)
+    
+    @property
+    def ddb(self):
+        """DynamoDB resource for the calling thread."""
+        return aws.dynamodb_resource()
+    
+    @property
+    def client(self):
+        """Shared, thread-safe low-level DynamoDB client."""
+        return aws.dynamodb_client()
+    
+    @property
+    def capabilities(self) -> Dict[str, Any]:
+        return self._get_capabilities()
+    
+    def generate_data(self, rfd: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return self.generate(rfd)
     
     def generate(self, rfd: Dict, **kwargs) -> List[Dict[str, Any]]:
         """Query or generate DynamoDB data based on RFD
@@ -21,25 +62,57 @@ class DynamoDBTool(MCPTool):
         Args:
             rfd: The RFD containing query/generation requirements
             **kwargs: Additional arguments
-            
+        
         Returns:
             List of DynamoDB records
         """
+        return list(flatten_batches(self.iter_records(rfd, **kwargs)))
+    
+    def iter_records(self, rfd: Dict, **kwargs) -> Iterator[Dict[str, Any]]:
+        """Yield DynamoDB records one at a time
+        
+        Args:
+            rfd: The RFD containing query/generation requirements
+            **kwargs: Additional arguments
+        
+        Yields:
+            DynamoDB records
+        """
+        if self._is_ingest_request(rfd):
+            ingest = rfd["ingest"]
+            records = ingest.get("records")
+            if records is None:
+                records = self._generate_data(rfd, **kwargs)
+            yield self.ingest(
+                records,
+                ingest["table_name"],
+                writers=ingest.get("writers"),
+                key_names=ingest.get("key_names"),
+                max_retries=int(ingest.get("max_retries", 8)),
+            )
         # Check if this is a query request
-        if self._is_query_request(rfd):
-            return self._query_table(rfd)
+        elif self._is_query_request(rfd):
+            query = rfd["query"]
+            if query.get("mode") == "scan":
+                yield from self._scan_table(rfd)
+            elif "keys" in query:
+                yield from self._batch_get(rfd)
+            else:
+                yield from self._query_table(rfd)
         else:
-            return self._generate_data(rfd, **kwargs)
+            yield from self._generate_data(rfd, **kwargs)
     
     def validate_rfd(self, rfd: Dict) -> bool:
         """Validate if this tool can handle the RFD
         
         Args:
             rfd: The RFD to validate
-            
+        
         Returns:
             True if the tool can handle the RFD
         """
+        if self._is_ingest_request(rfd):
+            return self._validate_ingest_rfd(rfd)
         # For query requests
         if self._is_query_request(rfd):
             return self._validate_query_rfd(rfd)
@@ -47,12 +120,23 @@ class DynamoDBTool(MCPTool):
         else:
             return self._validate_generation_rfd(rfd)
     
+    def _is_ingest_request(self, rfd: Dict) -> bool:
+        """Check if RFD asks for data to be written into a table
+        
+        Args:
+            rfd: The RFD to check
+        
+        Returns:
+            True if RFD is an ingest request
+        """
+        return "ingest" in rfd and "table_name" in rfd["ingest"]
+    
     def _is_query_request(self, rfd: Dict) -> bool:
         """Check if RFD is a query request
         
         Args:
             rfd: The RFD to check
-            
+        
         Returns:
             True if RFD is a query request
         """
@@ -63,20 +147,38 @@ class DynamoDBTool(MCPTool):
         
         Args:
             rfd: The RFD to validate
-            
+        
         Returns:
             True if query RFD is valid
         """
         query = rfd.get("query", {})
+        if query.get("mode") == "scan":
+            return "table_name" in query
+        if "keys" in query:
+            return "table_name" in query and isinstance(query["keys"], list)
         required = {"table_name", "key_condition"}
         return all(field in query for field in required)
     
+    def _validate_ingest_rfd(self, rfd: Dict) -> bool:
+        """Validate ingest RFD
+        
+        Args:
+            rfd: The RFD to validate
+        
+        Returns:
+            True if ingest RFD is valid
+        """
+        records = rfd["ingest"].get("records")
+        if records is not None:
+            return isinstance(records, list)
+        return bool(rfd.get("schema", {}).get("properties")) and self._validate_generation_rfd(rfd)
+    
     def _validate_generation_rfd(self, rfd: Dict) -> bool:
         """Validate generation RFD
         
         Args:
             rfd: The RFD to validate
-            
+        
         Returns:
             True if generation RFD is valid
         """
@@ -88,22 +190,16 @@ class DynamoDBTool(MCPTool):
             for field_schema in properties.values()
         )
     
-    def _query_table(self, rfd: Dict) -> List[Dict[str, Any]]:
-        """Query DynamoDB table based on RFD
+    def _expression_params(self, query: Dict) -> Dict[str, Any]:
+        """Optional expression parameters shared by Query and Scan
         
         Args:
-            rfd: The RFD containing query parameters
-            
+            query: The RFD's query section
+        
         Returns:
-            List of matching records
+            boto3 keyword arguments
         """
-        query = rfd["query"]
-        table = self.ddb.Table(query["table_name"])
-        
-        # Build query parameters
-        params = {
-            "KeyConditionExpression": query["key_condition"]
-        }
+        params: Dict[str, Any] = {}
         
         # Add filter expression if provided
         if "filter_expression" in query:
@@ -113,40 +209,273 @@ class DynamoDBTool(MCPTool):
         if "expression_values" in query:
             params["ExpressionAttributeValues"] = query["expression_values"]
         
+        # Add expression attribute names (for reserved words)
+        if "expression_names" in query:
+            params["ExpressionAttributeNames"] = query["expression_names"]
+        
         # Add projection expression if provided
         if "projection" in query:
             params["ProjectionExpression"] = query["projection"]
         
+        return params
+    
+    def _page_size(self, query: Dict) -> Optional[int]:
+        size = query.get("page_size", os.getenv("DYNAMODB_PAGE_SIZE"))
+        return int(size) if size else None
+    
+    def _query_table(self, rfd: Dict) -> Iterator[Dict[str, Any]]:
+        """Query DynamoDB table based on RFD, following LastEvaluatedKey
+        
+        Args:
+            rfd: The RFD containing query parameters
+        
+        Yields:
+            Matching records, one page in memory at a time
+        """
+        query = rfd["query"]
+        table = self.ddb.Table(query["table_name"])
+        
+        # Build query parameters
+        params = {
+            "KeyConditionExpression": query["key_condition"],
+            **self._expression_params(query)
+        }
+        if self._page_size(query):
+            params["Limit"] = self._page_size(query)
+        max_items = query.get("max_items")
+        
         # Execute query
         try:
-            response = table.query(**params)
-            return response.get("Items", [])
+            returned = 0
+            while True:
+                response = table.query(**params)
+                for item in response.get("Items", []):
+                    if max_items is not None and returned >= max_items:
+                        return
+                    returned += 1
+                    yield item
+                if "LastEvaluatedKey" not in response:
+                    return
+                params["ExclusiveStartKey"] = response["LastEvaluatedKey"]
         except Exception as e:
             self.logger.error(f"Failed to query table: {e}")
             raise
     
-    def _generate_data(self, rfd: Dict, **kwargs) -> List[Dict[str, Any]]:
+    def _scan_table(self, rfd: Dict) -> Iterator[Dict[str, Any]]:
+        """Parallel Scan: one thread per Segment, pages streamed through a bounded queue
+        
+        Args:
+            rfd: The RFD containing scan parameters ("segments", "page_size", ...)
+        
+        Yields:
+            Scanned records (segment order is not preserved)
+        """
+        query = rfd["query"]
+        segments = int(query.get("segments", os.getenv("DYNAMODB_SCAN_SEGMENTS", "4")))
+        from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+        
+        params: Dict[str, Any] = {"TableName": query["table_name"], **self._expression_params(query)}
+        if "ExpressionAttributeValues" in params:
+            ser = TypeSerializer()
+            params["ExpressionAttributeValues"] = {
+                k: ser.serialize(v) for k, v in params["ExpressionAttributeValues"].items()
+            }
+        if self._page_size(query):
+            params["Limit"] = self._page_size(query)
+        
+        deser = TypeDeserializer()
+        client = self.client
+        pages: "queue.Queue[Any]" = queue.Queue(maxsize=2 * segments)
+        stop = threading.Event()
+        
+        def scan_segment(segment: int) -> None:
+            # the low-level client is thread-safe; resources are not
+            try:
+                kwargs = {**params, "Segment": segment, "TotalSegments": segments}
+                while not stop.is_set():
+                    response = client.scan(**kwargs)
+                    pages.put([{k: deser.deserialize(v) for k, v in item.items()}
+                               for item in response.get("Items", [])])
+                    if "LastEvaluatedKey" not in response:
+                        break
+                    kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+            except Exception as e:
+                pages.put(e)
+            finally:
+                pages.put(_DONE)
+        
+        running = segments
+        with ThreadPoolExecutor(max_workers=segments, thread_name_prefix="ddb-scan") as pool:
+            for segment in range(segments):
+                pool.submit(scan_segment, segment)
+            try:
+                while running:
+                    page = pages.get()
+                    if page is _DONE:
+                        running -= 1
+                    elif isinstance(page, Exception):
+                        self.logger.error(f"Failed to scan table: {page}")
+                        raise page
+                    else:
+                        yield from page
+            finally:
+                stop.set()
+                while running:                         # unblock producers stuck on a full queue
+                    if pages.get() is _DONE:
+                        running -= 1
+    
+    def _batch_get(self, rfd: Dict) -> Iterator[Dict[str, Any]]:
+        """BatchGetItem in chunks of 100 keys, retrying UnprocessedKeys with backoff
+        
+        Args:
+            rfd: The RFD whose query carries "keys" (list of primary-key dicts)
+        
+        Yields:
+            Found records (missing keys are skipped)
+        """
+        query = rfd["query"]
+        table_name = query["table_name"]
+        extra = {}
+        if "projection" in query:
+            extra["ProjectionExpression"] = query["projection"]
+        if "expression_names" in query:
+            extra["ExpressionAttributeNames"] = query["expression_names"]
+        max_retries = int(query.get("max_retries", 8))
+        
+        keys = query["keys"]
+        for i in range(0, len(keys), 100):
+            request = {table_name: {"Keys": keys[i:i + 100], **extra}}
+            attempt = 0
+            while request:
+                response = self.ddb.batch_get_item(RequestItems=request)
+                yield from response.get("Responses", {}).get(table_name, [])
+                request = response.get("UnprocessedKeys") or {}
+                if request:
+                    if attempt >= max_retries:
+                        raise RuntimeError(f"BatchGetItem left keys unprocessed after {attempt} retries")
+                    time.sleep(min(0.05 * 2 ** attempt, 5.0))
+                    attempt += 1
+    
+    def ingest(self, records: Iterable[Any], table_name: str, writers: Optional[int] = None,
+               key_names: Optional[List[str]] = None, max_retries: int = 8) -> Dict[str, Any]:
+        """Write records into a table with BatchWriteItem
+        
+        Records are cut into 25-item batches and written by `writers` threads
+        (DYNAMODB_WRITERS, default 4) on the shared client, at most 2×writers
+        batches in flight. UnprocessedItems are retried with exponential
+        backoff. Floats are stored as Decimal.
+        
+        Args:
+            records: Records, or lists of records, in any number
+            table_name: Target table
+            writers: Parallel writer threads
+            key_names: Primary-key attributes; when given, duplicate keys
+                within a batch keep the last record (as batch_writer's
+                overwrite_by_pkeys does) instead of failing the batch
+            max_retries: Retries per batch before giving up
+        
+        Returns:
+            Throughput report
+        """
+        from boto3.dynamodb.types import TypeSerializer
+        
+        writers = int(writers or os.getenv("DYNAMODB_WRITERS", "4"))
+        ser = TypeSerializer()
+        client = self.client
+        report = {"table_name": table_name, "items_written": 0, "batches": 0, "retries": 0, "consumed_wcu": 0.0}
+        
+        def put_requests(batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            if key_names:
+                batch = list({tuple(repr(r.get(k)) for k in key_names): r for r in batch}.values())
+            return [{"PutRequest": {"Item": {k: ser.serialize(_to_dynamodb(v)) for k, v in r.items()}}}
+                    for r in batch]
+        
+        def write_batch(requests: List[Dict[str, Any]]) -> Dict[str, Any]:
+            pending = {table_name: requests}
+            done = {"items": len(requests), "retries": 0, "wcu": 0.0}
+            while True:
+                response = client.batch_write_item(RequestItems=pending, ReturnConsumedCapacity="TOTAL")
+                for used in response.get("ConsumedCapacity") or []:
+                    done["wcu"] += used.get("CapacityUnits", 0.0)
+                pending = response.get("UnprocessedItems") or {}
+                if not pending:
+                    return done
+                if done["retries"] >= max_retries:
+                    raise RuntimeError(f"BatchWriteItem left items unprocessed after {done['retries']} retries")
+                time.sleep(min(0.05 * 2 ** done["retries"], 5.0))
+                done["retries"] += 1
+        
+        def collect(result: Dict[str, Any]) -> None:
+            report["items_written"] += result["items"]
+            report["retries"] += result["retries"]
+            report["consumed_wcu"] += result["wcu"]
+            report["batches"] += 1
+        
+        def batches() -> Iterator[List[Dict[str, Any]]]:
+            batch: List[Dict[str, Any]] = []
+            for record in flatten_batches(records):
+                batch.append(record)
+                if len(batch) == BATCH_WRITE_MAX:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+        
+        t = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=writers, thread_name_prefix="ddb-write") as pool:
+                in_flight = []
+                for batch in batches():
+                    in_flight.append(pool.submit(write_batch, put_requests(batch)))
+                    if len(in_flight) >= 2 * writers:
+                        collect(in_flight.pop(0).result())
+                for future in in_flight:
+                    collect(future.result())
+        except Exception as e:
+            self.logger.error(f"Failed to ingest into {table_name}: {e}")
+            raise
+        
+        report["seconds"] = time.perf_counter() - t
+        report["items_per_sec"] = report["items_written"] / report["seconds"] if report["seconds"] else 0.0
+        self.logger.info(
+            f"Ingested {report['items_written']} items into {table_name} in {report['seconds']:.2f}s "
+            f"({report['items_per_sec']:.0f} items/sec, {report['batches']} batches, {report['retries']} retries)"
+        )
+        return report
+    
+    def _generate_data(self, rfd: Dict, **kwargs) -> Iterator[Dict[str, Any]]:
         """Generate DynamoDB-compatible data
         
         Args:
             rfd: The RFD containing schema
             **kwargs: Additional arguments
-            
-        Returns:
-            List of generated records
+        
+        Yields:
+            Generated records (shards run in parallel with GEN_WORKERS > 1)
+        """
+        num_records = kwargs.get("num_records", rfd.get("num_records", 100))
+        yield from generate_sharded(type(self), {**rfd, "num_records": num_records},
+                                    workers=kwargs.get("workers"))
+    
+    @classmethod
+    def iter_shard(cls, rfd: Dict, shard: Shard) -> Iterator[Dict[str, Any]]:
+        """Generate the records of one shard
+        
+        Args:
+            rfd: The RFD containing schema
+            shard: Record range to generate
+        
+        Yields:
+            Generated records
         """
-        num_records = kwargs.get("num_records", 100)
         schema = rfd.get("schema", {})
         properties = schema.get("properties", {})
         
-        records = []
-        for i in range(num_records):
+        for i in range(shard.start, shard.stop):
             record = {}
             for field, field_schema in properties.items():
-                record[field] = self._generate_dynamodb_value(field_schema, i)
-            records.append(record)
-        
-        return records
+                record[field] = cls._generate_dynamodb_value(field_schema, i)
+            yield record
     
     def _get_capabilities(self) -> Dict[str, Any]:
         """Get the tool's capabilities
@@ -157,7 +486,8 @@ class DynamoDBTool(MCPTool):
         return {
             "operations": [
                 "query",
-                "generate"
+                "generate",
+                "ingest"
             ],
             "query_features": [
                 "Key condition expressions",
@@ -170,19 +500,26 @@ class DynamoDBTool(MCPTool):
                 "Schema validation",
                 "Primary key generation"
             ],
+            "ingest_features": [
+                "BatchWriteItem in 25-item batches",
+                "Parallel writers",
+                "Unprocessed item retries with backoff",
+                "Throughput reporting"
+            ],
             "constraints": {
                 "max_item_size": 400 * 1024,
                 "max_string_length": 1024
             }
         }
     
-    def _generate_dynamodb_value(self, field_schema: Dict[str, Any], index: int) -> Any:
+    @classmethod
+    def _generate_dynamodb_value(cls, field_schema: Dict[str, Any], index: int) -> Any:
         """Generate a DynamoDB-compatible value
         
         Args:
             field_schema: The schema for the field
             index: Record index
-            
+        
         Returns:
             DynamoDB-compatible value
         """
@@ -192,24 +529,34 @@ class DynamoDBTool(MCPTool):
             if "format" in field_schema and "date" in field_schema["format"]:
                 return f"2024-{index % 12 + 1:02d}-{index % 28 + 1:02d}"
             return f"value_{index}"
-            
+        
         elif field_type == "number":
             return float(index)
-            
+        
         elif field_type == "boolean":
             return index % 2 == 0
-            
+        
         elif field_type == "null":
             return None
-            
+        
         elif field_type == "list":
-            return [self._generate_dynamodb_value({"type": "string"}, i) 
+            return [cls._generate_dynamodb_value({"type": "string"}, i) 
                    for i in range(3)]
-            
+        
         elif field_type == "map":
             return {
-                "key1": self._generate_dynamodb_value({"type": "string"}, index),
-                "key2": self._generate_dynamodb_value({"type": "number"}, index)
+                "key1": cls._generate_dynamodb_value({"type": "string"}, index),
+                "key2": cls._generate_dynamodb_value({"type": "number"}, index)
             }
-            
-        return None 
\ No newline at end of file
+        
+        return None 
+
+def _to_dynamodb(value: Any) -> Any:
+    """Convert floats (which boto3 refuses) to Decimal, recursively."""
+    if isinstance(value, float):
+        return Decimal(repr(value))
+    if isinstance(value, dict):
+        return {k: _to_dynamodb(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_dynamodb(v) for v in value]
+    return value
@@ -1,59 +1,137 @@
 # datasolver/providers/mcp/tools/reducer.py
 
-"""ReduceAvgTool – averages numeric columns over a list of records."""
-from typing import Dict, Any, List
+"""Reducer tools – aggregate numeric columns over a list of records.
+
+The work is done by datasolver.aggregate. A list of records is reduced
+exactly (columnar NumPy); any other iterable, "streaming": true, or the
+"distinct" aggregate use the online, mergeable StreamingAggregator, which
+never holds the rows. RFDRouter streams each dependency into its own
+partial() and combine()s them.
+"""
+from typing import Dict, Any, Iterable, List, Optional, Sequence
 from .tool import MCPTool
+from datasolver.aggregate import (
+    DEFAULT_KEY_FORMAT, STREAMING_ONLY, StreamingAggregator, aggregate, parse_aggregate
+)
+
+class ReduceTool(MCPTool):
+    """mean / sum / min / max / count / stddev / median / pNN / distinct, optionally grouped.
+
+    RFD:
+        {"service": "reduce",
+         "records": [...],                 # list or iterable, or supplied by "dependencies"
+         "aggregates": ["mean", "p95"],    # default ["mean"]
+         "group_by": ["region"],           # optional
+         "fields": ["latency"],            # optional, default every numeric field
+         "streaming": true}                # optional, force the online engine
+
+    Output: one record per group, with keys "<field>_<aggregate>". In
+    streaming mode percentiles come from a t-digest and distinct from a
+    HyperLogLog; the other aggregates are exact either way.
+    """
 
-class ReduceAvgTool(MCPTool):
     # -------- metadata -------- #
-    name: str = "reduce_avg"
-    description: str = "Averages (mean) every numeric field in `records`."
+    name: str = "reduce"
+    description: str = "Aggregates (mean/sum/min/max/count/stddev/percentiles) numeric fields in `records`, optionally grouped."
+
+    # RFDRouter feeds dependency records in as rfd["records"]
+    consumes_dependencies: bool = True
+
+    # Fixed aggregates for single-purpose reducers (None = taken from the RFD)
+    aggregates: Optional[Sequence[str]] = None
+    key_format: str = DEFAULT_KEY_FORMAT
 
     @property
     def capabilities(self) -> Dict[str, Any]:
         return {
-            "aggregation": "mean",
+            "aggregation": list(self.aggregates or ["mean", "sum", "min", "max", "count", "stddev", "median", "pNN", "distinct"]),
+            "group_by": True,
+            "streaming": True,
             "input":  "List[Dict[str, number]]",
-            "output": "List[Dict[str, number]] (single element)"
+            "output": "List[Dict[str, number]] (one element per group)"
         }
 
     # -------- validation -------- #
     def validate_rfd(self, rfd: Dict[str, Any]) -> bool:
-        # This tool is valid if the service name matches and 'records' is a list.
+        # Valid if the service name matches and records are given inline or by dependencies.
+        if rfd.get("service") != self.name:
+            return False
+        records = rfd.get("records")
+        inline = isinstance(records, Iterable) and not isinstance(records, (str, bytes, dict))
+        if not (inline or rfd.get("dependencies")):
+            return False
+        try:
+            for agg in self._aggregates(rfd):
+                parse_aggregate(agg)
+        except ValueError:
+            return False
+        return True
+
+    def _aggregates(self, rfd: Dict[str, Any]) -> Sequence[str]:
+        return self.aggregates or rfd.get("aggregates") or ["mean"]
+
+    def _group_by(self, rfd: Dict[str, Any]) -> List[str]:
+        group_by = rfd.get("group_by") or []
+        return [group_by] if isinstance(group_by, str) else list(group_by)
+
+    def _streaming(self, rfd: Dict[str, Any]) -> bool:
         return (
-            rfd.get("service") == self.name
-            and isinstance(rfd.get("records"), list)
+            bool(rfd.get("streaming"))
+            or not isinstance(rfd.get("records", []), list)
+            or any(parse_aggregate(agg)[0] in STREAMING_ONLY for agg in self._aggregates(rfd))
         )
 
     # -------- core generator -------- #
-    def generate_data(self, rfd: Dict[str, Any]) -> List[Dict[str, float]]:
-        records: List[Dict[str, Any]] = rfd["records"]
-        if not records:
-            return [{}]
-
-        keys = set().union(*records)
-        out: Dict[str, float] = {}
+    def generate_data(self, rfd: Dict[str, Any]) -> List[Dict[str, Any]]:
+        records = rfd.get("records")
+        if records is None:
+            records = []
+        if self._streaming(rfd):
+            return self.combine(rfd, [self.partial(rfd, records)])
+        return aggregate(
+            records,
+            self._aggregates(rfd),
+            group_by=self._group_by(rfd),
+            fields=rfd.get("fields"),
+            key_format=self.key_format,
+        )
 
-        for k in keys:
-            # Filter for numbers and ignore other types gracefully
-            nums = [row[k] for row in records if isinstance(row.get(k), (int, float))]
-            if nums:
-                out[k] = sum(nums) / len(nums)
+    # -------- mergeable partials -------- #
+    def partial(self, rfd: Dict[str, Any], records: Iterable[Any]) -> StreamingAggregator:
+        """Fold a record stream (records or lists of records) into a partial aggregate."""
+        return StreamingAggregator(
+            self._aggregates(rfd), self._group_by(rfd), rfd.get("fields")
+        ).update(records)
 
-        return [out]
+    def combine(self, rfd: Dict[str, Any], partials: List[StreamingAggregator]) -> List[Dict[str, Any]]:
+        """Merge partial aggregates (in any order) into the final records."""
+        if not partials:
+            return self.combine(rfd, [self.partial(rfd, [])])
+        total = partials[0]
+        for other in partials[1:]:
+            total.merge(other)
+        return total.result(self.key_format)
 
     # The router calls .generate(), so this method must exist.
-    def generate(self, rfd: Dict[str, Any], **_) -> List[Dict[str, float]]:
+    def generate(self, rfd: Dict[str, Any], **_) -> List[Dict[str, Any]]:
         return self.generate_data(rfd)
 
-    # *** FIX: Add the missing cost method ***
     def cost(self, rfd: Dict[str, Any]) -> float:
         """
         Calculate the cost of running this tool.
-        For an averaging tool, a simple cost could be based on the number of records.
-        Let's say it's 1 unit of cost per 100 records.
+        1 unit of cost per 100 records, on top of a base cost of 1.0 so it's never zero.
         """
-        num_records = len(rfd.get("records", []))
-        # Return a base cost of 1.0 plus cost per record
-        # This ensures it's never zero and scales with input size.
-        return 1.0 + (num_records / 100.0)
\ No newline at end of file
+        records = rfd.get("records")
+        num_records = len(records) if isinstance(records, list) else 0
+        return 1.0 + (num_records / 100.0)
+
+
+class ReduceAvgTool(ReduceTool):
+    """Mean of every numeric field; output keys are the field names."""
+
+    # -------- metadata -------- #
+    name: str = "reduce_avg"
+    description: str = "Averages (mean) every numeric field in `records`."
+
+    aggregates = ("mean",)
+    key_format = "{field}"
@@ -1,16 +1,33 @@
 """Text generation tool for MCP data generation."""
 
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterator, List
+
+import numpy as np
+
 from .tool import MCPTool
+from datasolver.sharding import Shard, flatten_batches, generate_sharded
+from datasolver.textgen import Column, compile_text
 
 class TextGeneratorTool(MCPTool):
-    """MCP tool for generating text data"""
+    """MCP tool for generating text data
     
-    def __init__(self):
-        super().__init__(
-            name="text_generator",
-            description="Generates text data based on templates and patterns"
-        )
+    String fields are compiled once per shard by datasolver.textgen
+    (templates with placeholders, word lists, Markov sentences from a seed
+    corpus) and generated a column at a time in batches of `batch_size`.
+    Each field has its own random stream, so with a "seed" in the RFD the
+    output is reproducible.
+    """
+    
+    name: str = "text_generator"
+    description: str = "Generates text data based on templates and patterns"
+    batch_size: int = 10_000
+    
+    @property
+    def capabilities(self) -> Dict[str, Any]:
+        return self._get_capabilities()
+    
+    def generate_data(self, rfd: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return self.generate(rfd)
     
     def generate(self, rfd: Dict, **kwargs) -> List[Dict[str, Any]]:
         """Generate text data based on RFD schema
@@ -22,23 +39,66 @@ class TextGeneratorTool(MCPTool):
         Returns:
             List of generated text records
         """
-        num_records = kwargs.get("num_records", 100)
+        return list(flatten_batches(self.iter_records(rfd, **kwargs)))
+    
+    def iter_records(self, rfd: Dict, **kwargs) -> Iterator[Dict[str, Any]]:
+        """Yield text records one at a time
+        
+        Args:
+            rfd: The RFD containing schema and requirements
+            **kwargs: Additional arguments including num_records
+            
+        Yields:
+            Batches of generated text records (shards run in parallel with GEN_WORKERS > 1)
+        """
+        num_records = kwargs.get("num_records", rfd.get("num_records", 100))
+        yield from generate_sharded(type(self), {**rfd, "num_records": num_records},
+                                    workers=kwargs.get("workers"))
+    
+    @classmethod
+    def iter_shard(cls, rfd: Dict, shard: Shard) -> Iterator[List[Dict[str, Any]]]:
+        """Yield the text records of one shard in batches
+        
+        Args:
+            rfd: The RFD containing schema and requirements
+            shard: Record range and seed to generate
+            
+        Yields:
+            Lists of generated text records
+        """
         schema = rfd.get("schema", {})
         properties = schema.get("properties", {})
+        batch_size = rfd.get("batch_size", cls.batch_size)
         
-        records = []
-        for _ in range(num_records):
-            record = {}
-            for field, field_schema in properties.items():
-                if field_schema.get("type") == "string":
-                    # Generate text based on field requirements
-                    record[field] = self._generate_text(field_schema)
-                else:
-                    # For non-string fields, use default values
-                    record[field] = self._get_default_value(field_schema)
-            records.append(record)
+        keys = list(properties)
+        seeds = shard.seed_sequence().spawn(len(keys))
+        columns = [
+            cls._compile_field(field, field_schema, seed)
+            for (field, field_schema), seed in zip(properties.items(), seeds)
+        ]
+        
+        for start in range(shard.start, shard.stop, batch_size):
+            idx = np.arange(start, min(start + batch_size, shard.stop))
+            yield [dict(zip(keys, row)) for row in zip(*(col(idx) for col in columns))] if keys else [{} for _ in idx]
+    
+    @classmethod
+    def _compile_field(cls, field: str, field_schema: Dict[str, Any], seed: np.random.SeedSequence) -> Column:
+        """Column generator for one field
         
-        return records
+        Args:
+            field: Field name (used to infer a template)
+            field_schema: The schema for the field
+            seed: Seed sequence for this column
+            
+        Returns:
+            Function mapping record indices to values
+        """
+        if field_schema.get("type") == "string":
+            # Generate text based on field requirements
+            return compile_text(field_schema, seed, field)
+        # For non-string fields, use default values
+        value = cls._get_default_value(field_schema)
+        return lambda idx: [value] * len(idx)
     
     def validate_rfd(self, rfd: Dict) -> bool:
         """Validate if this tool can handle the RFD
@@ -68,8 +128,9 @@ class TextGeneratorTool(MCPTool):
             "supported_types": ["string"],
             "features": [
                 "template-based generation",
-                "pattern matching",
-                "context-aware generation"
+                "word lists",
+                "Markov sentences from seed corpora",
+                "field name / format inference"
             ],
             "constraints": {
                 "max_length": 1000,
@@ -77,20 +138,8 @@ class TextGeneratorTool(MCPTool):
             }
         }
     
-    def _generate_text(self, field_schema: Dict[str, Any]) -> str:
-        """Generate text for a field based on its schema
-        
-        Args:
-            field_schema: The schema for the field
-            
-        Returns:
-            Generated text value
-        """
-        # Implement text generation logic based on field schema
-        # This could use templates, patterns, or other generation methods
-        return f"Generated text for {field_schema.get('description', 'field')}"
-    
-    def _get_default_value(self, field_schema: Dict[str, Any]) -> Any:
+    @classmethod
+    def _get_default_value(cls, field_schema: Dict[str, Any]) -> Any:
         """Get a default value for a non-string field
         
         Args:
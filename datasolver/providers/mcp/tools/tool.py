@@ -1,7 +1,8 @@
 """Base class for MCP tools that handle specific data operations."""
 
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Iterator, Optional, List, Sequence
 import json
 
 class MCPTool(ABC):
@@ -16,8 +17,34 @@ class MCPTool(ABC):
     2. Validate incoming RFDs
     3. Generate or retrieve data according to the RFD
     4. Handle errors and edge cases
+    
+    Execution contract (what RFDRouter, MCPClient and the solver server call):
+    
+        generate(rfd)          -> List[record]
+        agenerate(rfd)         -> awaitable List[record]
+        generate_batch(rfds)   -> one List[record] per RFD, in order
+        iter_records(rfd)      -> records (or lists of records), lazily
+    
+    A tool implements generate() (or, legacy, generate_data()); the other
+    entry points have working defaults. Objects that predate the contract
+    are wrapped by adapt_tool().
     """
     
+    # Tools that transform their inputs (e.g. reducers) set this; RFDRouter
+    # then passes the dependency records in as rfd["records"] and returns
+    # the tool's output alone instead of merging it with those records.
+    consumes_dependencies: bool = False
+    
+    # Tools whose generate_batch() is cheaper than one generate() per RFD
+    # (e.g. one upstream snapshot answering many queries) set this; the
+    # router then hands them all their sibling RFDs in a single call.
+    supports_batch: bool = False
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.generate is MCPTool.generate and cls.generate_data is MCPTool.generate_data:
+            raise TypeError(f"{cls.__name__} must implement generate() or generate_data()")
+    
     @property
     @abstractmethod
     def name(self) -> str:
@@ -61,18 +88,173 @@ class MCPTool(ABC):
         """
         pass
     
-    @abstractmethod
-    def generate_data(self, rfd: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate or retrieve data according to the RFD.
+    def cost(self, rfd: Dict[str, Any]) -> float:
+        """Relative cost of answering the RFD; RFDRouter picks the cheapest tool.
+        
+        Args:
+            rfd: The request for data
+        
+        Returns:
+            A positive number (default 1.0)
+        """
+        return 1.0
+    
+    def generate(self, rfd: Dict[str, Any], **kwargs) -> List[Dict[str, Any]]:
+        """Generate or retrieve the records for the RFD.
+        
+        The default calls generate_data() and unwraps its result.
         
         Args:
             rfd: The request for data specifying what to generate
-            
+            **kwargs: Tool-specific options (e.g. num_records, workers)
+        
         Returns:
-            A dictionary containing the generated dataset
-            
+            The generated records
+        
         Raises:
             ValueError: If the RFD is invalid or requirements can't be met
             RuntimeError: If data generation fails
         """
-        pass 
\ No newline at end of file
+        return as_records(self.generate_data(rfd))
+    
+    def generate_data(self, rfd: Dict[str, Any]) -> Any:
+        """Legacy entry point, kept for existing callers.
+        
+        Older tools implement this instead of generate() and may return a
+        {"rows": [...]} / {"data": [...]} envelope; new code calls generate().
+        
+        Args:
+            rfd: The request for data specifying what to generate
+        
+        Returns:
+            The generated dataset
+        """
+        return self.generate(rfd)
+    
+    async def agenerate(self, rfd: Dict[str, Any], **kwargs) -> List[Dict[str, Any]]:
+        """Async generate(); the default runs it in a worker thread.
+        
+        Args:
+            rfd: The request for data specifying what to generate
+            **kwargs: Passed on to generate()
+        
+        Returns:
+            The generated records
+        """
+        return await asyncio.to_thread(self.generate, rfd, **kwargs)
+    
+    def generate_batch(self, rfds: Sequence[Dict[str, Any]], **kwargs) -> List[List[Dict[str, Any]]]:
+        """Generate the records for several RFDs at once.
+        
+        The default calls generate() per RFD; tools with supports_batch
+        override it to share work between the RFDs.
+        
+        Args:
+            rfds: The requests for data
+            **kwargs: Passed on to generate()
+        
+        Returns:
+            One list of records per RFD, in the same order
+        """
+        return [self.generate(rfd, **kwargs) for rfd in rfds]
+    
+    def iter_records(self, rfd: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Stream the records for the RFD.
+        
+        The default runs the tool once and yields its rows; tools that can
+        produce records incrementally override this.
+        
+        Args:
+            rfd: The request for data specifying what to generate
+        
+        Yields:
+            Records, or lists of records
+        """
+        yield from as_records(self.generate(rfd))
+
+
+def as_records(result: Any) -> List[Dict[str, Any]]:
+    """Normalise a tool result to a list of records.
+    
+    Accepts a list, any other iterable, None, or a dict envelope with the
+    records under "records", "rows" or "data" (any other dict is a single
+    record).
+    """
+    if result is None:
+        return []
+    if isinstance(result, list):
+        return result
+    if isinstance(result, dict):
+        for key in ("records", "rows", "data"):
+            if isinstance(result.get(key), list):
+                return result[key]
+        return [result]
+    return list(result)
+
+
+class ToolAdapter(MCPTool):
+    """Wraps a tool written before the execution contract.
+    
+    The wrapped object only needs a name, validate_rfd() and generate() or
+    generate_data(). Results are unwrapped with as_records(), capabilities
+    may be a method or a property, and anything else (cost, partial,
+    combine, ...) is forwarded unchanged.
+    """
+    
+    def __init__(self, tool: Any):
+        self.tool = tool
+        self.consumes_dependencies = getattr(tool, "consumes_dependencies", False)
+        self.supports_batch = getattr(tool, "supports_batch", False)
+    
+    @property
+    def name(self) -> str:
+        return self.tool.name
+    
+    @property
+    def description(self) -> str:
+        return getattr(self.tool, "description", "")
+    
+    @property
+    def capabilities(self) -> Dict[str, Any]:
+        caps = getattr(self.tool, "capabilities", {})
+        return caps() if callable(caps) else caps
+    
+    def validate_rfd(self, rfd: Dict[str, Any]) -> bool:
+        return self.tool.validate_rfd(rfd)
+    
+    def cost(self, rfd: Dict[str, Any]) -> float:
+        return self.tool.cost(rfd) if hasattr(self.tool, "cost") else 1.0
+    
+    def generate(self, rfd: Dict[str, Any], **kwargs) -> List[Dict[str, Any]]:
+        if hasattr(self.tool, "generate"):
+            return as_records(self.tool.generate(rfd, **kwargs))
+        return as_records(self.tool.generate_data(rfd))
+    
+    async def agenerate(self, rfd: Dict[str, Any], **kwargs) -> List[Dict[str, Any]]:
+        if hasattr(self.tool, "agenerate"):
+            return as_records(await self.tool.agenerate(rfd, **kwargs))
+        return await super().agenerate(rfd, **kwargs)
+    
+    def generate_batch(self, rfds: Sequence[Dict[str, Any]], **kwargs) -> List[List[Dict[str, Any]]]:
+        if hasattr(self.tool, "generate_batch"):
+            return [as_records(out) for out in self.tool.generate_batch(rfds, **kwargs)]
+        return super().generate_batch(rfds, **kwargs)
+    
+    def iter_records(self, rfd: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        if hasattr(self.tool, "iter_records"):
+            yield from self.tool.iter_records(rfd)
+        else:
+            yield from super().iter_records(rfd)
+    
+    def __getattr__(self, item: str) -> Any:
+        # Only reached for attributes the adapter doesn't define itself
+        if "tool" not in self.__dict__:
+            raise AttributeError(item)
+        return getattr(self.__dict__["tool"], item)
+
+
+def adapt_tool(tool: Any) -> MCPTool:
+    """Return `tool` if it already follows the execution contract, else a ToolAdapter around it."""
+    if isinstance(tool, MCPTool) and not callable(tool.capabilities):
+        return tool
+    return ToolAdapter(tool) 
\ No newline at end of file
@@ -1,12 +1,16 @@
 # datasolver/providers/mcp/tools/yield_matrix_tool.py
-from typing import Dict, Any
+from typing import Dict, Any, List, Sequence
 from .tool import MCPTool
-from datasolver.yield_matrix import build_dataset
+from datasolver.yield_matrix import build_dataset, build_datasets
 
 class YieldMatrixTool(MCPTool):
     name        = "yield_matrix"
     description = "Aggregates on-chain yields and returns a risk-scored matrix."
 
+    # one pool snapshot answers any number of chain/asset combos
+    supports_batch = True
+
+    @property
     def capabilities(self) -> Dict[str, Any]:
         return {
             "service": self.name,
@@ -21,10 +25,17 @@ class YieldMatrixTool(MCPTool):
     def cost(self, rfd: Dict[str,Any]) -> float:
         return 1.0
 
+    # legacy envelope, kept for existing callers
     def generate_data(self, rfd: Dict[str,Any]) -> Dict[str,Any]:
-        return {"rows": build_dataset(rfd)}
+        return {"rows": self.generate(rfd)}
 
-    def generate(self, rfd: Dict[str,Any]) -> Dict[str,Any]:
+    def generate(self, rfd: Dict[str,Any], **_) -> List[Dict[str,Any]]:
         if not self.validate_rfd(rfd):
             raise ValueError("Invalid RFD for yield_matrix")
-        return self.generate_data(rfd)
+        return build_dataset(rfd)
+
+    def generate_batch(self, rfds: Sequence[Dict[str,Any]], **_) -> List[List[Dict[str,Any]]]:
+        for rfd in rfds:
+            if not self.validate_rfd(rfd):
+                raise ValueError("Invalid RFD for yield_matrix")
+        return build_datasets(list(rfds))
@@ -1,20 +1,99 @@
 """Mock provider implementation for testing."""
 
-import random
+import os
 import logging
-from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, Callable, Iterator, List, Optional
+
+import numpy as np
+
 from .provider import DataProvider
+from ..sharding import Shard, generate_sharded
+
+# A compiled column: record indices -> one value per index
+Column = Callable[[np.ndarray], List[Any]]
+
+_DATES = [f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}" for i in range(84)]  # lcm(12, 28)
+
+
+def compile_schema(field_schema: Dict[str, Any], seed: np.random.SeedSequence) -> Column:
+    """Compile a field schema into a column generator.
+    
+    The schema is walked once; the returned closure produces a whole column
+    per call, with NumPy drawing numeric/boolean values in bulk. Every column
+    gets its own random stream, so output does not depend on batch size.
+    
+    Args:
+        field_schema: The schema for the field
+        seed: Seed sequence for this column
+        
+    Returns:
+        Function mapping an array of record indices to a list of values
+    """
+    field_type = field_schema.get("type")
+    
+    if field_type == "string":
+        fmt = field_schema.get("format", "")
+        if "date" in fmt:
+            return lambda idx: [_DATES[i] for i in (idx % 84).tolist()]
+        if "email" in fmt:
+            return lambda idx: [f"user_{i}@example.com" for i in idx.tolist()]
+        if "uri" in fmt:
+            return lambda idx: [f"https://example.com/resource/{i}" for i in idx.tolist()]
+        return lambda idx: [f"mock_value_{i}" for i in idx.tolist()]
+        
+    if field_type in ("number", "integer", "boolean"):
+        rng = np.random.default_rng(seed)
+        
+    if field_type == "number":
+        return lambda idx: (rng.integers(1, 1001, len(idx)) / 10).tolist()
+        
+    if field_type == "integer":
+        return lambda idx: rng.integers(1, 101, len(idx)).tolist()
+        
+    if field_type == "boolean":
+        return lambda idx: (rng.integers(0, 2, len(idx)) == 1).tolist()
+        
+    if field_type == "array":
+        item = compile_schema(field_schema.get("items", {"type": "string"}), seed)
+        
+        def array(idx: np.ndarray) -> List[Any]:
+            # three items per record, indexed 0..2 like the record-at-a-time generator
+            values = item(np.tile(np.arange(3), len(idx)))
+            return [values[k:k + 3] for k in range(0, len(values), 3)]
+        return array
+        
+    if field_type == "object":
+        return _compile_object(field_schema.get("properties", {}), seed)
+        
+    return lambda idx: [None] * len(idx)
+
+
+def _compile_object(properties: Dict[str, Any], seed: np.random.SeedSequence) -> Column:
+    keys = list(properties)
+    columns = [compile_schema(schema, child) for schema, child in zip(properties.values(), seed.spawn(len(keys)))]
+    
+    def obj(idx: np.ndarray) -> List[Dict[str, Any]]:
+        return [dict(zip(keys, row)) for row in zip(*(col(idx) for col in columns))] if keys else [{} for _ in idx]
+    return obj
+
 
 class MockProvider(DataProvider):
     """Mock data provider for testing and development.
     
     This provider generates synthetic data based on the RFD schema,
     useful for testing and development without external dependencies.
+    The schema is compiled once per shard; records are produced in batches.
+    Set "seed" on the RFD (or MOCK_SEED) for reproducible output – the same
+    for any number of workers (see datasolver.sharding).
     """
     
-    def __init__(self):
+    batch_size: int = 10_000
+    
+    def __init__(self, batch_size: Optional[int] = None, workers: Optional[int] = None):
         super().__init__()
+        if batch_size:
+            self.batch_size = batch_size
+        self.workers = workers
         self.logger.info("Initialized mock provider")
     
     def generate_dataset(self, rfd: Dict) -> Dict[str, Any]:
@@ -27,63 +106,39 @@ class MockProvider(DataProvider):
             Generated mock dataset
         """
         try:
-            schema = rfd.get("schema", {})
-            properties = schema.get("properties", {})
-            num_records = rfd.get("num_records", 10)
-            
-            records = []
-            for i in range(num_records):
-                record = {}
-                for field, field_schema in properties.items():
-                    record[field] = self._generate_mock_value(field_schema, i)
-                records.append(record)
-            
-            return {"data": records}
+            return {"data": [r for batch in self.iter_records(rfd) for r in batch]}
             
         except Exception as e:
             self.logger.error(f"Failed to generate mock dataset: {e}")
             raise
     
-    def _generate_mock_value(self, field_schema: Dict[str, Any], index: int) -> Any:
-        """Generate a mock value based on field schema.
+    def iter_records(self, rfd: Dict) -> Iterator[List[Dict[str, Any]]]:
+        """Yield mock records in batches of `batch_size`.
         
         Args:
-            field_schema: The schema for the field
-            index: Record index
+            rfd: Request for data containing schema
             
-        Returns:
-            Generated mock value
+        Yields:
+            Lists of generated mock records
         """
-        field_type = field_schema.get("type")
+        seed = rfd.get("seed", os.getenv("MOCK_SEED"))
+        rfd = {**rfd, "num_records": rfd.get("num_records", 10), "batch_size": self.batch_size}
+        yield from generate_sharded(type(self), rfd, workers=self.workers,
+                                    seed=None if seed is None else int(seed))
+    
+    @classmethod
+    def iter_shard(cls, rfd: Dict, shard: Shard) -> Iterator[List[Dict[str, Any]]]:
+        """Yield one shard's records in batches.
         
-        if field_type == "string":
-            if "format" in field_schema:
-                if "date" in field_schema["format"]:
-                    return f"2024-{index % 12 + 1:02d}-{index % 28 + 1:02d}"
-                elif "email" in field_schema["format"]:
-                    return f"user_{index}@example.com"
-                elif "uri" in field_schema["format"]:
-                    return f"https://example.com/resource/{index}"
-            return f"mock_value_{index}"
-            
-        elif field_type == "number":
-            return float(random.randint(1, 1000)) / 10
-            
-        elif field_type == "integer":
-            return random.randint(1, 100)
-            
-        elif field_type == "boolean":
-            return random.choice([True, False])
-            
-        elif field_type == "array":
-            item_schema = field_schema.get("items", {"type": "string"})
-            return [self._generate_mock_value(item_schema, i) for i in range(3)]
-            
-        elif field_type == "object":
-            properties = field_schema.get("properties", {})
-            return {
-                key: self._generate_mock_value(schema, index)
-                for key, schema in properties.items()
-            }
+        Args:
+            rfd: Request for data containing schema
+            shard: Record range and seed to generate
             
-        return None 
\ No newline at end of file
+        Yields:
+            Lists of generated mock records
+        """
+        batch_size = rfd.get("batch_size", cls.batch_size)
+        records = _compile_object(rfd.get("schema", {}).get("properties", {}), shard.seed_sequence())
+        
+        for start in range(shard.start, shard.stop, batch_size):
+            yield records(np.arange(start, min(start + batch_size, shard.stop)))
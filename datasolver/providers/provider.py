@@ -2,7 +2,7 @@
 
 import logging
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, Iterator
 
 class DataProvider(ABC):
     """Abstract base class defining the interface for data providers.
@@ -24,4 +24,19 @@ class DataProvider(ABC):
         Returns:
             Generated dataset as a dictionary
         """
-        pass 
\ No newline at end of file
+        pass
+
+    def iter_records(self, rfd: Dict) -> Iterator[Any]:
+        """Stream the dataset's records instead of materializing them.
+        
+        Yields records (dicts) or batches of records (lists). The default
+        wraps generate_dataset(); providers that can produce records one at
+        a time override this so memory stays bounded for large RFDs.
+        
+        Args:
+            rfd: Request for data containing schema and requirements
+            
+        Yields:
+            Records, or lists of records
+        """
+        yield from self.generate_dataset(rfd).get("data", []) 
\ No newline at end of file
@@ -0,0 +1,122 @@
+"""Deterministic sharded generation across a process pool.
+
+num_records is cut into fixed-size shards. Shard i gets the seed
+SeedSequence(entropy, spawn_key=(i,)) and covers record indices
+[start, start + count), so what a shard produces depends only on the RFD,
+the shard size and the base seed – never on how many workers ran it.
+
+A generator is any class with a classmethod
+
+    iter_shard(rfd, shard) -> Iterator[record | list[record]]
+
+(MockProvider, TextGeneratorTool, DynamoDBTool). It is called in the worker
+processes by reference, so it must not need an instance.
+"""
+
+import os
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from .writers import open_writer
+
+logger = logging.getLogger('Sharding')
+
+DEFAULT_SHARD_SIZE = 100_000
+
+
+@dataclass(frozen=True)
+class Shard:
+    index: int
+    start: int
+    count: int
+    entropy: int
+
+    @property
+    def stop(self) -> int:
+        return self.start + self.count
+
+    def seed_sequence(self) -> np.random.SeedSequence:
+        return np.random.SeedSequence(self.entropy, spawn_key=(self.index,))
+
+
+def plan_shards(num_records: int, shard_size: int = DEFAULT_SHARD_SIZE, seed: Optional[int] = None) -> List[Shard]:
+    """Split num_records into shards. Without a seed a fresh base entropy is drawn once."""
+    if shard_size < 1:
+        raise ValueError("shard_size must be positive")
+    entropy = int(seed) if seed is not None else np.random.SeedSequence().entropy
+    return [
+        Shard(i, start, min(shard_size, num_records - start), entropy)
+        for i, start in enumerate(range(0, num_records, shard_size))
+    ]
+
+
+def flatten_batches(items: Iterable[Any]) -> Iterator[Dict[str, Any]]:
+    """Records from a stream that may mix single records and batches."""
+    for item in items:
+        if isinstance(item, list):
+            yield from item
+        else:
+            yield item
+
+
+def _resolve(rfd: Dict, workers: Optional[int], shard_size: Optional[int], seed: Optional[int]):
+    workers = workers or int(os.getenv("GEN_WORKERS", "1"))
+    shard_size = shard_size or int(rfd.get("shard_size") or os.getenv("GEN_SHARD_SIZE", DEFAULT_SHARD_SIZE))
+    seed = seed if seed is not None else rfd.get("seed")
+    return workers, plan_shards(rfd.get("num_records", 0), shard_size, seed)
+
+
+def _pool(workers: int) -> ProcessPoolExecutor:
+    # spawn: the solver runs worker threads, and forking a threaded process is unsafe
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def _run_shard(generator: type, rfd: Dict, shard: Shard) -> List[Dict[str, Any]]:
+    return list(flatten_batches(generator.iter_shard(rfd, shard)))
+
+
+def _write_shard(generator: type, rfd: Dict, shard: Shard, path_stem: str, fmt: str) -> str:
+    with open_writer(fmt, f"{path_stem}.part{shard.index:05d}") as writer:
+        writer.write(generator.iter_shard(rfd, shard))
+    return writer.path
+
+
+def generate_sharded(generator: type, rfd: Dict, *, workers: Optional[int] = None,
+                     shard_size: Optional[int] = None, seed: Optional[int] = None) -> Iterator[Any]:
+    """Yield the dataset shard by shard, in order.
+
+    workers defaults to $GEN_WORKERS (1 = run inline in this process, fully
+    streaming). With more workers each shard is built in a child process and
+    at most 2×workers shards are in flight, which bounds memory.
+    """
+    workers, shards = _resolve(rfd, workers, shard_size, seed)
+    if workers <= 1 or len(shards) <= 1:
+        for shard in shards:
+            yield from generator.iter_shard(rfd, shard)
+        return
+
+    logger.info(f"Generating {len(shards)} shards on {workers} processes")
+    with _pool(workers) as pool:
+        pending = []
+        for shard in shards:
+            pending.append(pool.submit(_run_shard, generator, rfd, shard))
+            if len(pending) >= 2 * workers:
+                yield pending.pop(0).result()
+        for future in pending:
+            yield future.result()
+
+
+def write_sharded(generator: type, rfd: Dict, path_stem: str, fmt: str = "jsonl", *,
+                  workers: Optional[int] = None, shard_size: Optional[int] = None,
+                  seed: Optional[int] = None) -> List[str]:
+    """Have every shard write its own file (<stem>.partNNNNN<ext>); returns the paths in shard order."""
+    workers, shards = _resolve(rfd, workers, shard_size, seed)
+    if workers <= 1 or len(shards) <= 1:
+        return [_write_shard(generator, rfd, shard, path_stem, fmt) for shard in shards]
+    with _pool(workers) as pool:
+        return list(pool.map(_write_shard, *zip(*[(generator, rfd, s, path_stem, fmt) for s in shards])))
@@ -0,0 +1,346 @@
+"""Vectorised text generation for string fields.
+
+A string field schema is compiled once into a column generator (record
+indices -> list of strings), the same shape as MockProvider's compiled
+columns. Every placeholder is drawn for the whole batch with NumPy and the
+pieces are joined with one str.format per record.
+
+Schema keys, in order of precedence:
+
+    enum        pick uniformly from the listed values
+    template    pattern with placeholders (see below)
+    corpus      seed text for a Markov chain ("order", "min_words", "max_words")
+    words       word list for {word}; without a template, 1-3 words are joined
+    format      email / uri / date / date-time / uuid / name
+    otherwise   inferred from the field name/description (name, city, email,
+                description, title, …), falling back to "<adjective> <noun>";
+                name hints match whole words of the name, the last one first
+
+maxLength truncates the result.
+
+Placeholders (str.format syntax, {{ and }} escape braces):
+
+    {first_name} {last_name} {city} {country} {company} {domain} {street}
+    {adjective} {noun} {verb} {color} {word}    word lists
+    {int:10-99}  {digits:6}  {choice:red|green|blue}  {index}
+    {sentence}   one Markov sentence (the field's corpus, or the built-in one)
+"""
+
+import re
+import string
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+# A compiled column: record indices -> one value per index
+Column = Callable[[np.ndarray], List[Any]]
+
+WORD_LISTS: Dict[str, Tuple[str, ...]] = {
+    "first_name": (
+        "James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda", "David", "Elizabeth",
+        "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Charles", "Karen",
+        "Daniel", "Lisa", "Matthew", "Nancy", "Anthony", "Sandra", "Mark", "Ashley", "Steven", "Emily",
+        "Andrew", "Donna", "Joshua", "Michelle", "Kenji", "Aiko", "Mateo", "Sofia", "Lucas", "Amara",
+        "Noah", "Olivia", "Liam", "Emma", "Arjun", "Priya", "Wei", "Mei", "Omar", "Leila",
+    ),
+    "last_name": (
+        "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+        "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin",
+        "Lee", "Perez", "Thompson", "White", "Harris", "Sanchez", "Clark", "Ramirez", "Lewis", "Robinson",
+        "Walker", "Young", "Allen", "King", "Wright", "Scott", "Nguyen", "Hill", "Flores", "Green",
+        "Tanaka", "Sato", "Kim", "Park", "Chen", "Wang", "Singh", "Patel", "Okafor", "Haddad",
+    ),
+    "city": (
+        "London", "Paris", "Berlin", "Madrid", "Rome", "Lisbon", "Amsterdam", "Vienna", "Prague", "Warsaw",
+        "New York", "Chicago", "Austin", "Seattle", "Denver", "Boston", "Toronto", "Vancouver", "Mexico City",
+        "São Paulo", "Buenos Aires", "Lagos", "Nairobi", "Cairo", "Dubai", "Mumbai", "Bangalore", "Singapore",
+        "Tokyo", "Osaka", "Seoul", "Shanghai", "Sydney", "Melbourne", "Auckland",
+    ),
+    "country": (
+        "United Kingdom", "France", "Germany", "Spain", "Italy", "Portugal", "Netherlands", "Austria", "Poland",
+        "United States", "Canada", "Mexico", "Brazil", "Argentina", "Nigeria", "Kenya", "Egypt", "India",
+        "Singapore", "Japan", "South Korea", "China", "Australia", "New Zealand",
+    ),
+    "company": (
+        "Acme", "Globex", "Initech", "Umbrella", "Stark Industries", "Wayne Enterprises", "Hooli", "Vandelay",
+        "Soylent", "Tyrell", "Cyberdyne", "Aperture", "Wonka", "Massive Dynamic", "Oscorp", "Pied Piper",
+        "Nakatomi", "Gringotts", "Monarch", "Blue Sun",
+    ),
+    "domain": ("example.com", "example.org", "example.net", "mail.test", "corp.test", "inbox.test"),
+    "street": (
+        "Main St", "High St", "Oak Ave", "Maple Rd", "Cedar Ln", "Park Blvd", "Elm St", "Pine Ct",
+        "Lake Dr", "Hill Rd", "Station Rd", "Church Ln", "Mill Way", "River Rd", "King St",
+    ),
+    "adjective": (
+        "quick", "bright", "quiet", "modern", "classic", "reliable", "compact", "durable", "elegant", "smart",
+        "simple", "bold", "fresh", "gentle", "robust", "sleek", "vivid", "warm", "lightweight", "premium",
+    ),
+    "noun": (
+        "system", "device", "service", "platform", "product", "network", "report", "account", "order", "invoice",
+        "module", "engine", "dashboard", "sensor", "wallet", "ledger", "portal", "pipeline", "widget", "gateway",
+    ),
+    "verb": (
+        "builds", "tracks", "delivers", "supports", "improves", "connects", "measures", "handles", "simplifies",
+        "secures", "streams", "updates", "powers", "reduces", "manages",
+    ),
+    "color": (
+        "red", "orange", "yellow", "green", "teal", "blue", "indigo", "violet", "black", "white", "grey", "silver",
+    ),
+}
+
+SEED_CORPUS = (
+    "The new dashboard makes it easy to track every order in real time. Customers love how quickly the team "
+    "responds to questions. Delivery was fast and the packaging was solid. The product works as described and "
+    "the battery lasts all day. Setup took only a few minutes and the instructions were clear. Support helped "
+    "me fix a billing issue within the hour. The price is fair for the quality you get. I would recommend this "
+    "service to anyone who needs a reliable platform. The latest update improved performance and fixed several "
+    "bugs. Reports are generated every morning and sent to the whole team. Our network traffic dropped after "
+    "we switched to the new gateway. The sensor data is accurate and the readings are stable. The app crashed "
+    "once but the team released a fix the next day. Overall the experience was smooth and the results were "
+    "better than expected. The platform handles thousands of requests per second without any issues. Each "
+    "account has its own ledger and every transaction is recorded. The quiet design fits well in a small office. "
+    "Returns are simple and the refund arrived quickly."
+)
+
+_NAME_HINTS: Sequence[Tuple[Tuple[str, ...], str]] = (
+    (("email", "e-mail", "email_address"), "{first_name}.{last_name}{int:1-999}@{domain}"),
+    (("first_name", "firstname", "given"), "{first_name}"),
+    (("last_name", "lastname", "surname", "family"), "{last_name}"),
+    (("username", "user_name", "handle", "login"), "{first_name}{last_name}{int:10-99}"),
+    (("name", "author", "customer", "user", "person", "owner"), "{first_name} {last_name}"),
+    (("city", "town"), "{city}"),
+    (("country", "nation"), "{country}"),
+    (("address", "street"), "{int:1-999} {street}, {city}"),
+    (("company", "company_name", "organisation", "organization", "brand", "vendor"), "{company}"),
+    (("phone", "mobile", "tel"), "+1-{int:200-999}-{int:200-999}-{digits:4}"),
+    (("color", "colour"), "{color}"),
+    (("url", "uri", "link", "website"), "https://{domain}/{noun}/{index}"),
+    (("id", "code", "sku", "reference"), "{choice:AX|BX|CX|DX}-{digits:6}"),
+    (("title", "headline", "subject", "label"), "{adjective} {noun}"),
+    (("description", "text", "comment", "review", "summary", "content", "body", "message", "note",
+      "bio", "feedback", "sentence", "paragraph"), "{sentence}"),
+)
+
+_FORMATS = {
+    "email": "{first_name}.{last_name}{int:1-999}@{domain}",
+    "uri": "https://{domain}/{noun}/{index}",
+    "url": "https://{domain}/{noun}/{index}",
+    "name": "{first_name} {last_name}",
+}
+
+_INT_SPEC = re.compile(r"^\s*(-?\d+)\s*-\s*(-?\d+)\s*$")
+_FORMATTER = string.Formatter()
+
+
+class MarkovChain:
+    """Word-level Markov chain stored as CSR arrays, sampled for many sentences at once.
+
+    States are word n-grams of length `order`. Every transition stores both
+    the next word and the state it leads to, so a step for a whole batch is
+    two fancy-indexing operations.
+    """
+
+    def __init__(self, corpus: str, order: int = 1):
+        tokens = corpus.split()
+        if len(tokens) <= order:
+            raise ValueError("corpus is too short for a Markov chain of this order")
+        self.order = order
+        self.vocab = np.array(sorted(set(tokens)), dtype=object)
+        word_id = {w: i for i, w in enumerate(self.vocab.tolist())}
+        ids = [word_id[t] for t in tokens]
+        self.is_end = np.array([w[-1] in ".!?" for w in self.vocab.tolist()])
+        # ids >= len(vocab) are the capitalised forms, used for the first word of a sentence
+        self._table = np.concatenate([self.vocab, [w[:1].upper() + w[1:] for w in self.vocab.tolist()]])
+
+        # the corpus wraps around, so every state has a successor
+        n = len(ids)
+        ring = ids + ids[:order]
+        grams = [tuple(ring[i:i + order]) for i in range(n)]
+        state_id: Dict[Tuple[int, ...], int] = {}
+        for gram in grams:
+            state_id.setdefault(gram, len(state_id))
+        self.state_grams = np.array(list(state_id), dtype=np.int64).reshape(len(state_id), order)
+
+        src = np.array([state_id[g] for g in grams], dtype=np.int64)
+        by_state = np.argsort(src, kind="stable")
+        self.next_word = np.array([ring[i + order] for i in range(n)], dtype=np.int64)[by_state]
+        self.next_state = np.array([state_id[grams[(i + 1) % n]] for i in range(n)], dtype=np.int64)[by_state]
+        self.counts = np.bincount(src, minlength=len(state_id))
+        self.offsets = np.concatenate([[0], np.cumsum(self.counts)[:-1]])
+
+        # sentences start at the corpus start and after every word ending in . ! ?
+        starts = {0} | {(i + 1) % n for i in range(n) if tokens[i][-1] in ".!?"}
+        self.start_states = np.array(sorted({state_id[grams[i]] for i in starts}), dtype=np.int64)
+
+    def sample(self, rng: np.random.Generator, n: int, min_words: int = 8, max_words: int = 20) -> List[str]:
+        """n sentences, each ending at the first sentence end after min_words (at most max_words)."""
+        min_words = max(min_words, self.order)
+        width = max(max_words, min_words)
+        words = np.empty((n, width), dtype=np.int64)
+        state = self.start_states[rng.integers(0, len(self.start_states), n)]
+        words[:, :self.order] = self.state_grams[state]           # a start state spells its first words
+        for col in range(self.order, width):
+            pick = self.offsets[state] + (rng.random(n) * self.counts[state]).astype(np.int64)
+            words[:, col] = self.next_word[pick]
+            state = self.next_state[pick]
+
+        ends = self.is_end[words]
+        ends[:, :min_words - 1] = False
+        complete = ends.any(axis=1)
+        lengths = np.where(complete, ends.argmax(axis=1) + 1, width)
+        words[:, 0] += len(self.vocab)
+        rows = self._table[words].tolist()
+        return [
+            " ".join(row[:k]) if done else " ".join(row[:k]).rstrip(",;:") + "."
+            for row, k, done in zip(rows, lengths.tolist(), complete.tolist())
+        ]
+
+
+_CHAINS: Dict[Tuple[str, int], MarkovChain] = {}
+
+
+def markov_chain(corpus: str = SEED_CORPUS, order: int = 1) -> MarkovChain:
+    """Chain for a corpus, built once per process."""
+    key = (corpus, order)
+    if key not in _CHAINS:
+        _CHAINS[key] = MarkovChain(corpus, order)
+    return _CHAINS[key]
+
+
+def _placeholder(name: str, spec: str, field_schema: Dict[str, Any],
+                 rng: np.random.Generator) -> Tuple[str, Callable[[np.ndarray], Any]]:
+    """Format slot and column generator (record indices -> sequence of values) for one placeholder."""
+    if name == "digits":                               # zero-padding is left to str.format
+        width = int(spec or 6)
+        return f"{{:0{width}d}}", lambda idx: rng.integers(0, 10 ** width, len(idx)).tolist()
+    return "{}", _placeholder_column(name, spec, field_schema, rng)
+
+
+def _placeholder_column(name: str, spec: str, field_schema: Dict[str, Any],
+                        rng: np.random.Generator) -> Callable[[np.ndarray], Any]:
+    if name == "index":
+        return lambda idx: idx.tolist()
+    if name == "int":
+        match = _INT_SPEC.match(spec or "0-9999")
+        if not match:
+            raise ValueError(f"Bad int range: {spec!r} (expected e.g. 10-99)")
+        lo, hi = int(match.group(1)), int(match.group(2))
+        return lambda idx: rng.integers(lo, hi + 1, len(idx)).tolist()
+    if name == "choice":
+        options = np.array(spec.split("|"), dtype=object)
+        return lambda idx: options[rng.integers(0, len(options), len(idx))]
+    if name == "sentence":
+        chain = markov_chain(field_schema.get("corpus", SEED_CORPUS), int(field_schema.get("order", 1)))
+        lo, hi = int(field_schema.get("min_words", 8)), int(field_schema.get("max_words", 20))
+        return lambda idx: chain.sample(rng, len(idx), lo, hi)
+    words = field_schema.get("words") if name == "word" else WORD_LISTS.get(name)
+    if name == "word" and not words:
+        words = sorted(set(SEED_CORPUS.lower().replace(".", "").split()))
+    if not words:
+        raise ValueError(f"Unknown placeholder: {{{name}}}")
+    table = np.array(list(words), dtype=object)
+    return lambda idx: table[rng.integers(0, len(table), len(idx))]
+
+
+def compile_template(template: str, field_schema: Dict[str, Any], rng: np.random.Generator) -> Column:
+    """Compile a placeholder template into a column generator."""
+    fmt, parts = [], []
+    for literal, name, spec, _ in _FORMATTER.parse(template):
+        fmt.append(literal.replace("{", "{{").replace("}", "}}"))
+        if name is not None:
+            slot, part = _placeholder(name, spec, field_schema, rng)
+            fmt.append(slot)
+            parts.append(part)
+    fmt_str = "".join(fmt)
+    if not parts:
+        return lambda idx: [fmt_str.format()] * len(idx)
+    if fmt_str == "{}":
+        only = parts[0]
+        return lambda idx: list(only(idx))
+    return lambda idx: list(map(fmt_str.format, *(part(idx) for part in parts)))
+
+
+_CAMEL = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+
+
+def _words(name: str) -> Tuple[str, ...]:
+    """Lower-case words of a field name: snake_case, kebab-case and camelCase are split."""
+    return tuple(w for w in re.split(r"[^a-z0-9]+", _CAMEL.sub("_", name).lower()) if w)
+
+
+def _same_word(word: str, hint: str) -> bool:
+    return word == hint or (word.endswith("s") and word[:-1] == hint)   # "notes" is a note
+
+
+def _infer_template(field: str, field_schema: Dict[str, Any]) -> str:
+    # The head noun decides: words are tried from the last one back
+    # ("customer_review" is a review, not a customer), and at each position the
+    # longest matching hint wins ("email_address" is an email, not an address).
+    words = _words(field)
+    for end in range(len(words), 0, -1):
+        best: Tuple[int, str] = (0, "")
+        for hints, template in _NAME_HINTS:
+            for hint in map(_words, hints):
+                n = len(hint)
+                if best[0] < n <= end and all(map(_same_word, words[end - n:end], hint)):
+                    best = (n, template)
+        if best[0]:
+            return best[1]
+    description = str(field_schema.get("description", "")).lower()
+    for hints, template in _NAME_HINTS:
+        if any(re.search(rf"\b{re.escape(hint)}\b", description) for hint in hints):
+            return template
+    return "{adjective} {noun}"
+
+
+def compile_text(field_schema: Dict[str, Any], seed: np.random.SeedSequence, field: str = "") -> Column:
+    """Compile a string field schema into a column generator.
+
+    Args:
+        field_schema: The schema for the field
+        seed: Seed sequence for this column
+        field: Field name, used to infer a template when the schema has none
+
+    Returns:
+        Function mapping an array of record indices to a list of strings
+    """
+    rng = np.random.default_rng(seed)
+    fmt = field_schema.get("format", "")
+
+    if field_schema.get("enum"):
+        options = np.array(field_schema["enum"], dtype=object)
+        column = lambda idx: options[rng.integers(0, len(options), len(idx))].tolist()
+    elif "template" in field_schema:
+        column = compile_template(field_schema["template"], field_schema, rng)
+    elif "corpus" in field_schema:
+        column = compile_template("{sentence}", field_schema, rng)
+    elif field_schema.get("words"):
+        words = np.array(list(field_schema["words"]), dtype=object)
+
+        def column(idx: np.ndarray) -> List[str]:
+            picks = words[rng.integers(0, len(words), (len(idx), 3))].tolist()
+            counts = rng.integers(1, 4, len(idx)).tolist()
+            return [" ".join(row[:k]) for row, k in zip(picks, counts)]
+    elif "date" in fmt:
+        days = np.datetime64("2024-01-01") + np.arange(366)
+        if fmt == "date-time":
+            column = lambda idx: [
+                f"{d}T{s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}Z"
+                for d, s in zip(days[rng.integers(0, 366, len(idx))].astype(str).tolist(),
+                                rng.integers(0, 86400, len(idx)).tolist())
+            ]
+        else:
+            column = lambda idx: days[rng.integers(0, 366, len(idx))].astype(str).tolist()
+    elif fmt == "uuid":
+        column = lambda idx: [
+            f"{h[:8]}-{h[8:12]}-4{h[13:16]}-{'89ab'[int(h[16], 16) % 4]}{h[17:20]}-{h[20:32]}"
+            for h in (rng.bytes(16 * len(idx)).hex()[i:i + 32] for i in range(0, 32 * len(idx), 32))
+        ]
+    else:
+        column = compile_template(_FORMATS.get(fmt) or _infer_template(field, field_schema), field_schema, rng)
+
+    max_length = field_schema.get("maxLength")
+    if max_length:
+        inner = column
+        column = lambda idx: [s[:max_length] for s in inner(idx)]
+    return column
@@ -0,0 +1,75 @@
+# datasolver/util/aws.py
+"""Lazily created, process-wide boto3 DynamoDB handles.
+
+boto3 is imported on first use. The low-level client is thread-safe and
+shared by every thread; resources are not, so each thread gets its own
+(built from its own Session, as boto3 recommends).
+"""
+
+import os, logging, threading
+
+log = logging.getLogger("aws")
+
+_LOCK    = threading.Lock()
+_CLIENTS = {}
+_LOCAL   = threading.local()
+_GEN     = 0                                              # bumped by reset()
+
+
+def _config():
+    from botocore.config import Config
+    return Config(
+        max_pool_connections=int(os.getenv("DYNAMODB_MAX_POOL", "50")),
+        retries={
+            "max_attempts": int(os.getenv("DYNAMODB_MAX_ATTEMPTS", "10")),
+            "mode":         os.getenv("DYNAMODB_RETRY_MODE", "standard"),
+        },
+        connect_timeout=float(os.getenv("DYNAMODB_CONNECT_TIMEOUT", "5")),
+        read_timeout=float(os.getenv("DYNAMODB_READ_TIMEOUT", "30")),
+    )
+
+
+def _kwargs():
+    kw = {"config": _config()}
+    if os.getenv("DYNAMODB_ENDPOINT_URL"):                # DynamoDB Local / stand-ins
+        kw["endpoint_url"] = os.environ["DYNAMODB_ENDPOINT_URL"]
+    return kw
+
+
+def _key():
+    return os.getenv("AWS_DEFAULT_REGION"), os.getenv("DYNAMODB_ENDPOINT_URL")
+
+
+def dynamodb_client():
+    """Shared, thread-safe low-level DynamoDB client."""
+    key = _key()
+    client = _CLIENTS.get(key)
+    if client is None:
+        with _LOCK:
+            client = _CLIENTS.get(key)
+            if client is None:
+                import boto3
+                log.info("creating DynamoDB client (region=%s endpoint=%s)", *key)
+                client = _CLIENTS[key] = boto3.session.Session().client("dynamodb", **_kwargs())
+    return client
+
+
+def dynamodb_resource():
+    """DynamoDB resource for the calling thread."""
+    key = _key()
+    if getattr(_LOCAL, "gen", None) != _GEN:
+        _LOCAL.resources, _LOCAL.gen = {}, _GEN
+    cache = _LOCAL.resources
+    if key not in cache:
+        import boto3
+        with _LOCK:                                      # Session setup reads shared loader state
+            cache[key] = boto3.session.Session().resource("dynamodb", **_kwargs())
+    return cache[key]
+
+
+def reset():
+    """Forget every cached handle (tests, credential rotation)."""
+    global _GEN
+    with _LOCK:
+        _CLIENTS.clear()
+        _GEN += 1
@@ -1,6 +1,8 @@
 # datasolver/util/http.py
 import httpx, functools, logging
 
+from datasolver import deadline
+
 log = logging.getLogger("http")
 
 @functools.cache
@@ -9,6 +11,7 @@ def _client() -> httpx.Client:
 
 def get(url: str, **kw):
     log.info(f"HTTP GET {url}")
+    kw.setdefault("timeout", deadline.timeout(10))
     r = _client().get(url, **kw)
     r.raise_for_status()
     return r.json()
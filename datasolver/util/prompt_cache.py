@@ -0,0 +1,68 @@
+# datasolver/util/prompt_cache.py
+"""Persistent prompt → completion cache (sqlite, LRU-bounded)."""
+
+import hashlib, json, sqlite3, threading, time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+CACHE_PATH = Path(__file__).resolve().parents[2] / "state" / "prompt_cache.db"
+
+
+def cache_key(model: str, prompt: str, params: Dict[str, Any], seed: Optional[int]) -> str:
+    blob = json.dumps([model, prompt, params, seed], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+class PromptCache:
+    """key → list of completions; least recently used entries go beyond max_entries."""
+
+    def __init__(self, path: Optional[Path] = None, max_entries: int = 100_000) -> None:
+        self.path        = Path(path or CACHE_PATH)
+        self.max_entries = max_entries
+        self._lock       = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, sqlite3.connect(self.path) as c:
+            c.execute(
+                "CREATE TABLE IF NOT EXISTS completions ("
+                " key       TEXT PRIMARY KEY,"
+                " texts     TEXT NOT NULL,"
+                " last_used REAL NOT NULL)"
+            )
+            c.execute("CREATE INDEX IF NOT EXISTS completions_lru ON completions (last_used)")
+            c.commit()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, List[str]]:
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+        found: Dict[str, List[str]] = {}
+        with self._lock, sqlite3.connect(self.path) as c:
+            for i in range(0, len(keys), 500):                 # stay under sqlite's variable limit
+                chunk = keys[i:i + 500]
+                marks = ",".join("?" * len(chunk))
+                for key, texts in c.execute(f"SELECT key, texts FROM completions WHERE key IN ({marks})", chunk):
+                    found[key] = json.loads(texts)
+                c.execute(f"UPDATE completions SET last_used=? WHERE key IN ({marks})", [time.time(), *chunk])
+            c.commit()
+        return found
+
+    def put_many(self, items: Dict[str, List[str]]) -> None:
+        if not items:
+            return
+        now = time.time()
+        with self._lock, sqlite3.connect(self.path) as c:
+            c.executemany(
+                "INSERT OR REPLACE INTO completions (key, texts, last_used) VALUES (?, ?, ?)",
+                [(k, json.dumps(v), now) for k, v in items.items()],
+            )
+            excess = c.execute("SELECT COUNT(*) FROM completions").fetchone()[0] - self.max_entries
+            if excess > 0:
+                c.execute(
+                    "DELETE FROM completions WHERE key IN "
+                    "(SELECT key FROM completions ORDER BY last_used ASC LIMIT ?)", (excess,)
+                )
+            c.commit()
+
+    def __len__(self) -> int:
+        with self._lock, sqlite3.connect(self.path) as c:
+            return c.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
@@ -0,0 +1,319 @@
+# datasolver/util/resilience.py
+"""Resilient JSON fetches from upstream data sources.
+
+Upstream.get_json(url) wraps an idempotent GET with
+
+  hedging      if the first request hasn't answered after the host's p95
+               latency (a default until enough samples are seen), a second
+               identical request is sent and the first answer wins
+  breakers     one CircuitBreaker per host: after `failures` consecutive
+               failures it opens and calls fail fast for `cooldown` seconds,
+               then a single probe (half-open) decides whether it closes
+  fallback     the last good response per URL is kept; when the upstream
+               fails or its breaker is open, that snapshot is returned
+               (if younger than `max_age`) instead of raising
+
+Only timeouts, connection errors and 5xx responses are failures of the
+host. Anything else (a 4xx, a malformed body) is a problem with the
+request: it is raised as is, without a fallback and without touching the
+breaker.
+
+Attempt timeouts are capped by the RFD deadline (datasolver.deadline).
+status() exposes breaker state, latency estimates and counters.
+"""
+
+import hashlib, json, logging, os, threading, time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from datasolver import deadline
+
+log = logging.getLogger("upstream")
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class UpstreamUnavailable(RuntimeError):
+    """The upstream failed (or its breaker is open) and no usable snapshot exists."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker: closed → open → half-open → closed/open."""
+
+    def __init__(self, host: str, failures: int = 5, cooldown: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self.host      = host
+        self.failures  = failures
+        self.cooldown  = cooldown
+        self.clock     = clock
+        self.state     = CLOSED
+        self.consecutive = 0
+        self.opened_at: Optional[float] = None
+        self.trips     = 0
+        self._probing  = False
+        self._lock     = threading.Lock()
+
+    def allow(self) -> bool:
+        """May a request go out now? In half-open only one probe at a time is let through."""
+        with self._lock:
+            if self.state == OPEN and self.clock() - self.opened_at >= self.cooldown:
+                self._set(HALF_OPEN)
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def success(self) -> None:
+        with self._lock:
+            self.consecutive = 0
+            self._probing = False
+            if self.state != CLOSED:
+                self._set(CLOSED)
+
+    def failure(self) -> None:
+        with self._lock:
+            self.consecutive += 1
+            self._probing = False
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.consecutive >= self.failures):
+                self.opened_at = self.clock()
+                self.trips += 1
+                self._set(OPEN)
+
+    def release(self) -> None:
+        """Neither success nor failure (e.g. the caller gave up); frees a half-open probe."""
+        with self._lock:
+            self._probing = False
+
+    def _set(self, state: str) -> None:
+        log.warning("circuit for %s: %s → %s", self.host, self.state, state)
+        self.state = state
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            retry_in = (max(0.0, self.cooldown - (self.clock() - self.opened_at))
+                        if self.state == OPEN else 0.0)
+            return {"state": self.state, "consecutive_failures": self.consecutive,
+                    "trips": self.trips, "retry_in": round(retry_in, 3)}
+
+
+class _Latency:
+    """Recent successful latencies of one host."""
+
+    def __init__(self, window: int) -> None:
+        self.values: Deque[float] = deque(maxlen=window)
+
+    def quantile(self, q: float) -> float:
+        values = sorted(self.values)
+        return values[min(len(values) - 1, int(q * len(values)))]
+
+
+class Upstream:
+    """Hedged, breaker-guarded GETs with last-good-snapshot fallback."""
+
+    def __init__(
+        self,
+        *,
+        fetch: Optional[Callable[[str, float], Any]] = None,   # (url, timeout) → parsed JSON
+        timeout:       float = 10.0,
+        hedge_quantile: float = 0.95,
+        hedge_after:   Optional[float] = None,          # hedge delay until min_samples are seen
+        min_samples:   int = 20,
+        window:        int = 200,
+        failures:      Optional[int] = None,
+        cooldown:      Optional[float] = None,
+        max_age:       Optional[float] = None,          # seconds a snapshot may be served for
+        snapshot_dir:  Optional[Path] = None,           # also keep snapshots on disk
+        max_workers:   int = 8,
+    ) -> None:
+        self.fetch          = fetch or _requests_json
+        self.timeout        = timeout
+        self.hedge_quantile = hedge_quantile
+        self.hedge_after    = hedge_after if hedge_after is not None else float(os.getenv("UPSTREAM_HEDGE_AFTER_S", "1.0"))
+        self.min_samples    = min_samples
+        self.window         = window
+        self.failures       = failures or int(os.getenv("UPSTREAM_BREAKER_FAILURES", "5"))
+        self.cooldown       = cooldown if cooldown is not None else float(os.getenv("UPSTREAM_BREAKER_COOLDOWN_S", "30"))
+        self.max_age        = max_age if max_age is not None else float(os.getenv("UPSTREAM_SNAPSHOT_MAX_AGE_S", "86400"))
+        snapshot_dir        = snapshot_dir or os.getenv("UPSTREAM_SNAPSHOT_DIR")
+        self.snapshot_dir   = Path(snapshot_dir) if snapshot_dir else None
+        self._pool          = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="upstream")
+        self._lock          = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._latency:  Dict[str, _Latency] = {}
+        self._snapshots: Dict[str, Tuple[float, Any]] = {}
+        self.counters = {"requests": 0, "hedges": 0, "hedge_wins": 0, "failures": 0,
+                         "short_circuits": 0, "fallbacks": 0}
+
+    # -------- public -------- #
+    def get_json(self, url: str) -> Any:
+        """GET `url` and parse JSON, hedged and breaker-guarded; fall back to the last good snapshot."""
+        host = urlsplit(url).netloc
+        try:
+            timeout = deadline.timeout(self.timeout)
+        except deadline.DeadlineExceeded as exc:
+            return self._fallback(url, exc)
+        breaker = self.breaker(host)
+        if not breaker.allow():
+            self._count("short_circuits")
+            return self._fallback(url, UpstreamUnavailable(f"circuit for {host} is open"))
+        try:
+            data = self._hedged(url, host, timeout)
+        except Exception as exc:
+            if not _is_outage(exc):
+                breaker.release()
+                raise
+            if timeout < self.timeout and deadline.expired():
+                # cut short by the RFD's budget, not evidence against the host
+                breaker.release()
+                exc = deadline.DeadlineExceeded(f"GET {url}: {exc}")
+            else:
+                breaker.failure()
+                self._count("failures")
+            log.warning("upstream %s failed: %s", url, exc)
+            return self._fallback(url, exc)
+        breaker.success()
+        self._store(url, data)
+        return data
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        with self._lock:
+            if host not in self._breakers:
+                self._breakers[host] = CircuitBreaker(host, self.failures, self.cooldown)
+                self._latency[host] = _Latency(self.window)
+            return self._breakers[host]
+
+    def hedge_delay(self, host: str) -> float:
+        """Seconds to wait before hedging: the host's p95 once enough samples exist."""
+        with self._lock:
+            latency = self._latency.get(host)
+            if latency is None or len(latency.values) < self.min_samples:
+                return self.hedge_after
+            return latency.quantile(self.hedge_quantile)
+
+    def status(self) -> Dict[str, Any]:
+        """Breaker state and latency per host, plus counters and snapshot ages."""
+        with self._lock:
+            breakers = dict(self._breakers)
+            snapshots = {url: round(time.time() - ts, 1) for url, (ts, _) in self._snapshots.items()}
+            counters = dict(self.counters)
+        hosts = {}
+        for host, breaker in breakers.items():
+            hosts[host] = {**breaker.snapshot(), "hedge_after": round(self.hedge_delay(host), 4)}
+        return {"hosts": hosts, "counters": counters, "snapshot_age_s": snapshots}
+
+    # -------- internals -------- #
+    def _hedged(self, url: str, host: str, timeout: float) -> Any:
+        until = time.monotonic() + timeout
+        start = time.monotonic()
+        self._count("requests")
+        pending = {self._pool.submit(self.fetch, url, timeout)}
+        done, pending = wait(pending, timeout=min(self.hedge_delay(host), timeout))
+        hedge = None
+        if not done:
+            # slow tail: race a second request against the first
+            self._count("hedges")
+            hedge = self._pool.submit(self.fetch, url, max(0.001, until - time.monotonic()))
+            pending.add(hedge)
+        error: Optional[BaseException] = None
+        while True:
+            for future in done:
+                if future.exception() is None:
+                    for loser in pending:
+                        loser.cancel()
+                    if future is hedge:
+                        self._count("hedge_wins")
+                    self._observe(host, time.monotonic() - start)
+                    return future.result()
+                error = future.exception()
+            if not pending:
+                raise error
+            left = until - time.monotonic()
+            if left <= 0:
+                raise TimeoutError(f"GET {url} timed out after {timeout:.3f}s")
+            done, pending = wait(pending, timeout=left, return_when=FIRST_COMPLETED)
+
+    def _observe(self, host: str, seconds: float) -> None:
+        with self._lock:
+            self._latency[host].values.append(seconds)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.counters[name] += 1
+
+    def _store(self, url: str, data: Any) -> None:
+        now = time.time()
+        with self._lock:
+            self._snapshots[url] = (now, data)
+        if self.snapshot_dir is not None:
+            path = self._snapshot_path(url)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"url": url, "ts": now, "data": data}))
+            tmp.replace(path)
+
+    def _load(self, url: str) -> Optional[Tuple[float, Any]]:
+        with self._lock:
+            snap = self._snapshots.get(url)
+        if snap is None and self.snapshot_dir is not None:
+            path = self._snapshot_path(url)
+            try:
+                blob = json.loads(path.read_text())
+                snap = (float(blob["ts"]), blob["data"])
+            except FileNotFoundError:
+                return None
+            except (OSError, ValueError, KeyError, TypeError) as exc:
+                log.warning("ignoring unreadable snapshot %s: %s", path, exc)
+                return None
+            with self._lock:
+                self._snapshots.setdefault(url, snap)
+        return snap
+
+    def _snapshot_path(self, url: str) -> Path:
+        return self.snapshot_dir / (hashlib.sha256(url.encode()).hexdigest()[:32] + ".json")
+
+    def _fallback(self, url: str, exc: BaseException) -> Any:
+        snap = self._load(url)
+        if snap is None or time.time() - snap[0] > self.max_age:
+            if isinstance(exc, deadline.DeadlineExceeded):
+                raise exc
+            raise UpstreamUnavailable(f"{url}: {exc} (no usable snapshot)") from exc
+        self._count("fallbacks")
+        log.warning("serving %s from snapshot taken %.0fs ago (%s)", url, time.time() - snap[0], exc)
+        return snap[1]
+
+
+@lru_cache(maxsize=None)
+def _transient_errors() -> Tuple[type, ...]:
+    errors: Tuple[type, ...] = (TimeoutError, ConnectionError)
+    try:
+        import requests
+        errors += (requests.ConnectionError, requests.Timeout)
+    except ImportError:
+        pass
+    try:
+        import httpx
+        errors += (httpx.TimeoutException, httpx.NetworkError)
+    except ImportError:
+        pass
+    return errors
+
+
+def _is_outage(exc: BaseException) -> bool:
+    """Does `exc` say the host is in trouble (timeout, connection error, 5xx)?"""
+    status = getattr(getattr(exc, "response", None), "status_code", None)
+    if status is not None:
+        return status >= 500
+    return isinstance(exc, _transient_errors())
+
+
+def _requests_json(url: str, timeout: float) -> Any:
+    import requests
+    resp = requests.get(url, timeout=timeout)
+    resp.raise_for_status()
+    return resp.json()
@@ -0,0 +1,230 @@
+"""Dataset output formats.
+
+Writers are streaming sinks: records go in batch by batch and are encoded as
+they arrive, so a dataset never has to be serialised in one piece.
+
+    json        pretty-printed {"data": [...]} (the historical format)
+    jsonl       one compact record per line
+    jsonl.gz    JSON Lines, gzip
+    jsonl.zst   JSON Lines, zstd (needs the `zstd` extra, or Python ≥ 3.14)
+    parquet     columnar, zstd-compressed (needs the `parquet` extra)
+"""
+
+import os
+import gzip
+import json
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, List, Optional, Type
+
+logger = logging.getLogger('DatasetWriter')
+
+DEFAULT_FORMAT = "json"
+
+
+def _zstd():
+    try:
+        from compression import zstd          # Python 3.14+
+        return zstd
+    except ImportError:
+        pass
+    try:
+        import zstandard
+        return zstandard
+    except ImportError:
+        return None
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        return pyarrow
+    except ImportError:
+        return None
+
+
+class DatasetWriter(ABC):
+    """Base class for output formats.
+
+    Use as a context manager; the file is complete once the writer is closed.
+    """
+
+    extension: str = ""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+
+    @classmethod
+    def available(cls) -> bool:
+        """Whether the optional dependencies for this format are installed."""
+        return True
+
+    @abstractmethod
+    def write_batch(self, records: List[Dict[str, Any]]) -> None:
+        """Append a batch of records."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Flush and finalise the file."""
+
+    def write(self, records: Iterable[Dict[str, Any]], batch_size: int = 1000) -> None:
+        """Append records from any iterable, batching them.
+
+        Items that are lists are taken as ready-made batches.
+        """
+        batch: List[Dict[str, Any]] = []
+        for record in records:
+            if isinstance(record, list):
+                if batch:
+                    self.write_batch(batch)
+                    batch = []
+                if record:
+                    self.write_batch(record)
+                continue
+            batch.append(record)
+            if len(batch) >= batch_size:
+                self.write_batch(batch)
+                batch = []
+        if batch:
+            self.write_batch(batch)
+
+    def __enter__(self) -> "DatasetWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class JsonWriter(DatasetWriter):
+    """Byte-identical to json.dump({"data": records}, f, indent=2), written incrementally."""
+
+    extension = ".json"
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._fh = open(path, "w")
+        self._fh.write('{\n  "data": [')
+
+    def write_batch(self, records: List[Dict[str, Any]]) -> None:
+        for record in records:
+            body = json.dumps(record, indent=2).replace("\n", "\n    ")
+            self._fh.write(("," if self.count else "") + "\n    " + body)
+            self.count += 1
+
+    def close(self) -> None:
+        if self._fh.closed:
+            return
+        self._fh.write("\n  ]\n}" if self.count else "]\n}")
+        self._fh.close()
+
+
+class JsonLinesWriter(DatasetWriter):
+    extension = ".jsonl"
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._fh = self._open(path)
+
+    def _open(self, path: str):
+        return open(path, "wb")
+
+    def write_batch(self, records: List[Dict[str, Any]]) -> None:
+        self._fh.write("".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records).encode())
+        self.count += len(records)
+
+    def close(self) -> None:
+        self._fh.close()
+
+
+class GzipJsonLinesWriter(JsonLinesWriter):
+    extension = ".jsonl.gz"
+
+    def _open(self, path: str):
+        return gzip.open(path, "wb", compresslevel=6)
+
+
+class ZstdJsonLinesWriter(JsonLinesWriter):
+    extension = ".jsonl.zst"
+
+    @classmethod
+    def available(cls) -> bool:
+        return _zstd() is not None
+
+    def _open(self, path: str):
+        zstd = _zstd()
+        self._raw = None
+        if zstd.__name__ == "zstandard":
+            self._raw = open(path, "wb")
+            return zstd.ZstdCompressor(level=3).stream_writer(self._raw)
+        return zstd.open(path, "wb", level=3)
+
+    def close(self) -> None:
+        self._fh.close()
+        if self._raw is not None and not self._raw.closed:
+            self._raw.close()
+
+
+class ParquetWriter(DatasetWriter):
+    extension = ".parquet"
+
+    @classmethod
+    def available(cls) -> bool:
+        return _pyarrow() is not None
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._pa = _pyarrow()
+        self._writer = None
+
+    def write_batch(self, records: List[Dict[str, Any]]) -> None:
+        if self._writer is None:                       # schema comes from the first batch
+            table = self._pa.Table.from_pylist(records)
+            self._writer = self._pa.parquet.ParquetWriter(self.path, table.schema, compression="zstd")
+        else:
+            table = self._pa.Table.from_pylist(records, schema=self._writer.schema)
+        self._writer.write_table(table)
+        self.count += len(records)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        elif not os.path.exists(self.path):            # no rows: still leave a valid file
+            pa = self._pa
+            pa.parquet.write_table(pa.table({}), self.path)
+
+
+FORMATS: Dict[str, Type[DatasetWriter]] = {
+    "json":      JsonWriter,
+    "jsonl":     JsonLinesWriter,
+    "jsonl.gz":  GzipJsonLinesWriter,
+    "jsonl.zst": ZstdJsonLinesWriter,
+    "parquet":   ParquetWriter,
+}
+
+FALLBACK_FORMAT = "jsonl.gz"
+
+
+def resolve_format(rfd: Dict, default: Optional[str] = None) -> str:
+    """Pick the output format: rfd["output_format"] > $DATASET_FORMAT > default > json.
+
+    The environment overrides the configured `default`, as it does for the
+    rest of DataSolver's config. Formats whose optional dependency is
+    missing fall back to jsonl.gz.
+    """
+    fmt = (rfd.get("output_format") or os.getenv("DATASET_FORMAT") or default or DEFAULT_FORMAT).lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown output format: {fmt} (choose from {', '.join(FORMATS)})")
+    if not FORMATS[fmt].available():
+        logger.warning(f"Output format {fmt} is not available (missing dependency); using {FALLBACK_FORMAT}")
+        fmt = FALLBACK_FORMAT
+    return fmt
+
+
+def open_writer(fmt: str, path_stem: str) -> DatasetWriter:
+    """Open a writer for `fmt` at path_stem + the format's extension."""
+    cls = FORMATS[fmt]
+    return cls(path_stem + cls.extension)
+
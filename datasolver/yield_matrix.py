@@ -1,23 +1,52 @@
 # datasolver/yield_matrix.py
 
 import requests
-from typing import Dict, Any, List
+from collections import defaultdict
+from typing import Dict, Any, List, Tuple
 
-def get(url: str) -> Any:
+from datasolver.util.resilience import Upstream
+
+def _fetch(url: str, timeout: float) -> Any:
     """Simple GET helper with timeout and error check."""
-    resp = requests.get(url, timeout=10)
+    resp = requests.get(url, timeout=timeout)
     resp.raise_for_status()
     return resp.json()
 
-def build_dataset(rfd: Dict[str, Any]) -> List[Dict[str, Any]]:
+# Hedged after the host's p95, circuit-broken per host, last good snapshot as
+# fallback; each attempt's 10s timeout is capped by the RFD deadline.
+UPSTREAM = Upstream(fetch=_fetch, timeout=10)
+
+def get(url: str) -> Any:
+    """GET JSON from an upstream source through the resilience layer."""
+    return UPSTREAM.get_json(url)
+
+def upstream_status() -> Dict[str, Any]:
+    """Breaker state, hedging and fallback counters of the upstream sources."""
+    return UPSTREAM.status()
+
+# map our short codes to DeFiLlama chain names
+CHAIN_MAP = {"eth": "Ethereum", "arb": "Arbitrum", "sol": "Solana"}
+
+POOLS_URL = "https://yields.llama.fi/pools"
+
+def fetch_pools() -> List[Dict[str, Any]]:
+    """One snapshot of every DeFiLlama yield pool."""
+    return get(POOLS_URL)["data"]
+
+def index_pools(pools: List[Dict[str, Any]]) -> Dict[Tuple[str, str], List[Tuple[int, Dict[str, Any]]]]:
+    """Group a snapshot by (chain name, upper-case symbol), keeping each pool's position."""
+    index: Dict[Tuple[str, str], List[Tuple[int, Dict[str, Any]]]] = defaultdict(list)
+    for pos, p in enumerate(pools):
+        index[(p.get("chain", ""), p.get("symbol", "").upper())].append((pos, p))
+    return index
+
+def select(index: Dict[Tuple[str, str], List[Tuple[int, Dict[str, Any]]]],
+           rfd: Dict[str, Any]) -> List[Dict[str, Any]]:
     """
-    Fetches DeFiLlama yield pools, filters by chains/assets,
+    Filters an indexed snapshot by the RFD's chains/assets,
     computes APY, TVL (in millions), risk, then returns
     the top-N entries ranked by APY.
     """
-    # map our short codes to DeFiLlama chain names
-    CHAIN_MAP = {"eth": "Ethereum", "arb": "Arbitrum", "sol": "Solana"}
-
     # normalize the input
     requested_chains = { CHAIN_MAP.get(c.lower(), c) for c in rfd["chains"] }
     requested_assets = { a.upper() for a in rfd["assets"] }
@@ -27,35 +56,39 @@ def build_dataset(rfd: Dict[str, Any]) -> List[Dict[str, Any]]:
     except ValueError:
         depth = 5
 
-    # pull all pools
-    raw = get("https://yields.llama.fi/pools")["data"]
-
-    table: List[Dict[str, Any]] = []
-    for p in raw:
-        sym        = p.get("symbol", "").upper()
-        chain_name = p.get("chain", "")
-
-        if sym in requested_assets and chain_name in requested_chains:
-            apy  = p.get("apy", 0.0) * 100                # from decimal to %
-            tvl  = p.get("tvlUsd", 0.0) / 1e6             # TVL in millions
-            table.append({
-                "protocol": p.get("project", ""),
-                "chain":    chain_name.lower(),           # back to lowercase
-                "asset":    sym,
-                "apy":      round(apy, 2),
-                "tvl":      round(tvl, 2),
-                "risk":     ("high"   if apy > 20
-                             else "medium" if apy > 8
-                             else "low"),
-            })
-
-    # sort by APY descending
-    table.sort(key=lambda x: x["apy"], reverse=True)
+    table: List[Tuple[int, Dict[str, Any]]] = []
+    for chain_name in requested_chains:
+        for sym in requested_assets:
+            for pos, p in index.get((chain_name, sym), ()):
+                apy  = p.get("apy", 0.0) * 100                # from decimal to %
+                tvl  = p.get("tvlUsd", 0.0) / 1e6             # TVL in millions
+                table.append((pos, {
+                    "protocol": p.get("project", ""),
+                    "chain":    chain_name.lower(),           # back to lowercase
+                    "asset":    sym,
+                    "apy":      round(apy, 2),
+                    "tvl":      round(tvl, 2),
+                    "risk":     ("high"   if apy > 20
+                                 else "medium" if apy > 8
+                                 else "low"),
+                }))
+
+    # sort by APY descending (ties keep the snapshot's order)
+    table.sort(key=lambda x: (-x[1]["apy"], x[0]))
 
     # take top‐N and assign rank
     result = []
-    for idx, entry in enumerate(table[:depth], start=1):
+    for idx, (_, entry) in enumerate(table[:depth], start=1):
         entry["rank"] = idx
         result.append(entry)
 
     return result
+
+def build_dataset(rfd: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Fetches DeFiLlama yield pools and answers one RFD (see select)."""
+    return select(index_pools(fetch_pools()), rfd)
+
+def build_datasets(rfds: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """Answers many chain/asset RFDs from a single pool snapshot."""
+    index = index_pools(fetch_pools())
+    return [select(index, rfd) for rfd in rfds]
@@ -0,0 +1,157 @@
+"""
+ipfsCid.py – local IPFS CID computation + upload index
+
+compute_cid() reproduces `ipfs add` defaults for files:
+  fixed 256 KiB chunks, balanced DAG with ≤174 links per node, sha2-256.
+  cid_version=1 → raw leaves, dag-pb parents, base32 "b…" (Kubo --cid-version=1)
+  cid_version=0 → dag-pb/UnixFS leaves, base58btc "Qm…" (Kubo default)
+
+CIDIndex remembers which CIDs we already pinned, in state/cid_index.db.
+"""
+
+from __future__ import annotations
+import base64, hashlib, sqlite3, threading, time
+from pathlib import Path
+from typing import BinaryIO, List, Optional, Tuple
+
+CHUNK_SIZE   = 256 * 1024
+MAX_LINKS    = 174
+CODEC_RAW    = 0x55
+CODEC_DAG_PB = 0x70
+_B58         = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+
+# ─── encoding helpers ────────────────────────────────────────────────
+def _varint(n: int) -> bytes:
+    out = bytearray()
+    while True:
+        b = n & 0x7F
+        n >>= 7
+        if n:
+            out.append(b | 0x80)
+        else:
+            out.append(b)
+            return bytes(out)
+
+
+def _field(num: int, wire: int) -> bytes:
+    return _varint((num << 3) | wire)
+
+
+def _bytes_field(num: int, data: bytes) -> bytes:
+    return _field(num, 2) + _varint(len(data)) + data
+
+
+def _multihash(data: bytes) -> bytes:
+    return b"\x12\x20" + hashlib.sha256(data).digest()
+
+
+def _cid_bytes(block: bytes, codec: int, version: int) -> bytes:
+    mh = _multihash(block)
+    return mh if version == 0 else _varint(1) + _varint(codec) + mh
+
+
+def _b58(data: bytes) -> str:
+    n = int.from_bytes(data, "big")
+    out = ""
+    while n:
+        n, r = divmod(n, 58)
+        out = _B58[r] + out
+    return "1" * (len(data) - len(data.lstrip(b"\0"))) + out
+
+
+def cid_to_str(cid: bytes) -> str:
+    if cid[:2] == b"\x12\x20":                         # bare multihash → CIDv0
+        return _b58(cid)
+    return "b" + base64.b32encode(cid).decode().lower().rstrip("=")
+
+
+# ─── UnixFS / dag-pb ─────────────────────────────────────────────────
+def _unixfs_file(filesize: int, data: Optional[bytes] = None, blocksizes: Tuple[int, ...] = ()) -> bytes:
+    msg = _field(1, 0) + _varint(2)                    # Type = File
+    if data is not None:
+        msg += _bytes_field(2, data)
+    msg += _field(3, 0) + _varint(filesize)
+    for bs in blocksizes:
+        msg += _field(4, 0) + _varint(bs)
+    return msg
+
+
+def _pb_node(links: List[Tuple[bytes, int]], data: bytes) -> bytes:
+    out = b""
+    for cid, tsize in links:                           # Links (2) precede Data (1)
+        link = _bytes_field(1, cid) + _bytes_field(2, b"") + _field(3, 0) + _varint(tsize)
+        out += _bytes_field(2, link)
+    return out + _bytes_field(1, data)
+
+
+# (cid bytes, cumulative dag size, file bytes covered)
+_Node = Tuple[bytes, int, int]
+
+
+def _leaf(chunk: bytes, version: int) -> _Node:
+    if version == 1:
+        return _cid_bytes(chunk, CODEC_RAW, 1), len(chunk), len(chunk)
+    block = _pb_node([], _unixfs_file(len(chunk), chunk))
+    return _cid_bytes(block, CODEC_DAG_PB, 0), len(block), len(chunk)
+
+
+def _parent(children: List[_Node], version: int) -> _Node:
+    filesize = sum(c[2] for c in children)
+    block = _pb_node([(c[0], c[1]) for c in children],
+                     _unixfs_file(filesize, blocksizes=tuple(c[2] for c in children)))
+    return _cid_bytes(block, CODEC_DAG_PB, version), len(block) + sum(c[1] for c in children), filesize
+
+
+def compute_cid_stream(fh: BinaryIO, cid_version: int = 1, chunk_size: int = CHUNK_SIZE) -> str:
+    level: List[_Node] = []
+    while True:
+        chunk = fh.read(chunk_size)
+        if not chunk and level:
+            break
+        level.append(_leaf(chunk, cid_version))
+        if not chunk:
+            break                                      # empty file → one empty leaf
+    while len(level) > 1:
+        level = [_parent(level[i:i + MAX_LINKS], cid_version) for i in range(0, len(level), MAX_LINKS)]
+    return cid_to_str(level[0][0])
+
+
+def compute_cid(path: str, cid_version: int = 1) -> str:
+    with open(path, "rb") as fh:
+        return compute_cid_stream(fh, cid_version)
+
+
+# ─── pinned-content index ────────────────────────────────────────────
+INDEX_PATH = Path(__file__).resolve().parent / "state" / "cid_index.db"
+
+
+class CIDIndex:
+    """local CID → uri we got back when pinning it."""
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path  = Path(path or INDEX_PATH)
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, sqlite3.connect(self.path) as c:
+            c.execute(
+                "CREATE TABLE IF NOT EXISTS cidindex ("
+                " cid         TEXT PRIMARY KEY,"
+                " uri         TEXT NOT NULL,"
+                " size        INTEGER,"
+                " uploaded_at REAL)"
+            )
+            c.commit()
+
+    def get(self, cid: str) -> Optional[str]:
+        with self._lock, sqlite3.connect(self.path) as c:
+            row = c.execute("SELECT uri FROM cidindex WHERE cid=?", (cid,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, cid: str, uri: str, size: Optional[int] = None) -> None:
+        with self._lock, sqlite3.connect(self.path) as c:
+            c.execute(
+                "INSERT OR REPLACE INTO cidindex (cid, uri, size, uploaded_at) VALUES (?, ?, ?, ?)",
+                (cid, uri, size, time.time()),
+            )
+            c.commit()
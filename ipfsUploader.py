@@ -1,78 +1,294 @@
 import requests
 import os
 import json
+import time
+import uuid
+import logging
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 
+from ipfsCid import CIDIndex, compute_cid
+
 # Load environment variables
 load_dotenv()
 
-# Get API credentials from environment variables
-PINATA_API_KEY = os.environ.get("PINATA_API_KEY")
-PINATA_SECRET_API_KEY = os.environ.get("PINATA_SECRET_API_KEY")
+log = logging.getLogger("ipfsUploader")
+
+RETRY_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+class MultipartStream:
+    """multipart/form-data body that reads the file in chunks instead of
+    buffering it. Has a length, so requests sends a Content-Length and
+    streams the body through read()."""
+
+    def __init__(self, fields: Dict[str, str], file_field: str, file_path: str,
+                 file_name: Optional[str] = None, chunk_size: int = 1 << 20):
+        self.boundary = uuid.uuid4().hex
+        self.chunk_size = chunk_size
+        self.file_path = file_path
+        file_name = file_name or os.path.basename(file_path)
+
+        head = b"".join(
+            f'--{self.boundary}\r\nContent-Disposition: form-data; name="{k}"\r\n\r\n{v}\r\n'.encode()
+            for k, v in fields.items()
+        )
+        head += (
+            f'--{self.boundary}\r\nContent-Disposition: form-data; name="{file_field}"; '
+            f'filename="{file_name}"\r\nContent-Type: application/octet-stream\r\n\r\n'
+        ).encode()
+        self._head = head
+        self._tail = f"\r\n--{self.boundary}--\r\n".encode()
+        self._size = os.path.getsize(file_path)       # raises FileNotFoundError early
+        self._fh = None
+        self._stage = 0                              # 0 head, 1 file, 2 tail, 3 done
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self) -> int:
+        return len(self._head) + self._size + len(self._tail)
+
+    def read(self, n: int = -1) -> bytes:
+        n = self.chunk_size if n is None or n < 0 else n
+        if self._stage == 0:
+            self._stage = 1
+            return self._head
+        if self._stage == 1:
+            if self._fh is None:
+                self._fh = open(self.file_path, "rb")
+            chunk = self._fh.read(n)
+            if chunk:
+                return chunk
+            self._fh.close()
+            self._stage = 2
+        if self._stage == 2:
+            self._stage = 3
+            return self._tail
+        return b""
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+
+
+# ─── backends ────────────────────────────────────────────────────────
+class IPFSBackend(ABC):
+    """Where uploads go: URL, auth headers, form fields and how to read the CID back."""
+    file_field  = "file"
+    cid_version = 1                      # what the service will return, see ipfsCid
+
+    @abstractmethod
+    def url(self) -> str: ...
+
+    def headers(self) -> Dict[str, str]:
+        return {}
+
+    def fields(self, file_name: str) -> Dict[str, str]:
+        return {}
+
+    @abstractmethod
+    def parse_cid(self, response: requests.Response) -> Optional[str]: ...
+
+
+class PinataBackend(IPFSBackend):
+    def __init__(self, api_url: str = "https://api.pinata.cloud/pinning/pinFileToIPFS"):
+        self.api_url = api_url
+
+    def url(self) -> str:
+        return self.api_url
+
+    def headers(self) -> Dict[str, str]:
+        key, secret = os.environ.get("PINATA_API_KEY"), os.environ.get("PINATA_SECRET_API_KEY")
+        # Verify API keys exist
+        if not key or not secret:
+            raise Exception("Pinata API keys are missing. Please set PINATA_API_KEY and PINATA_SECRET_API_KEY in your .env file.")
+        return {"pinata_api_key": key, "pinata_secret_api_key": secret}
+
+    def fields(self, file_name: str) -> Dict[str, str]:
+        return {"pinataMetadata": json.dumps({"name": file_name}),
+                "pinataOptions":  json.dumps({"cidVersion": self.cid_version})}
+
+    def parse_cid(self, response: requests.Response) -> Optional[str]:
+        return response.json().get("IpfsHash")
+
+
+class KuboBackend(IPFSBackend):
+    """Local IPFS (Kubo) HTTP RPC – `ipfs daemon` listens on :5001 by default."""
+
+    def __init__(self, api_url: str = "http://127.0.0.1:5001", cid_version: int = 1):
+        self.api_url = api_url.rstrip("/")
+        self.cid_version = cid_version
+
+    def url(self) -> str:
+        return f"{self.api_url}/api/v0/add?pin=true&cid-version={self.cid_version}"
+
+    def parse_cid(self, response: requests.Response) -> Optional[str]:
+        # one JSON object per line; the last one is the file itself
+        lines = [ln for ln in response.text.splitlines() if ln.strip()]
+        return json.loads(lines[-1]).get("Hash") if lines else None
+
+
+BACKENDS = {"pinata": PinataBackend, "kubo": KuboBackend}
+
+
+# ─── upload engine ───────────────────────────────────────────────────
+class IPFSUploader:
+    """Pooled session + streaming multipart + retry with backoff + parallel uploads.
+
+    With an index, the CID is computed locally first and content we already
+    pinned is not sent again.
+    """
+
+    def __init__(self, backend: Optional[IPFSBackend] = None, *,
+                 session: Optional[requests.Session] = None,
+                 retries: int = 3, backoff: float = 0.5,
+                 timeout: Tuple[float, float] = (10, 300),
+                 pool_size: int = 10, max_workers: int = 4,
+                 index: Optional[CIDIndex] = None):
+        self.backend = backend or PinataBackend()
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.index = index
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.session = session
+
+    @classmethod
+    def from_env(cls) -> "IPFSUploader":
+        kind = os.environ.get("IPFS_BACKEND", "pinata").lower()
+        if kind not in BACKENDS:
+            raise ValueError(f"Unknown IPFS_BACKEND: {kind}")
+        api_url = os.environ.get("IPFS_API_URL")
+        backend = BACKENDS[kind](api_url) if api_url else BACKENDS[kind]()
+        return cls(
+            backend,
+            retries=int(os.environ.get("IPFS_RETRIES", "3")),
+            max_workers=int(os.environ.get("IPFS_MAX_WORKERS", "4")),
+            index=CIDIndex() if os.environ.get("IPFS_DEDUPE", "1") == "1" else None,
+        )
+
+    def local_cid(self, file_path: str) -> str:
+        return compute_cid(file_path, self.backend.cid_version)
+
+    def upload(self, file_path: str, cid: Optional[str] = None) -> str:
+        """Upload one file → "ipfs://<CID>", or return the indexed URI if it was pinned before."""
+        if self.index is None:
+            return self._post(file_path)
+        cid = cid or self.local_cid(file_path)
+        known = self.index.get(cid)
+        if known:
+            log.info("IPFS upload of %s skipped – %s already pinned", os.path.basename(file_path), cid)
+            return known
+        uri = self._post(file_path)
+        if uri != f"ipfs://{cid}":
+            log.warning("IPFS returned %s, local CID was %s", uri, cid)
+        self.index.put(cid, uri, os.path.getsize(file_path))
+        return uri
+
+    def upload_deferred(self, file_path: str) -> Tuple[str, Future]:
+        """Local CID now, upload in the background: ("ipfs://<CID>", Future[uri]).
+
+        The URI is usable (e.g. on-chain) before the content is reachable; check the
+        future – its result must equal the URI – before relying on retrieval.
+        """
+        cid = self.local_cid(file_path)
+        if self.index is not None:
+            known = self.index.get(cid)
+            if known:
+                done: Future = Future()
+                done.set_result(known)
+                return known, done
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ipfs")
+        return f"ipfs://{cid}", self._executor.submit(self.upload, file_path, cid)
+
+    def _post(self, file_path: str) -> str:
+        """Retries transient failures."""
+        file_name = os.path.basename(file_path)
+        headers = self.backend.headers()
+        attempt = 0
+        while True:
+            body = MultipartStream(self.backend.fields(file_name), self.backend.file_field, file_path)
+            try:
+                response = self.session.post(
+                    self.backend.url(), data=body,
+                    headers={**headers, "Content-Type": body.content_type},
+                    timeout=self.timeout,
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.retries:
+                    raise
+                log.warning("IPFS upload of %s failed (%s) – retry %d", file_name, e, attempt + 1)
+            else:
+                # Check response
+                if response.status_code == 200:
+                    cid = self.backend.parse_cid(response)
+                    if not cid:
+                        raise Exception("No IPFS hash returned in response")
+                    return f"ipfs://{cid}"
+                if response.status_code not in RETRY_STATUS or attempt >= self.retries:
+                    # Handle error
+                    error_message = response.text
+                    try:
+                        error_data = response.json()
+                        error_message = json.dumps(error_data)
+                    except (json.JSONDecodeError, ValueError):
+                        pass
+                    raise Exception(f"Failed to upload to IPFS: {response.status_code} - {error_message}")
+                log.warning("IPFS upload of %s got %d – retry %d", file_name, response.status_code, attempt + 1)
+            finally:
+                body.close()
+            time.sleep(self.backoff * (2 ** attempt))
+            attempt += 1
+
+    def upload_many(self, file_paths: Iterable[str]) -> Dict[str, str]:
+        """Upload concurrently; returns {path: uri}. The first failure is raised."""
+        paths: List[str] = list(file_paths)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            return dict(zip(paths, pool.map(self.upload, paths)))
+
+
+_DEFAULT: Optional[IPFSUploader] = None
+_DEFAULT_LOCK = threading.Lock()
+
+
+def get_uploader() -> IPFSUploader:
+    """Process-wide uploader built from env, so the HTTP pool is shared."""
+    global _DEFAULT
+    with _DEFAULT_LOCK:
+        if _DEFAULT is None:
+            _DEFAULT = IPFSUploader.from_env()
+        return _DEFAULT
+
 
 def upload_to_ipfs(file_path: str) -> str:
-    """Uploads a file to IPFS using Pinata
-    
+    """Uploads a file to IPFS (Pinata by default, see IPFS_BACKEND)
+
     Args:
         file_path: Path to the file to upload
-        
+
     Returns:
         str: IPFS URI (e.g., "ipfs://<CID>")
-        
+
     Raises:
         Exception: If upload fails or credentials are missing
     """
-    # Verify API keys exist
-    if not PINATA_API_KEY or not PINATA_SECRET_API_KEY:
-        raise Exception("Pinata API keys are missing. Please set PINATA_API_KEY and PINATA_SECRET_API_KEY in your .env file.")
-    
-    # Pinata API endpoint for file uploads
-    url = "https://api.pinata.cloud/pinning/pinFileToIPFS"
-    
-    # Set up headers with Pinata API keys
-    headers = {
-        "pinata_api_key": PINATA_API_KEY,
-        "pinata_secret_api_key": PINATA_SECRET_API_KEY
-    }
-    
-    # Set up optional Pinata metadata
-    file_name = os.path.basename(file_path)
-    pinata_metadata = json.dumps({
-        "name": file_name
-    })
-    
-    # Open and read the file
     try:
-        with open(file_path, 'rb') as file:
-            files = {
-                'file': (file_name, file)
-            }
-            
-            data = {
-                'pinataMetadata': pinata_metadata
-            }
-            
-            # Make the request
-            response = requests.post(url, files=files, headers=headers, data=data)
-            
-            # Check response
-            if response.status_code == 200:
-                # Extract CID from response
-                data = response.json()
-                cid = data.get('IpfsHash')
-                if not cid:
-                    raise Exception("No IPFS hash returned in response")
-                return f"ipfs://{cid}"
-            else:
-                # Handle error
-                error_message = response.text
-                try:
-                    error_data = response.json()
-                    error_message = json.dumps(error_data)
-                except json.JSONDecodeError:
-                    pass
-                raise Exception(f"Failed to upload to IPFS: {response.status_code} - {error_message}")
-                
+        return get_uploader().upload(file_path)
     except FileNotFoundError:
         raise Exception(f"File not found at path: {file_path}")
     except Exception as e:
@@ -85,4 +301,4 @@ if __name__ == "__main__":
         ipfs_uri = upload_to_ipfs(file_path)
         print("Uploaded to:", ipfs_uri)
     except Exception as e:
-        print(f"Error: {e}")
\ No newline at end of file
+        print(f"Error: {e}")
@@ -31,7 +31,12 @@ def cli():
 @click.option('--test', is_flag=True, help='Test mode: Process a sample RFD file with real data generation')
 @click.option('--mock', is_flag=True, help='Mock mode: Simulate the entire pipeline with mock data and services')
 @click.option('--rfd-file', default='sample_rfd.json', help='Path to sample RFD JSON file (used in test mode)')
-def start(test: bool, mock: bool, rfd_file: str):
+@click.option('--workers', default=1, show_default=True, envvar='RFD_WORKERS', help='Dataset generation workers (production mode)')
+@click.option('--io-workers', default=4, show_default=True, envvar='RFD_IO_WORKERS', help='Workers per I/O stage: NFT+IPFS and tx submit (production mode)')
+@click.option('--queue-size', default=100, show_default=True, envvar='RFD_QUEUE_SIZE', help='Bounded queue size between stages (production mode)')
+@click.option('--deadline', default=None, type=float, envvar='RFD_DEADLINE_SECS', help='Per-RFD deadline in seconds (production mode)')
+def start(test: bool, mock: bool, rfd_file: str, workers: int, io_workers: int,
+          queue_size: int, deadline: Optional[float]):
     """Start the solver node
     
     Test mode (--test):
@@ -45,6 +50,10 @@ def start(test: bool, mock: bool, rfd_file: str):
     - Uses mock data generation
     - Uses mock blockchain responses
     - Good for development and debugging
+
+    Production mode (default):
+    - Listens for RFDs on-chain and feeds a staged worker pool
+      (generate → NFT/IPFS → submit) with a bounded queue
     """
     print(BANNER)
     
@@ -61,9 +70,10 @@ def start(test: bool, mock: bool, rfd_file: str):
     # Run the node
     try:
         if test or mock:
-            node._run_test_mode()
+            node._run_test_mode(rfd_file)
         else:
-            node._run_production_mode()
+            node._run_production_mode(workers=workers, io_workers=io_workers,
+                                      queue_size=queue_size, deadline=deadline)
     except KeyboardInterrupt:
         logger.info("Solver node stopped by user")
     except Exception as e:
@@ -6,6 +6,8 @@ import httpx
 import logging
 import uvicorn
 
+from datasolver import deadline
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("MockMCPServer")
 
@@ -48,13 +50,17 @@ async def fulfill_rfd(rfd: Dict[str, Any]):
 
     async with httpx.AsyncClient() as client:
         try:
-            # POST the original RFD to the discovered solver
-            response = await client.post(forward_url, json=rfd, timeout=15.0)
+            # POST the original RFD to the discovered solver, with whatever budget it has left
+            with deadline.budget(deadline.from_rfd(rfd)):
+                response = await client.post(forward_url, json=deadline.forward(rfd), timeout=deadline.timeout(15.0))
             response.raise_for_status() # Check for 4xx/5xx errors from the solver
             
             # *** FIX: Forward the solver's successful response back to the original caller ***
             return response.json()
 
+        except (deadline.DeadlineExceeded, httpx.TimeoutException) as e:
+            logger.error(f"RFD ran out of time waiting for the solver: {e}")
+            raise HTTPException(status_code=504, detail="Deadline exceeded waiting for solver")
         except httpx.RequestError as e:
             logger.error(f"Failed to forward RFD to solver: {e}")
             raise HTTPException(status_code=502, detail=f"Could not connect to solver at {solver_url}")
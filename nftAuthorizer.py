@@ -4,8 +4,8 @@ NFTAuthorizer – verifies NFT ownership, but can run in mock mode
 """
 
 from __future__ import annotations
-import os, json
-from typing import List, Optional
+import os, json, time, threading, logging
+from typing import Dict, List, Optional, Tuple
 
 from dotenv import load_dotenv
 
@@ -17,11 +17,78 @@ try:
 except ImportError:
     Web3 = None           # type: ignore
 
+log = logging.getLogger("NFTAuthorizer")
+
+# Multicall3 is deployed at the same address on most EVM chains; override for
+# local nodes (e.g. after deploying it on hardhat/anvil).
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+MULTICALL3_ABI = [{
+    "name": "aggregate3", "type": "function", "stateMutability": "payable",
+    "inputs": [{"name": "calls", "type": "tuple[]", "components": [
+        {"name": "target",       "type": "address"},
+        {"name": "allowFailure", "type": "bool"},
+        {"name": "callData",     "type": "bytes"},
+    ]}],
+    "outputs": [{"name": "returnData", "type": "tuple[]", "components": [
+        {"name": "success",    "type": "bool"},
+        {"name": "returnData", "type": "bytes"},
+    ]}],
+}]
+
+
+class OwnershipCache:
+    """
+    wallet → (balance, block, ts). Entries expire after *ttl* seconds and are
+    evicted early when a Transfer touching the wallet lands in a block newer
+    than the one the balance was read at.
+    """
+
+    def __init__(self, ttl: float = 300.0) -> None:
+        self.ttl   = ttl
+        self._lock = threading.Lock()
+        self._d: Dict[str, Tuple[int, Optional[int], float]] = {}
+
+    def get(self, wallet: str) -> Optional[int]:
+        with self._lock:
+            entry = self._d.get(wallet.lower())
+            if entry is None:
+                return None
+            bal, _, ts = entry
+            if time.monotonic() - ts > self.ttl:
+                del self._d[wallet.lower()]
+                return None
+            return bal
+
+    def put(self, wallet: str, balance: int, block: Optional[int]) -> None:
+        with self._lock:
+            self._d[wallet.lower()] = (balance, block, time.monotonic())
+
+    def invalidate(self, wallet: str, block: Optional[int] = None) -> None:
+        with self._lock:
+            entry = self._d.get(wallet.lower())
+            if entry is None:
+                return
+            read_at = entry[1]
+            if block is None or read_at is None or read_at < block:
+                del self._d[wallet.lower()]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._d.clear()
+
+    def __len__(self) -> int:
+        return len(self._d)
+
+
 class NFTAuthorizer:
     """
     Verifies that a wallet owns at least one token in a given NFT collection.
     Set mock_mode=True (or SOLVER_MOCK_MODE=1 in your .env) to short-circuit
     every check and always return True – useful for local demos & CI.
+
+    Ownership answers are cached (NFT_CACHE_TTL seconds). Call
+    watch_transfers() to evict entries as Transfer events arrive; pass
+    strict=True (or NFT_STRICT_AUTH=1) to always read fresh from the chain.
     """
     # --------------------------------------------------------------------- #
     def __init__(self, *, mock_mode: bool | None = None) -> None:
@@ -52,43 +119,179 @@ class NFTAuthorizer:
             abi=abi,
         )
 
+        # ─ ownership cache ────────────────────────────────────────────────
+        self.cache      = OwnershipCache(ttl=float(os.getenv("NFT_CACHE_TTL", "300")))
+        self.strict     = os.getenv("NFT_STRICT_AUTH", "0") == "1"
+        self._head: Optional[int] = None        # last block whose Transfers we applied
+        self._watcher: Optional[threading.Thread] = None
+        self._stop      = threading.Event()
+
+        # ─ call batching ──────────────────────────────────────────────────
+        self.multicall_address = os.getenv("MULTICALL3_ADDRESS", MULTICALL3_ADDRESS)
+        self.multicall_chunk   = int(os.getenv("MULTICALL_CHUNK", "500"))
+        self._mc = None                          # Multicall3 contract, False if absent
+
     # ------------------------------------------------------------------ #
-    def has_nft(self, wallet: str, block: int | None = None) -> bool:
-        """Does *wallet* own at least one token?"""
+    def has_nft(self, wallet: str, block: int | None = None, *, strict: bool | None = None) -> bool:
+        """
+        Does *wallet* own at least one token? Answered from the cache unless
+        *strict* (fresh read) or a historical *block* is requested.
+        """
         if self.mock_mode:
             return True
 
         if not self.web3.is_address(wallet):
             raise ValueError(f"Invalid address: {wallet}")
 
+        strict = self.strict if strict is None else strict
+        if block is None and not strict:
+            cached = self.cache.get(wallet)
+            if cached is not None:
+                return cached > 0
+
         try:
             bal = self.contract.functions.balanceOf(
                 self.web3.to_checksum_address(wallet)
             ).call({"block_identifier": block} if block else {})
-            return bal > 0
         except (ContractLogicError, Web3Exception):
             return False
+        if block is None:
+            self.cache.put(wallet, int(bal), self._head)
+        return bal > 0
+
+    # ------------------------------------------------------------------ #
+    def sync_transfers(self) -> int:
+        """
+        Apply Transfer events since the last sync to the cache. Returns the
+        number of events seen. The first call only records the head.
+        """
+        if self.mock_mode:
+            return 0
+        head = self.web3.eth.block_number
+        if self._head is None:
+            self._head = head
+            return 0
+        if head <= self._head:
+            return 0
+        events = self.contract.events.Transfer.get_logs(from_block=self._head + 1, to_block=head)
+        for ev in events:
+            blk = int(ev["blockNumber"])
+            self.cache.invalidate(ev["args"]["from"], blk)
+            self.cache.invalidate(ev["args"]["to"], blk)
+        self._head = head
+        return len(events)
+
+    def watch_transfers(self, interval: float | None = None) -> None:
+        """Keep the cache coherent from a daemon thread."""
+        if self.mock_mode or (self._watcher and self._watcher.is_alive()):
+            return
+        interval = interval if interval is not None else float(os.getenv("NFT_SYNC_SECS", "12"))
+
+        def _loop() -> None:
+            while not self._stop.is_set():
+                try:
+                    self.sync_transfers()
+                except Exception as exc:                 # noqa: BLE001
+                    # can't trust the cache if we missed events
+                    log.warning("Transfer sync failed (%s) – clearing ownership cache", exc)
+                    self.cache.clear()
+                    self._head = None
+                self._stop.wait(interval)
+
+        self._stop.clear()
+        self._watcher = threading.Thread(target=_loop, name="nft-transfer-watch", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self) -> None:
+        self._stop.set()
 
     # ------------------------------------------------------------------ #
     def get_owned_token_ids(self, wallet: str, block: int | None = None) -> List[int]:
         """Return **all** token IDs owned – empty list if none / mock mode."""
         if self.mock_mode:
             return []
+        return self.get_owned_token_ids_many([wallet], block)[wallet]
 
-        ids: list[int] = []
-        if not self.has_nft(wallet, block):
-            return ids
+    def get_owned_token_ids_many(self, wallets: List[str], block: int | None = None) -> Dict[str, List[int]]:
+        """
+        Token IDs for many wallets in two batched rounds: every balanceOf,
+        then every tokenOfOwnerByIndex. A wallet's list stops at its first
+        failing index, as the sequential version did.
+        """
+        wallets = list(dict.fromkeys(wallets))      # a repeated wallet would be queried (and counted) twice
+        if self.mock_mode:
+            return {w: [] for w in wallets}
+        for w in wallets:
+            if not self.web3.is_address(w):
+                raise ValueError(f"Invalid address: {w}")
+
+        fns   = self.contract.functions
+        addrs = [self.web3.to_checksum_address(w) for w in wallets]
+        bals  = [
+            0 if raw is None else self.web3.codec.decode(["uint256"], raw)[0]
+            for raw in self._batch_call([fns.balanceOf(a) for a in addrs], block)
+        ]
+        if block is None:
+            for w, bal in zip(wallets, bals):
+                self.cache.put(w, int(bal), self._head)
+
+        index = [(w, a, i) for w, a, bal in zip(wallets, addrs, bals) for i in range(bal)]
+        raws  = self._batch_call([fns.tokenOfOwnerByIndex(a, i) for _, a, i in index], block)
+
+        out: Dict[str, List[int]] = {w: [] for w in wallets}
+        broken: set[str] = set()
+        for (w, _, _), raw in zip(index, raws):
+            if w in broken:
+                continue
+            if raw is None:
+                broken.add(w)
+                continue
+            out[w].append(int(self.web3.codec.decode(["uint256"], raw)[0]))
+        return out
+
+    # ------------------------------------------------------------------ #
+    def _multicall(self):
+        if self._mc is None:
+            addr = self.web3.to_checksum_address(self.multicall_address)
+            try:
+                has_code = len(self.web3.eth.get_code(addr)) > 0
+            except (Web3Exception, ValueError):
+                has_code = False
+            self._mc = self.web3.eth.contract(address=addr, abi=MULTICALL3_ABI) if has_code else False
+            if not has_code:
+                log.info("Multicall3 not deployed at %s – using JSON-RPC batches", addr)
+        return self._mc
+
+    def _batch_call(self, calls: list, block: int | None) -> List[Optional[bytes]]:
+        """Raw return data per contract call, None where the call reverted."""
+        if not calls:
+            return []
+        target = self.contract.address
+        datas  = [c._encode_transaction_data() for c in calls]
+        ident  = block if block else "latest"
+        out: List[Optional[bytes]] = []
 
-        bal = self.contract.functions.balanceOf(
-            self.web3.to_checksum_address(wallet)
-        ).call({"block_identifier": block} if block else {})
+        mc = self._multicall()
+        if mc:
+            for i in range(0, len(datas), self.multicall_chunk):
+                chunk = [(target, True, d) for d in datas[i:i + self.multicall_chunk]]
+                res = mc.functions.aggregate3(chunk).call(block_identifier=ident)
+                out.extend(bytes(r[1]) if r[0] else None for r in res)
+            return out
 
-        for i in range(bal):
+        for i in range(0, len(datas), self.multicall_chunk):
+            chunk = datas[i:i + self.multicall_chunk]
             try:
-                tid = self.contract.functions.tokenOfOwnerByIndex(
-                    self.web3.to_checksum_address(wallet), i
-                ).call({"block_identifier": block} if block else {})
-                ids.append(int(tid))
-            except ContractLogicError:
-                break
-        return ids
+                with self.web3.batch_requests() as batch:
+                    for d in chunk:
+                        batch.add(self.web3.eth.call({"to": target, "data": d}, ident))
+                    res = batch.execute()
+                out.extend(bytes(r) if isinstance(r, (bytes, bytearray)) and r else None for r in res)
+            except (Web3Exception, ValueError, AttributeError):
+                # provider without batch support → one eth_call per item
+                for d in chunk:
+                    try:
+                        out.append(bytes(self.web3.eth.call({"to": target, "data": d}, ident)) or None)
+                    except (ContractLogicError, Web3Exception):
+                        out.append(None)
+        return out
@@ -14,6 +14,9 @@ contract RewardGauge {
     uint16  public constant THRESHOLD = 6000;      // ≥ 0.60 gets bonus
     uint256 public constant BONUS     = 1e18;      // 1 xREP
 
+    event ScoreSubmitted(address indexed provider, uint16 scoreBps);
+    event ScoreSkipped(address indexed provider, uint16 scoreBps);
+
     constructor(address tokenAddr) { token = RewardToken(tokenAddr); }
 
     /// repHash = keccak256(abi.encodePacked(provider, scoreBps, epoch))
@@ -22,15 +25,47 @@ contract RewardGauge {
         uint16  scoreBps,
         bytes   calldata sig
     ) external {
+        require(_record(repHash, scoreBps, sig), "score not improved");
+    }
+
+    /// Batched variant for epoch publishing – one tx for many providers.
+    /// Entries whose score did not improve are skipped (ScoreSkipped) instead
+    /// of reverting, so one stale attestation cannot sink the whole batch.
+    function submitScores(
+        bytes32[] calldata repHashes,
+        uint16[]  calldata scoresBps,
+        bytes[]   calldata sigs
+    ) external returns (uint256 applied) {
+        require(
+            repHashes.length == scoresBps.length && scoresBps.length == sigs.length,
+            "length mismatch"
+        );
+        for (uint256 i = 0; i < repHashes.length; i++) {
+            if (_record(repHashes[i], scoresBps[i], sigs[i])) {
+                applied++;
+            }
+        }
+    }
+
+    function _record(
+        bytes32 repHash,
+        uint16  scoreBps,
+        bytes   calldata sig
+    ) internal returns (bool) {
         // MessageHashUtils gives us the “Ethereum signed message” prefix
         bytes32 digest   = repHash.toEthSignedMessageHash();
         address provider = ECDSA.recover(digest, sig);
 
-        require(scoreBps >= lastScore[provider], "score not improved");
+        if (scoreBps < lastScore[provider]) {
+            emit ScoreSkipped(provider, scoreBps);
+            return false;
+        }
         lastScore[provider] = scoreBps;
 
         if (scoreBps >= THRESHOLD) {
             token.mint(provider, BONUS);
         }
+        emit ScoreSubmitted(provider, scoreBps);
+        return true;
     }
 }
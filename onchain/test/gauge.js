@@ -43,4 +43,65 @@ describe("RewardGauge – debug run", function () {
     expect(Number(stored)).to.equal(scoreBps);  // Convert BigInt/BigNumber to number
     expect(bal.toString()).to.equal(ethers.utils.parseEther("1").toString());  // Compare string values
   });
-});
\ No newline at end of file
+
+  it("submitScores applies a whole epoch in one tx", async function () {
+    const signers = await ethers.getSigners();
+    const providers = signers.slice(0, 3);
+
+    const Token = await ethers.getContractFactory("RewardToken");
+    const token = await Token.deploy();
+    await token.deployed();
+    const Gauge = await ethers.getContractFactory("RewardGauge");
+    const gauge = await Gauge.deploy(token.address);
+    await gauge.deployed();
+
+    const scores = [7500, 4000, 9000];
+    const epoch  = 1n;
+    const hashes = providers.map((p, i) =>
+      ethers.utils.solidityKeccak256(
+        ["address","uint16","uint64"],
+        [p.address, scores[i], epoch]
+      )
+    );
+    const sigs = await Promise.all(
+      providers.map((p, i) => p.signMessage(ethers.utils.arrayify(hashes[i])))
+    );
+
+    const tx = await gauge.submitScores(hashes, scores, sigs);
+    await tx.wait();
+
+    for (let i = 0; i < providers.length; i++) {
+      const stored = await gauge.lastScore(providers[i].address);
+      expect(Number(stored)).to.equal(scores[i]);
+    }
+    expect((await token.balanceOf(providers[1].address)).toString()).to.equal("0");
+  });
+
+  it("submitScores skips stale entries instead of reverting", async function () {
+    const [a, b] = await ethers.getSigners();
+
+    const Token = await ethers.getContractFactory("RewardToken");
+    const token = await Token.deploy();
+    await token.deployed();
+    const Gauge = await ethers.getContractFactory("RewardGauge");
+    const gauge = await Gauge.deploy(token.address);
+    await gauge.deployed();
+
+    const sign = async (p, score, epoch) => {
+      const h = ethers.utils.solidityKeccak256(
+        ["address","uint16","uint64"], [p.address, score, epoch]
+      );
+      return [h, await p.signMessage(ethers.utils.arrayify(h))];
+    };
+
+    const [h0, s0] = await sign(a, 8000, 0n);
+    await (await gauge.submitScore(h0, 8000, s0)).wait();
+
+    const [h1, s1] = await sign(a, 5000, 1n);   // worse than before → skipped
+    const [h2, s2] = await sign(b, 6500, 1n);
+    await (await gauge.submitScores([h1, h2], [5000, 6500], [s1, s2])).wait();
+
+    expect(Number(await gauge.lastScore(a.address))).to.equal(8000);
+    expect(Number(await gauge.lastScore(b.address))).to.equal(6500);
+  });
+});
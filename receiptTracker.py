@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+"""
+ReceiptTracker – background confirmation tracking for broadcast txs
+
+Pending transactions are polled for receipts in batches (one JSON-RPC batch
+per poll when the provider supports it). A tx that stays unmined for
+`stuck_after` seconds is re-signed with the same nonce and a bumped gas price;
+every hash of that nonce is watched until one of them lands. The final
+outcome is reported through `on_done(ok)` and the Future returned by track().
+"""
+
+from __future__ import annotations
+import math, threading, time, logging
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from web3.exceptions import TransactionNotFound
+
+log = logging.getLogger("ReceiptTracker")
+
+# hex QUANTITY fields of a raw eth_getTransactionReceipt result
+_QUANTITIES = ("status", "blockNumber", "gasUsed", "cumulativeGasUsed",
+               "effectiveGasPrice", "transactionIndex", "type")
+
+
+def _decode_receipt(raw: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if not raw:
+        return None                                   # null result = not mined yet
+    return {k: int(v, 16) if k in _QUANTITIES and isinstance(v, str) else v for k, v in raw.items()}
+
+
+class TxFailed(RuntimeError):
+    """Receipt came back with status 0, or the tx was abandoned after max bumps."""
+
+
+@dataclass
+class _Pending:
+    tx:        Dict[str, Any]                 # last unsigned tx (for re-bumps)
+    hashes:    List[str]                      # every hash sent for this nonce
+    sent_at:   float
+    future:    Future
+    on_done:   Optional[Callable[[bool], None]] = None
+    bumps:     int = 0
+    tag:       Any = None
+
+
+class ReceiptTracker:
+    def __init__(
+        self,
+        w3,
+        sign: Callable[[Dict[str, Any]], bytes],
+        *,
+        poll_interval: float = 2.0,
+        stuck_after:   float = 60.0,
+        bump:          float = 1.125,         # geth/erigon minimum replacement bump
+        max_bumps:     int   = 3,
+        batch:         bool  = True,
+    ) -> None:
+        self.w3            = w3
+        self.sign          = sign
+        self.poll_interval = poll_interval
+        self.stuck_after   = stuck_after
+        self.bump          = bump
+        self.max_bumps     = max_bumps
+        self.batch         = batch
+
+        self._lock    = threading.Lock()
+        self._pending: Dict[str, _Pending] = {}          # keyed by first hash
+        self._stop    = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------ #
+    def track(self, tx_hash: str, tx: Dict[str, Any], *,
+              on_done: Optional[Callable[[bool], None]] = None, tag: Any = None) -> Future:
+        fut: Future = Future()
+        with self._lock:
+            self._pending[tx_hash] = _Pending(tx=dict(tx), hashes=[tx_hash], sent_at=time.monotonic(),
+                                              future=fut, on_done=on_done, tag=tag)
+        return fut
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def start(self) -> "ReceiptTracker":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="receipt-tracker", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+            except Exception as exc:                   # noqa: BLE001
+                log.error("receipt poll failed: %s", exc)
+            self._stop.wait(self.poll_interval)
+
+    # ------------------------------------------------------------------ #
+    def poll_once(self) -> None:
+        with self._lock:
+            items = list(self._pending.items())
+        if not items:
+            return
+
+        receipts = self._fetch_receipts([h for _, p in items for h in p.hashes])
+        now      = time.monotonic()
+
+        for key, p in items:
+            rcpt = next((receipts[h] for h in p.hashes if receipts.get(h) is not None), None)
+            if rcpt is not None:
+                self._finish(key, p, rcpt)
+            elif now - p.sent_at >= self.stuck_after:
+                if p.bumps < self.max_bumps:
+                    self._replace(p, now)
+                else:
+                    self._finish(key, p, None, TxFailed(f"tx {p.hashes[0]} unmined after {p.bumps} bumps"))
+
+    def _fetch_receipts(self, hashes: List[str]) -> Dict[str, Any]:
+        provider = getattr(self.w3, "provider", None)
+        if self.batch and hasattr(provider, "make_batch_request"):
+            # Raw calls: an unmined tx is a null result for that item, not an exception for the batch
+            try:
+                responses = provider.make_batch_request(
+                    [("eth_getTransactionReceipt", [h]) for h in hashes])
+                if isinstance(responses, dict):        # whole batch rejected
+                    raise RuntimeError(responses.get("error"))
+                receipts: Dict[str, Any] = {}
+                for h, resp in zip(hashes, responses):
+                    if resp.get("error"):
+                        log.debug("receipt for %s failed: %s", h, resp["error"])
+                    receipts[h] = _decode_receipt(resp.get("result"))
+                return receipts
+            except Exception as exc:                   # noqa: BLE001
+                log.debug("batch receipt fetch failed (%s) – falling back", exc)
+
+        out: Dict[str, Any] = {}
+        for h in hashes:
+            try:
+                out[h] = self.w3.eth.get_transaction_receipt(h)
+            except TransactionNotFound:
+                out[h] = None
+        return out
+
+    def _replace(self, p: _Pending, now: float) -> None:
+        tx = dict(p.tx)
+        for k in ("gasPrice", "maxFeePerGas", "maxPriorityFeePerGas"):
+            if k in tx:
+                tx[k] = math.ceil(int(tx[k]) * self.bump)
+        try:
+            new_hash = self.w3.to_hex(self.w3.eth.send_raw_transaction(self.sign(tx)))
+        except Exception as exc:                       # noqa: BLE001
+            # "nonce too low" / "already known" → an earlier hash probably landed
+            log.warning("replacement for %s not accepted: %s", p.hashes[0], exc)
+            p.sent_at = now
+            p.bumps  += 1
+            return
+        log.info("⛽ bumped %s → %s (gas ×%.3f, bump #%d)", p.hashes[-1], new_hash, self.bump, p.bumps + 1)
+        p.tx       = tx
+        p.sent_at  = now
+        p.bumps   += 1
+        p.hashes.append(new_hash)
+
+    def _finish(self, key: str, p: _Pending, rcpt: Any, exc: Optional[BaseException] = None) -> None:
+        with self._lock:
+            self._pending.pop(key, None)
+        ok = exc is None and rcpt is not None and int(rcpt.get("status", 0)) == 1
+        if exc is None and not ok:
+            exc = TxFailed(f"tx {p.hashes[0]} reverted")
+        (log.info if ok else log.error)("%s tx %s", "✅ confirmed" if ok else "❌ failed", p.hashes[-1])
+        if p.on_done is not None:
+            try:
+                p.on_done(ok)
+            except Exception as cb_exc:                # noqa: BLE001
+                log.error("on_done callback failed: %s", cb_exc)
+        if ok:
+            p.future.set_result(rcpt)
+        else:
+            p.future.set_exception(exc)
@@ -61,6 +61,14 @@ def wilson(success: int, served: int, z: float = 1.96) -> float:
     adj   = z * math.sqrt((phat * (1 - phat) + z**2 / (4 * served)) / served)
     return round((centre - adj) / denom, 4)
 
+def all_scores() -> list[tuple[str, float]]:
+    """(provider_id, Wilson score) for every provider, computed from the live counters."""
+    with _LOCK, sqlite3.connect(DB_PATH) as c:
+        rows = c.execute(
+            "SELECT provider_id, served, success FROM providerstat"
+        ).fetchall()
+    return [(pid, wilson(success, served)) for pid, served, success in rows]
+
 async def hourly_recalc() -> None:
     """Recompute score for every provider once per hour."""
     while True:
@@ -1,23 +1,78 @@
 import os
 import json
+import asyncio
+import logging
+from collections import OrderedDict
+from pathlib import Path
 from web3 import Web3
 from dotenv import load_dotenv
 import time
-from typing import Dict, Optional
+from typing import Callable, Dict, Iterable, Optional
 
 # Load environment variables
 load_dotenv()
 
+log = logging.getLogger("RFDListener")
+
+CHECKPOINT_PATH = Path(__file__).resolve().parent / "state" / "rfd_checkpoint.json"
+
+# eth_getLogs refusals that mean "ask for fewer blocks" (geth, erigon, alchemy, infura, quicknode …)
+_RANGE_ERRORS = (
+    "more than", "too many", "too large", "too wide", "range", "limit exceeded",
+    "response size", "query timeout", "-32005",
+)
+
+
+def _is_range_error(exc: Exception) -> bool:
+    msg = str(exc).lower()
+    return any(hint in msg for hint in _RANGE_ERRORS)
+
+
+class BlockCheckpoint:
+    """Last fully processed block, persisted so restarts can backfill."""
+
+    def __init__(self, path: Path = CHECKPOINT_PATH):
+        self.path = Path(path)
+
+    def load(self) -> Optional[int]:
+        try:
+            return int(json.loads(self.path.read_text())["block"])
+        except (FileNotFoundError, KeyError, ValueError, json.JSONDecodeError):
+            return None
+
+    def save(self, block: int) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"block": block}))
+        os.replace(tmp, self.path)              # atomic on POSIX + Windows
+
+
 class RFDListener:
-    def __init__(self):
+    SEEN_CAPACITY = 10_000
+
+    def __init__(self, checkpoint: Optional[BlockCheckpoint] = None):
         self.rpc_url = os.environ.get("WEB3_RPC_URL")
+        self.ws_url = os.environ.get("WEB3_WS_URL")  # optional – enables log subscriptions
         self.exchange_contract_address = os.environ.get("EXCHANGE_CONTRACT_ADDRESS")
         self.exchange_contract_abi_path = os.environ.get("EXCHANGE_CONTRACT_ABI_PATH", "./abis/exchange_abi.json")
         self.chain_id = int(os.environ.get("CHAIN_ID", "1"))
 
+        # ingestion tuning
+        start_block = os.environ.get("RFD_START_BLOCK")
+        self.start_block = int(start_block) if start_block else None
+        self.confirmations = int(os.environ.get("RFD_CONFIRMATIONS", "0"))
+        self.max_range = int(os.environ.get("RFD_MAX_BLOCK_RANGE", "2000"))
+        self.poll_min = float(os.environ.get("RFD_POLL_MIN_SECS", "1"))
+        self.poll_max = float(os.environ.get("RFD_POLL_MAX_SECS", "10"))
+        self.retries = int(os.environ.get("RFD_GETLOGS_RETRIES", "5"))
+
         if not all([self.rpc_url, self.exchange_contract_address]):
             raise ValueError("Missing required environment variables: WEB3_RPC_URL or EXCHANGE_CONTRACT_ADDRESS")
 
+        self.checkpoint = checkpoint or BlockCheckpoint()
+        self._range = self.max_range
+        self._seen: "OrderedDict[tuple[str, int], None]" = OrderedDict()
+
         self.web3 = Web3(Web3.HTTPProvider(self.rpc_url))
         self._initialize_contract()
 
@@ -30,30 +85,131 @@ class RFDListener:
             abi=abi
         )
 
-    def listen_for_rfds(self, callback: callable) -> None:
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def _event_to_rfd(event) -> Dict:
+        return {
+            "rfd_id": event['args']['rfdId'],
+            "name": event['args']['name'],
+            "description": event['args']['description'],
+            "schema": json.loads(event['args']['schema'])  # Parse schema from string to dict
+        }
+
+    def _dispatch(self, events: Iterable, callback: Callable[[Dict], None]) -> int:
+        """Hand new events to *callback*, deduped on (tx hash, log index)."""
+        n = 0
+        for event in events:
+            tx_hash = event['transactionHash']
+            key = (tx_hash.hex() if isinstance(tx_hash, bytes) else str(tx_hash), int(event['logIndex']))
+            if key in self._seen:
+                continue
+            try:
+                rfd = self._event_to_rfd(event)
+            except (KeyError, ValueError) as e:
+                log.error("Malformed RFDPosted event %s: %s", key, e)
+                self._remember(key)
+                continue
+            log.info("New RFD detected: ID=%s, Name=%s", rfd['rfd_id'], rfd['name'])
+            callback(rfd)
+            # only once the callback has taken it: if it raised, a retry must see the event again
+            self._remember(key)
+            n += 1
+        return n
+
+    def _remember(self, key) -> None:
+        self._seen[key] = None
+        if len(self._seen) > self.SEEN_CAPACITY:
+            self._seen.popitem(last=False)
+
+    def _safe_head(self) -> int:
+        return self.web3.eth.block_number - self.confirmations
+
+    def _next_block(self, head: int) -> int:
+        last = self.checkpoint.load()
+        if last is not None:
+            return last + 1
+        if self.start_block is not None:
+            return self.start_block
+        return head                              # first run, no config → start at the tip
+
+    def backfill(self, callback: Callable[[Dict], None], to_block: Optional[int] = None) -> int:
+        """
+        eth_getLogs from the checkpoint up to *to_block* (default: safe head)
+        in bounded ranges. The range halves when the node refuses a query as
+        too large and doubles back up to RFD_MAX_BLOCK_RANGE on success;
+        connection errors and timeouts are retried with exponential backoff
+        (RFD_GETLOGS_RETRIES times). Returns the number of RFDs dispatched.
+        """
+        head = self._safe_head() if to_block is None else to_block
+        start = self._next_block(head)
+        found = 0
+        attempt = 0
+        while start <= head:
+            end = min(start + self._range - 1, head)
+            try:
+                events = self.contract.events.RFDPosted.get_logs(from_block=start, to_block=end)
+            except (OSError, TimeoutError) as e:        # requests' connection errors and timeouts are OSErrors
+                if attempt >= self.retries:
+                    raise
+                delay = min(self.poll_max, self.poll_min * 2 ** attempt)
+                attempt += 1
+                log.warning("get_logs %d-%d failed (%s); retry %d in %.1fs", start, end, e, attempt, delay)
+                time.sleep(delay)
+                continue
+            except Exception as e:
+                if self._range == 1 or not _is_range_error(e):
+                    raise
+                self._range = max(1, self._range // 2)
+                log.warning("get_logs %d-%d refused (%s); shrinking range to %d", start, end, e, self._range)
+                continue
+            attempt = 0
+            found += self._dispatch(sorted(events, key=lambda ev: (ev['blockNumber'], ev['logIndex'])), callback)
+            self.checkpoint.save(end)
+            self._range = min(self.max_range, self._range * 2)
+            start = end + 1
+        return found
+
+    # ------------------------------------------------------------------ #
+    async def _listen_ws(self, callback: Callable[[Dict], None]) -> None:
+        from web3 import AsyncWeb3, WebSocketProvider
+
+        event = self.contract.events.RFDPosted
+        async with AsyncWeb3(WebSocketProvider(self.ws_url)) as w3:
+            await w3.eth.subscribe("logs", {"address": self.contract.address, "topics": [event.topic]})
+            log.info("Subscribed to RFDPosted over %s", self.ws_url)
+            self.backfill(callback)              # close the gap between checkpoint and subscription
+            async for msg in w3.socket.process_subscriptions():
+                raw = msg["result"]
+                if raw.get("removed"):
+                    continue
+                self._dispatch([event().process_log(raw)], callback)
+                # later logs of the same block may still arrive → checkpoint the block before
+                self.checkpoint.save(max(int(raw["blockNumber"]) - 1, self.checkpoint.load() or 0))
+
+    def listen_for_rfds(self, callback: Callable[[Dict], None]) -> None:
         """Listen for new RFD events and pass them to a callback function"""
-        # Assumed event: RFDPosted(string rfdId, string name, string description, string schema)
-        event_filter = self.contract.events.RFDPosted.create_filter(from_block="latest")
-        print("Listening for new RFDs...")
+        if self.ws_url:
+            try:
+                asyncio.run(self._listen_ws(callback))
+            except Exception as e:
+                log.warning("Websocket subscription unavailable (%s); falling back to polling", e)
 
+        log.info("Listening for new RFDs (polling)...")
+        delay = self.poll_min
         while True:
             try:
-                for event in event_filter.get_new_entries():
-                    rfd = {
-                        "rfd_id": event['args']['rfdId'],
-                        "name": event['args']['name'],
-                        "description": event['args']['description'],
-                        "schema": json.loads(event['args']['schema'])  # Parse schema from string to dict
-                    }
-                    print(f"New RFD detected: ID={rfd['rfd_id']}, Name={rfd['name']}")
-                    callback(rfd)
+                found = self.backfill(callback)
+                # adaptive poll: stay fast while RFDs are flowing, back off when idle
+                delay = self.poll_min if found else min(self.poll_max, delay * 2)
             except Exception as e:
-                print(f"Error listening for RFDs: {str(e)}")
-            time.sleep(10)  # Poll every 10 seconds
+                log.error("Error listening for RFDs: %s", e)
+                delay = self.poll_max
+            time.sleep(delay)
+
 
 if __name__ == "__main__":
     def dummy_callback(rfd: Dict):
         print(f"Processing RFD: {rfd}")
 
     listener = RFDListener()
-    listener.listen_for_rfds(dummy_callback)
\ No newline at end of file
+    listener.listen_for_rfds(dummy_callback)
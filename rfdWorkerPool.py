@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+RFDWorkerPool – staged worker pool between RFDListener and SolverNode
+
+  listener ──submit()──▶ [bounded queue] ──▶ stage 1 (N workers) ──▶ [queue] ──▶ stage 2 …
+
+Each stage has its own concurrency, so e.g. dataset generation (CPU) and
+IPFS/tx work (I/O) can be sized independently. submit() blocks when the
+first queue is full, which back-pressures ingestion instead of buffering
+without bound. Every RFD carries a deadline; work that is already past it
+is dropped before the next stage starts, and each stage runs under it
+(datasolver.deadline), so the stage's outbound calls are bounded too.
+"""
+
+from __future__ import annotations
+import logging, queue, threading, time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from datasolver import deadline as rfd_deadline
+
+log = logging.getLogger("RFDWorkerPool")
+
+_STOP = object()
+
+
+@dataclass
+class Stage:
+    name:    str
+    fn:      Callable[[Any], Any]        # falsy return = failed, stop here
+    workers: int = 1
+
+
+@dataclass
+class _Job:
+    rfd_id:   Any
+    value:    Any
+    deadline: Optional[float]
+    started:  float
+
+
+@dataclass
+class _StageStats:
+    ok:       int   = 0
+    failed:   int   = 0
+    expired:  int   = 0
+    busy:     int   = 0
+    seconds:  float = 0.0
+    lock:     threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+
+class RFDWorkerPool:
+    def __init__(
+        self,
+        stages: List[Stage],
+        *,
+        queue_size: int = 100,
+        deadline:   Optional[float] = None,          # seconds per RFD, None = unbounded
+        on_done:    Optional[Callable[[Any, Any], None]] = None,
+        metrics_interval: float = 60.0,
+    ) -> None:
+        if not stages:
+            raise ValueError("at least one stage is required")
+        self.stages   = stages
+        self.deadline = deadline
+        self.on_done  = on_done
+        self.metrics_interval = metrics_interval
+
+        self._queues  = [queue.Queue(maxsize=queue_size) for _ in stages]
+        self._stats   = [_StageStats() for _ in stages]
+        self._threads: List[threading.Thread] = []
+        self._lock    = threading.Lock()
+        self._submitted = 0
+        self._completed = 0
+        self._latency   = 0.0
+        self._t0: Optional[float] = None
+        self._stop_metrics = threading.Event()
+
+    # ------------------------------------------------------------------ #
+    def start(self) -> "RFDWorkerPool":
+        self._t0 = time.monotonic()
+        for i, stage in enumerate(self.stages):
+            for w in range(max(1, stage.workers)):
+                t = threading.Thread(target=self._work, args=(i,), name=f"{stage.name}-{w}", daemon=True)
+                t.start()
+                self._threads.append(t)
+        if self.metrics_interval:
+            threading.Thread(target=self._report, name="pool-metrics", daemon=True).start()
+        log.info("worker pool started: %s",
+                 ", ".join(f"{s.name}×{max(1, s.workers)}" for s in self.stages))
+        return self
+
+    def submit(self, rfd: Dict[str, Any], timeout: Optional[float] = None) -> bool:
+        """Enqueue an RFD; blocks while the pool is saturated. False on timeout."""
+        now    = time.monotonic()
+        budget = rfd.get("deadline_secs", self.deadline)
+        job    = _Job(rfd.get("rfd_id", "unknown"), rfd, now + budget if budget is not None else None, now)
+        try:
+            self._queues[0].put(job, timeout=timeout)
+        except queue.Full:
+            log.warning("RFD %s rejected – pool saturated", job.rfd_id)
+            return False
+        with self._lock:
+            self._submitted += 1
+        return True
+
+    def join(self) -> None:
+        """Wait until every submitted RFD has left the pipeline."""
+        for q in self._queues:
+            q.join()
+
+    def stop(self) -> None:
+        self.join()
+        self._stop_metrics.set()
+        for i, stage in enumerate(self.stages):
+            for _ in range(max(1, stage.workers)):
+                self._queues[i].put(_STOP)
+        for t in self._threads:
+            t.join()
+
+    # ------------------------------------------------------------------ #
+    def _work(self, idx: int) -> None:
+        stage, stats, q = self.stages[idx], self._stats[idx], self._queues[idx]
+        last = idx == len(self.stages) - 1
+        while True:
+            job = q.get()
+            if job is _STOP:
+                q.task_done()
+                return
+            try:
+                if job.deadline is not None and time.monotonic() >= job.deadline:
+                    log.warning("RFD %s past deadline before %s – dropped", job.rfd_id, stage.name)
+                    with stats.lock:
+                        stats.expired += 1
+                    self._finish(job, None)
+                    continue
+
+                with stats.lock:
+                    stats.busy += 1
+                t = time.monotonic()
+                try:
+                    # the stage (and everything it calls) sees the RFD's deadline
+                    with rfd_deadline.until(job.deadline):
+                        out = stage.fn(job.value)
+                except Exception as exc:             # noqa: BLE001
+                    log.error("RFD %s failed in %s: %s", job.rfd_id, stage.name, exc)
+                    out = None
+                with stats.lock:
+                    stats.busy    -= 1
+                    stats.seconds += time.monotonic() - t
+                    if out:
+                        stats.ok += 1
+                    else:
+                        stats.failed += 1
+
+                if not out or last:
+                    self._finish(job, out or None)
+                else:
+                    job.value = out
+                    self._queues[idx + 1].put(job)
+            finally:
+                q.task_done()
+
+    def _finish(self, job: _Job, result: Any) -> None:
+        with self._lock:
+            self._completed += 1
+            self._latency   += time.monotonic() - job.started
+        if self.on_done is not None:
+            try:
+                self.on_done(job.rfd_id, result)
+            except Exception as exc:                 # noqa: BLE001
+                log.error("on_done callback failed: %s", exc)
+
+    # ------------------------------------------------------------------ #
+    def metrics(self) -> Dict[str, Any]:
+        elapsed = time.monotonic() - self._t0 if self._t0 else 0.0
+        with self._lock:
+            submitted, completed, latency = self._submitted, self._completed, self._latency
+        stages = {}
+        for stage, st, q in zip(self.stages, self._stats, self._queues):
+            with st.lock:
+                done = st.ok + st.failed
+                stages[stage.name] = {
+                    "workers":   max(1, stage.workers),
+                    "queued":    q.qsize(),
+                    "busy":      st.busy,
+                    "ok":        st.ok,
+                    "failed":    st.failed,
+                    "expired":   st.expired,
+                    "avg_secs":  round(st.seconds / done, 4) if done else 0.0,
+                }
+        return {
+            "submitted":      submitted,
+            "completed":      completed,
+            "in_flight":      submitted - completed,
+            "throughput_rps": round(completed / elapsed, 4) if elapsed else 0.0,
+            "avg_latency":    round(latency / completed, 4) if completed else 0.0,
+            "stages":         stages,
+        }
+
+    def _report(self) -> None:
+        while not self._stop_metrics.wait(self.metrics_interval):
+            log.info("pool metrics %s", self.metrics())
@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+"""
+score_publisher.py – epoch job that pushes reputation scores on-chain
+
+Reads Wilson scores from reputation.py, signs one attestation per provider
+  repHash = keccak256(abi.encodePacked(provider, scoreBps, epoch))
+and publishes them through RewardGauge.submitScores in batches, so an epoch
+costs one transaction per batch instead of one per provider.
+
+Env:
+  WEB3_RPC_URL            e.g. http://127.0.0.1:8545 for `npx hardhat node`
+  GAUGE_CONTRACT_ADDRESS
+  GAUGE_ABI_PATH          ABI json or Hardhat artifact
+  PRIVATE_KEY             sender of the batch transactions
+  SCORE_SIGNER_KEYS       comma-separated provider keys (default: PRIVATE_KEY)
+  SCORE_EPOCH             explicit epoch (default: days since unix epoch)
+  SCORE_BATCH_SIZE        attestations per tx (default 50)
+"""
+
+from __future__ import annotations
+import os, json, time, logging
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from dotenv import load_dotenv
+from eth_account import Account
+from eth_account.messages import encode_defunct
+from web3 import Web3
+
+import reputation
+
+load_dotenv()
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+log = logging.getLogger("ScorePublisher")
+
+EPOCH_SECONDS = 86_400
+MAX_BPS       = 10_000
+
+
+# ─── attestation helpers ─────────────────────────────────────────────
+@dataclass(frozen=True)
+class Attestation:
+    provider:  str
+    score_bps: int
+    epoch:     int
+    rep_hash:  bytes
+    signature: bytes
+
+
+def current_epoch(now: Optional[float] = None) -> int:
+    return int((now if now is not None else time.time()) // EPOCH_SECONDS)
+
+
+def to_bps(score: float) -> int:
+    """0-1 Wilson score → uint16 basis points, clamped."""
+    return max(0, min(MAX_BPS, int(round(score * MAX_BPS))))
+
+
+def rep_hash(provider: str, score_bps: int, epoch: int) -> bytes:
+    """Same packing as the contract / `ethers.utils.solidityKeccak256`."""
+    return bytes(Web3.solidity_keccak(
+        ["address", "uint16", "uint64"],
+        [Web3.to_checksum_address(provider), score_bps, epoch],
+    ))
+
+
+def sign_attestation(provider_key: str, score_bps: int, epoch: int) -> Attestation:
+    acct = Account.from_key(provider_key)
+    h    = rep_hash(acct.address, score_bps, epoch)
+    sig  = acct.sign_message(encode_defunct(primitive=h)).signature
+    return Attestation(acct.address.lower(), score_bps, epoch, h, bytes(sig))
+
+
+def build_attestations(
+    scores: Iterable[tuple[str, float]],
+    signer_keys: Iterable[str],
+    epoch: int,
+) -> List[Attestation]:
+    """
+    Sign every score we hold a key for. The gauge recovers the provider from
+    the signature, so providers without a key are skipped (and logged).
+    """
+    keys: Dict[str, str] = {Account.from_key(k).address.lower(): k for k in signer_keys}
+    out: List[Attestation] = []
+    for pid, score in scores:
+        key = keys.get(pid.lower())
+        if key is None:
+            log.warning("no signer key for %s – skipping", pid)
+            continue
+        out.append(sign_attestation(key, to_bps(score), epoch))
+    return out
+
+
+# ─── batcher ─────────────────────────────────────────────────────────
+class ScoreBatcher:
+    """Chunks attestations into submitScores calls, one nonce fetch per publish."""
+
+    def __init__(self, w3: Web3, contract, sender_key: str,
+                 *, batch_size: int = 50, chain_id: Optional[int] = None) -> None:
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+        self.w3         = w3
+        self.contract   = contract
+        self.acct       = Account.from_key(sender_key)
+        self.batch_size = batch_size
+        self.chain_id   = chain_id
+
+    def batches(self, atts: List[Attestation]) -> List[List[Attestation]]:
+        return [atts[i:i + self.batch_size] for i in range(0, len(atts), self.batch_size)]
+
+    def publish(self, atts: List[Attestation], *, wait: bool = False) -> List[str]:
+        if not atts:
+            log.info("nothing to publish")
+            return []
+
+        chain_id = self.chain_id if self.chain_id is not None else self.w3.eth.chain_id
+        nonce    = self.w3.eth.get_transaction_count(self.acct.address, "pending")
+        hashes: List[str] = []
+
+        for batch in self.batches(atts):
+            tx = self.contract.functions.submitScores(
+                [a.rep_hash  for a in batch],
+                [a.score_bps for a in batch],
+                [a.signature for a in batch],
+            ).build_transaction({"from": self.acct.address, "nonce": nonce, "chainId": chain_id})
+            signed  = self.acct.sign_transaction(tx)
+            tx_hash = self.w3.to_hex(self.w3.eth.send_raw_transaction(signed.raw_transaction))
+            log.info("✅ submitScores(%d) tx %s", len(batch), tx_hash)
+            hashes.append(tx_hash)
+            nonce += 1
+
+        if wait:
+            for h in hashes:
+                self.w3.eth.wait_for_transaction_receipt(h)
+        return hashes
+
+
+# ─── epoch job ───────────────────────────────────────────────────────
+def _load_abi(path: str) -> list:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return data["abi"] if isinstance(data, dict) else data      # Hardhat artifact or bare ABI
+
+
+def run_epoch(epoch: Optional[int] = None, *, wait: bool = True) -> List[str]:
+    rpc      = os.getenv("WEB3_RPC_URL")
+    addr     = os.getenv("GAUGE_CONTRACT_ADDRESS")
+    abi_path = os.getenv("GAUGE_ABI_PATH",
+                         "./onchain/artifacts/contracts/RewardGauge.sol/RewardGauge.json")
+    pk       = os.getenv("PRIVATE_KEY")
+    for k, v in {"WEB3_RPC_URL": rpc, "GAUGE_CONTRACT_ADDRESS": addr, "PRIVATE_KEY": pk}.items():
+        if not v:
+            raise EnvironmentError(f"Missing env var {k}")
+
+    signer_keys = [k.strip() for k in os.getenv("SCORE_SIGNER_KEYS", pk).split(",") if k.strip()]
+    epoch = epoch if epoch is not None else int(os.getenv("SCORE_EPOCH", current_epoch()))
+
+    w3 = Web3(Web3.HTTPProvider(rpc))
+    if not w3.is_connected():
+        raise ConnectionError("RPC not reachable")
+    contract = w3.eth.contract(address=w3.to_checksum_address(addr), abi=_load_abi(abi_path))
+
+    atts = build_attestations(reputation.all_scores(), signer_keys, epoch)
+    log.info("epoch %d: %d attestations", epoch, len(atts))
+    batcher = ScoreBatcher(w3, contract, pk, batch_size=int(os.getenv("SCORE_BATCH_SIZE", "50")))
+    return batcher.publish(atts, wait=wait)
+
+
+if __name__ == "__main__":
+    run_epoch()
@@ -9,8 +9,10 @@ import os, json, logging
 from typing import Dict, Any
 
 from datasolver.datasolver import DataSolver
+from datasolver.types import ProviderType
 import ipfsUploader
 from nftAuthorizer import NFTAuthorizer
+from rfdWorkerPool import RFDWorkerPool, Stage
 import submitSolution
 
 log = logging.getLogger("SolverNode")
@@ -18,21 +20,36 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s  %(levelname)s  %(me
 
 # --------------------------------------------------------------------------- #
 class SolverNode:
-    def __init__(self) -> None:
-        self.mock_mode = os.getenv("SOLVER_MOCK_MODE", "0") == "1"
-        log.info("Initialising SolverNode   mock_mode=%s", self.mock_mode)
+    def __init__(self, *, mock_mode: bool | None = None, test_mode: bool = False) -> None:
+        self.mock_mode = (
+            mock_mode if mock_mode is not None
+            else os.getenv("SOLVER_MOCK_MODE", "0") == "1"
+        )
+        self.test_mode = test_mode
+        self.offchain  = self.mock_mode or self.test_mode
+        log.info("Initialising SolverNode   mock_mode=%s test_mode=%s", self.mock_mode, self.test_mode)
 
         # 1) dataset generator ------------------------------------------------
-        self.data_solver = DataSolver()
+        self.data_solver = DataSolver(ProviderType.MOCK) if self.mock_mode else DataSolver()
 
         # 2) chain-related helpers -------------------------------------------
-        self.nft     = NFTAuthorizer(mock_mode=self.mock_mode)
-        self.submit  = submitSolution if not self.mock_mode else None
-        self.ipfs_up = ipfsUploader    if not self.mock_mode else None
+        self.nft     = NFTAuthorizer(mock_mode=self.offchain)
+        self.submit  = submitSolution.SolutionSubmitter() if not self.offchain else None
+        self.ipfs_up = ipfsUploader                       if not self.offchain else None
+        self.early_submit = os.getenv("IPFS_EARLY_SUBMIT", "0") == "1"
 
     # --------------------------------------------------------------------- #
     def process_rfd(self, rfd: Dict[str, Any]) -> Dict[str, Any] | bool:
         """Core business logic – returns structured result or False on failure."""
+        result = self._stage_generate(rfd)
+        if result and not self.offchain:
+            result = self._stage_publish(result)
+            if result:
+                result = self._stage_submit(result)
+        return result or False
+
+    # -- stages (also used individually by the worker pool) ---------------- #
+    def _stage_generate(self, rfd: Dict[str, Any]) -> Dict[str, Any] | bool:
         rfd_id = rfd.get("rfd_id", "unknown")
         log.info("▶ processing RFD %s", rfd_id)
 
@@ -49,10 +66,11 @@ class SolverNode:
         }
 
         # b) mock path ends here --------------------------------------------
-        if self.mock_mode:
-            log.info("✓ mock mode – skipping NFT/IPFS/on-chain steps")
-            return result
+        if self.offchain:
+            log.info("✓ %s mode – skipping NFT/IPFS/on-chain steps", "mock" if self.mock_mode else "test")
+        return result
 
+    def _stage_publish(self, result: Dict[str, Any]) -> Dict[str, Any] | bool:
         # c) check NFT -------------------------------------------------------
         wallet = os.environ.get("WALLET_ADDRESS", "")
         if not self.nft.has_nft(wallet):
@@ -60,18 +78,61 @@ class SolverNode:
             return False
 
         # d) IPFS upload -----------------------------------------------------
-        cid_uri = self.ipfs_up.upload_to_ipfs(outfile)
+        if self.early_submit:
+            # CID is computed locally; the tx goes out while the upload runs
+            cid_uri, result["upload"] = self.ipfs_up.get_uploader().upload_deferred(result["dataset_path"])
+        else:
+            cid_uri = self.ipfs_up.upload_to_ipfs(result["dataset_path"])
         if not cid_uri:
             log.error("IPFS upload failed")
             return False
         result["storage_uri"] = cid_uri
+        return result
 
+    def _stage_submit(self, result: Dict[str, Any]) -> Dict[str, Any] | bool:
         # e) submit on chain -------------------------------------------------
-        tx_hash = self.submit.submit_solution(rfd_id, cid_uri)
+        tx_hash = self.submit.submit_cid(result["rfd_id"], result["storage_uri"])
         if not tx_hash:
             log.error("solution submission failed")
             return False
         result["tx_hash"] = tx_hash
 
-        log.info("✓ RFD %s completed", rfd_id)
+        pending = result.pop("upload", None)
+        if pending is not None:
+            try:
+                pinned = pending.result()
+            except Exception as exc:                 # noqa: BLE001
+                log.error("IPFS upload of %s failed after submission: %s", result["storage_uri"], exc)
+                return False
+            if pinned != result["storage_uri"]:
+                log.error("IPFS pinned %s but %s was submitted", pinned, result["storage_uri"])
+                return False
+
+        log.info("✓ RFD %s completed", result["rfd_id"])
         return result
+
+    # --------------------------------------------------------------------- #
+    def build_pool(self, *, workers: int = 1, io_workers: int = 4,
+                   queue_size: int = 100, deadline: float | None = None) -> RFDWorkerPool:
+        """generate (CPU-bound) → publish (NFT + IPFS) → submit (tx)."""
+        stages = [Stage("generate", self._stage_generate, workers)]
+        if not self.offchain:
+            stages += [Stage("publish", self._stage_publish, io_workers),
+                       Stage("submit",  self._stage_submit,  io_workers)]
+        return RFDWorkerPool(stages, queue_size=queue_size, deadline=deadline)
+
+    def _run_production_mode(self, **pool_kw) -> None:
+        from rfdListener import RFDListener
+
+        self.nft.watch_transfers()              # keeps the ownership cache coherent
+        pool = self.build_pool(**pool_kw).start()
+        try:
+            RFDListener().listen_for_rfds(pool.submit)
+        finally:
+            log.info("final pool metrics %s", pool.metrics())
+
+    def _run_test_mode(self, rfd_file: str = "sample_rfd.json") -> None:
+        with open(rfd_file, "r", encoding="utf-8") as fh:
+            rfd = json.load(fh)
+        result = self.process_rfd(rfd)
+        log.info("result: %s", json.dumps(result, indent=2) if result else result)
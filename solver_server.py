@@ -1,10 +1,12 @@
 #!/usr/bin/env python3
 # solver_server.py
 
-import os, json, logging, httpx
-from typing import Dict, Any
+import os, json, logging, asyncio, httpx
+from typing import Dict, Any, List
 from fastapi import FastAPI, HTTPException
-from datasolver.providers.mcp.tools.reducer import ReduceAvgTool
+from datasolver import deadline
+from datasolver.yield_matrix import upstream_status
+from datasolver.providers.mcp.tools.reducer import ReduceAvgTool, ReduceTool
 from datasolver.providers.mcp.tools.yield_matrix_tool import YieldMatrixTool
 
 # ── logging ─────────────────────────────────────────────────────
@@ -14,7 +16,7 @@ logger = logging.getLogger("solver-api")
 # ── config ──────────────────────────────────────────────────────
 MCP_SERVER = os.getenv("MCP_SERVER_URL", "http://localhost:8000")
 SOLVER_URL = os.getenv("SOLVER_URL",     "http://localhost:8001")
-AVAILABLE_TOOLS = [ReduceAvgTool, YieldMatrixTool]
+AVAILABLE_TOOLS = [ReduceAvgTool, ReduceTool, YieldMatrixTool]
 
 app = FastAPI(title="Reppo Solver Node")
 
@@ -42,10 +44,37 @@ async def execute_rfd(rfd: Dict[str,Any]):
     for ToolCls in AVAILABLE_TOOLS:
         tool = ToolCls()
         if tool.validate_rfd(rfd):
-            out = tool.generate(rfd)
-            return {"tool": tool.name, **out}
+            # "deadline_s" bounds the tool; past it the caller gets a 504 rather than waiting on
+            with deadline.budget(deadline.from_rfd(rfd)):
+                try:
+                    rows = await asyncio.wait_for(tool.agenerate(rfd), timeout=deadline.remaining())
+                except (asyncio.TimeoutError, deadline.DeadlineExceeded):
+                    raise HTTPException(status_code=504, detail=f"Deadline exceeded for service '{rfd.get('service')}'")
+            return {"tool": tool.name, "rows": rows}
     raise HTTPException(status_code=404, detail=f"No tool for service '{rfd.get('service')}'")
 
+@app.post("/execute_rfd_batch")
+async def execute_rfd_batch(rfds: List[Dict[str,Any]]):
+    # RFDs for the same tool go to it in one generate_batch call (e.g. one yield snapshot)
+    tools  = [ToolCls() for ToolCls in AVAILABLE_TOOLS]
+    groups: Dict[str, Any] = {}
+    for i, rfd in enumerate(rfds):
+        tool = next((t for t in tools if t.validate_rfd(rfd)), None)
+        if tool is None:
+            raise HTTPException(status_code=404, detail=f"No tool for service '{rfd.get('service')}'")
+        groups.setdefault(tool.name, (tool, []))[1].append(i)
+    results: List[Any] = [None] * len(rfds)
+    for tool, idxs in groups.values():
+        batch = await asyncio.to_thread(tool.generate_batch, [rfds[i] for i in idxs])
+        for i, rows in zip(idxs, batch):
+            results[i] = {"tool": tool.name, "rows": rows}
+    return results
+
+# ── upstream health (breakers, hedging, snapshot fallbacks) ────
+@app.get("/upstream")
+def upstream():
+    return upstream_status()
+
 # ── launcher ───────────────────────────────────────────────────
 if __name__=="__main__":
     import uvicorn
@@ -11,6 +11,8 @@ Standard MCP Server (JSON-RPC 2.0 over stdin/stdout) for Amazon Q
 import json, sys, logging, os, httpx
 from typing import Dict, Any, List
 
+from datasolver import deadline
+
 # ─────────────────────────  logging  ──────────────────────────
 logging.basicConfig(
     level=logging.INFO,
@@ -153,8 +155,9 @@ class MCPServer:
         rfd = {"service": "yield_matrix", **args}
         url = f"{ROUTER}/fulfill"
         try:
-            with httpx.Client(timeout=30) as cli:
-                res = cli.post(url, json=rfd)
+            # "deadline_s" in the arguments bounds the whole call; the router gets what is left
+            with deadline.budget(deadline.from_rfd(rfd)), httpx.Client(timeout=deadline.timeout(30)) as cli:
+                res = cli.post(url, json=deadline.forward(rfd))
                 res.raise_for_status()
                 data = res.json()
         except Exception as exc:
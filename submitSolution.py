@@ -1,10 +1,12 @@
 #!/usr/bin/env python
-import os, json, logging
-from typing import Optional
+import os, json, logging, queue, threading, time
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
 
 from dotenv import load_dotenv
 from web3 import Web3
 from ipfsUploader import upload_to_ipfs
+from receiptTracker import ReceiptTracker
 import reputation                        # ← new helper
 
 load_dotenv()
@@ -14,6 +16,104 @@ log = logging.getLogger("SolutionSubmitter")
 PROVIDER_ID = os.getenv("WALLET_ADDRESS", "unknown_provider").lower()
 reputation.init_db()
 
+
+def _raw(signed) -> bytes:
+    """web3 ≥7 renamed rawTransaction → raw_transaction."""
+    return getattr(signed, "raw_transaction", None) or signed.rawTransaction
+
+
+# ─── nonce / gas helpers ─────────────────────────────────────────────
+class NonceManager:
+    """
+    Hands out nonces locally so concurrent submissions never race on
+    get_transaction_count. The chain is only asked on first use and after
+    resync() (call it whenever a send fails – the local view may be off).
+    """
+
+    def __init__(self, w3: Web3, address: str) -> None:
+        self.w3      = w3
+        self.address = address
+        self._lock   = threading.Lock()
+        self._next: Optional[int] = None
+
+    def reserve(self) -> int:
+        with self._lock:
+            if self._next is None:
+                self._next = self.w3.eth.get_transaction_count(self.address, "pending")
+            nonce = self._next
+            self._next += 1
+            return nonce
+
+    def resync(self) -> None:
+        with self._lock:
+            self._next = None
+
+
+class GasPriceOracle:
+    """eth_gasPrice cached for `refresh` seconds."""
+
+    def __init__(self, w3: Web3, refresh: float = 15.0) -> None:
+        self.w3      = w3
+        self.refresh = refresh
+        self._lock   = threading.Lock()
+        self._price: Optional[int] = None
+        self._ts     = 0.0
+
+    def get(self) -> int:
+        with self._lock:
+            now = time.monotonic()
+            if self._price is None or now - self._ts >= self.refresh:
+                self._price = int(self.w3.eth.gas_price)
+                self._ts    = now
+            return self._price
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._price = None
+
+
+class SubmissionQueue:
+    """
+    Signed transactions go in, `senders` threads push them to the RPC
+    back-to-back. Callers get a Future and can keep building/signing the
+    next tx while earlier ones are still in flight.
+    """
+
+    def __init__(self, send: Callable[[bytes], Any], *, senders: int = 2, maxsize: int = 0) -> None:
+        self._send    = send
+        self._q: "queue.Queue[Optional[tuple[bytes, Future]]]" = queue.Queue(maxsize)
+        self._threads = [
+            threading.Thread(target=self._run, name=f"tx-sender-{i}", daemon=True)
+            for i in range(max(1, senders))
+        ]
+        for t in self._threads:
+            t.start()
+
+    def put(self, raw_tx: bytes) -> Future:
+        fut: Future = Future()
+        self._q.put((raw_tx, fut))
+        return fut
+
+    def close(self) -> None:
+        for _ in self._threads:
+            self._q.put(None)
+        for t in self._threads:
+            t.join()
+
+    def _run(self) -> None:
+        while True:
+            item = self._q.get()
+            if item is None:
+                return
+            raw_tx, fut = item
+            if not fut.set_running_or_notify_cancel():
+                continue
+            try:
+                fut.set_result(self._send(raw_tx))
+            except Exception as exc:               # noqa: BLE001
+                fut.set_exception(exc)
+
+
 class SolutionSubmitter:
     GAS_LIMIT = 200_000
 
@@ -41,29 +141,76 @@ class SolutionSubmitter:
         )
         self.acct = self.w3.eth.account.from_key(self.pk)
 
+        self.nonces = NonceManager(self.w3, self.acct.address)
+        self.gas    = GasPriceOracle(self.w3, float(os.getenv("GAS_PRICE_REFRESH_SECS", "15")))
+        self.queue  = SubmissionQueue(self.w3.eth.send_raw_transaction,
+                                      senders=int(os.getenv("TX_SENDERS", "2")))
+        self.tracker = ReceiptTracker(
+            self.w3, self._sign,
+            poll_interval=float(os.getenv("RECEIPT_POLL_SECS", "2")),
+            stuck_after=float(os.getenv("TX_STUCK_SECS", "60")),
+            max_bumps=int(os.getenv("TX_MAX_BUMPS", "3")),
+        ).start()
+
     # ------------------------------------------------------------
+    def _sign(self, tx: dict) -> bytes:
+        return _raw(self.w3.eth.account.sign_transaction(tx, self.pk))
+
+    def _build_submission(self, rfd_id: int, cid_uri: str) -> dict:
+        return self.contract.functions.submitSolution(rfd_id, cid_uri).build_transaction(
+            {"from": self.acct.address, "nonce": self.nonces.reserve(), "gas": self.GAS_LIMIT,
+             "gasPrice": self.gas.get(), "chainId": self.chain_id}
+        )
+
+    def submit_cid_async(self, rfd_id: int, cid_uri: str) -> Future:
+        """
+        Sign now, broadcast from the submission queue. Future → tx hash (hex)
+        once broadcast; reputation is only credited when the receipt tracker
+        sees the tx confirmed.
+        """
+        out: Future = Future()
+        try:
+            tx   = self._build_submission(rfd_id, cid_uri)
+            sent = self.queue.put(self._sign(tx))
+        except Exception as exc:                       # noqa: BLE001
+            self._on_sent(out, rfd_id, exc=exc)
+            return out
+        sent.add_done_callback(lambda f: self._on_sent(out, rfd_id, tx, f))
+        return out
+
+    def _on_sent(self, out: Future, rfd_id: int, tx: Optional[dict] = None,
+                 sent: Optional[Future] = None, exc: Optional[BaseException] = None) -> None:
+        if sent is not None:
+            exc = sent.exception()
+        if exc is not None:
+            log.error("❌ submitSolution failed: %s", exc)
+            self.nonces.resync()
+            reputation.update_stats(PROVIDER_ID, False)
+            out.set_exception(exc)
+            return
+        tx_hash = self.w3.to_hex(sent.result())
+        log.info("📤 submitSolution tx %s broadcast", tx_hash)
+        self.tracker.track(tx_hash, tx, tag=rfd_id,
+                           on_done=lambda ok: reputation.update_stats(PROVIDER_ID, ok))
+        out.set_result(tx_hash)
+
+    def submit_cid(self, rfd_id: int, cid_uri: str) -> Optional[str]:
+        """Submit an already-uploaded CID; blocks until broadcast."""
+        try:
+            return self.submit_cid_async(rfd_id, cid_uri).result()
+        except Exception:                              # noqa: BLE001
+            return None
+
     def submit_solution(self, rfd_id: int, file_path: str) -> Optional[str]:
         try:
             cid_uri = upload_to_ipfs(file_path)
             if not cid_uri:
                 raise RuntimeError("IPFS upload failed")
-
-            nonce = self.w3.eth.get_transaction_count(self.acct.address)
-            tx    = self.contract.functions.submitSolution(rfd_id, cid_uri).build_transaction(
-                {"from": self.acct.address, "nonce": nonce, "gas": self.GAS_LIMIT,
-                 "gasPrice": self.w3.eth.gas_price, "chainId": self.chain_id}
-            )
-            signed  = self.w3.eth.account.sign_transaction(tx, self.pk)
-            tx_hash = self.w3.eth.send_raw_transaction(signed.rawTransaction)
-            log.info("✅ submitSolution tx %s", self.w3.to_hex(tx_hash))
-
-            reputation.update_stats(PROVIDER_ID, True)
-            return self.w3.to_hex(tx_hash)
-
         except Exception as exc:                       # noqa: BLE001
             log.error("❌ submitSolution failed: %s", exc)
             reputation.update_stats(PROVIDER_ID, False)
             return None
+        return self.submit_cid(rfd_id, cid_uri)
 
     def is_connected(self) -> bool:
         return self.w3.is_connected() and self.w3.eth.chain_id == self.chain_id
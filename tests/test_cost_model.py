@@ -0,0 +1,118 @@
+# tests/test_cost_model.py
+import pytest
+
+from datasolver.providers.mcp.client import MCPClient
+from datasolver.providers.mcp.costmodel import CostModel, rfd_features
+from datasolver.providers.mcp.router import RFDRouter
+from datasolver.providers.mcp.tools.tool import MCPTool
+
+
+class _Tool(MCPTool):
+    description = ""
+    capabilities = {}
+    declared = 1.0
+    fail = False
+
+    def validate_rfd(self, rfd):
+        return rfd.get("task") == "shared"
+
+    def cost(self, rfd):
+        return self.declared
+
+    def generate(self, rfd, **kwargs):
+        if self.fail:
+            raise RuntimeError("upstream down")
+        return [{"tool": self.name}]
+
+
+class Flaky(_Tool):
+    name = "flaky"
+    declared = 1.0
+
+
+class Steady(_Tool):
+    name = "steady"
+    declared = 2.0
+
+
+def test_declared_cost_until_observed_then_blended():
+    """
+    Why: Tool selection trusted hard-coded cost() values that ignore real runtime.
+    How: with no history the score is the declared cost; recorded latencies pull it
+         towards the observed cost in proportion to the number of samples.
+    """
+    model = CostModel(alpha=0.5, prior=2, unit_seconds=1.0, tail=0.0, clock=lambda: 0.0)
+    tool, rfd = Steady(), {"task": "shared"}
+    assert model.score(tool, rfd) == 2.0
+
+    model.record("steady", rfd, 8.0, size=10)
+    model.record("steady", rfd, 8.0, size=30)
+    assert model.score(tool, rfd) == pytest.approx(0.5 * 2.0 + 0.5 * 8.0)
+    assert model.snapshot()["steady"]["size_ewma"] == 20.0
+
+    model.record("steady", rfd, 0.5, ok=False)
+    stats = model.stats("steady", rfd)
+    assert stats.latency == pytest.approx(4.25) and stats.errors == pytest.approx(0.5)
+
+
+def test_estimates_are_keyed_by_rfd_features():
+    model = CostModel(prior=0, tail=0.0)
+    small, large = {"service": "s", "num_records": 10}, {"service": "s", "num_records": 100_000}
+    assert rfd_features(small) != rfd_features(large)
+
+    model.record("t", small, 0.01)
+    model.record("t", large, 3.0)
+    assert model.stats("t", small).latency == 0.01
+    assert model.stats("t", large).latency == 3.0
+    # an unseen bucket falls back to the tool-wide estimate
+    assert model.stats("t", {"service": "s", "num_records": 500}).samples == 2
+
+
+def test_tail_latency_counts():
+    model = CostModel(alpha=0.0, prior=0, tail=1.0, quantile=1.0)
+    rfd = {"service": "s"}
+    for seconds in (1.0, 1.0, 1.0, 9.0):
+        model.record("t", rfd, seconds)
+    # EWMA frozen at the first sample (alpha 0); the full tail up to the max is added
+    assert model.observed_cost(model.stats("t", rfd)) == pytest.approx(9.0)
+
+
+def test_router_moves_away_from_a_failing_tool():
+    """
+    Why: A cheap-but-broken tool kept being chosen because its declared cost never changed.
+    How: Flaky (declared 1.0) errors; after a few observed failures the router prefers Steady.
+    """
+    router = RFDRouter(MCPClient(tools=[Flaky, Steady]), costs=CostModel(prior=1, unit_seconds=1e-3))
+    flaky = router.mcp.get_tool("flaky")
+    flaky.fail = True
+
+    chosen = []
+    for _ in range(5):
+        try:
+            chosen.append(router.fulfil({"task": "shared"})["tool"])
+        except RuntimeError:
+            chosen.append("flaky")
+    assert chosen[0] == "flaky" and chosen[-1] == "steady"
+    assert router.costs.snapshot()["flaky"]["error_rate"] > 0.5
+
+
+def test_tool_recovers_after_a_single_failure():
+    """
+    Why: One failure sidelined a tool for good: nothing re-tried it, so its estimate never improved.
+    How: Flaky fails once and Steady takes over; a few half-lives later Flaky's score has
+         drifted back to its declared cost, it is chosen again and its old failure is forgotten.
+    """
+    now = [0.0]
+    router = RFDRouter(MCPClient(tools=[Flaky, Steady]), costs=CostModel(half_life=60, clock=lambda: now[0]))
+    flaky = router.mcp.get_tool("flaky")
+    flaky.fail = True
+    with pytest.raises(RuntimeError):
+        router.fulfil({"task": "shared"})
+    assert router.fulfil({"task": "shared"})["tool"] == "steady"
+
+    flaky.fail = False
+    now[0] = 600.0
+    assert router.costs.score(flaky, {"task": "shared"}) == pytest.approx(1.0, abs=0.01)
+    assert router.fulfil({"task": "shared"})["tool"] == "flaky"
+    assert router.costs.stats("flaky").errors < 0.01
+    assert router.fulfil({"task": "shared"})["tool"] == "flaky"
@@ -0,0 +1,131 @@
+# tests/test_deadline.py
+import time
+
+import pytest
+
+from datasolver import deadline
+from datasolver.deadline import DeadlineExceeded
+from datasolver.providers.mcp.client import MCPClient
+from datasolver.providers.mcp.router import RFDRouter
+from datasolver.providers.mcp.tools.reducer import ReduceTool
+from datasolver.providers.mcp.tools.tool import MCPTool
+
+CALLS = []
+
+
+class SlowTool(MCPTool):
+    """Each call takes `delay` seconds and returns one record naming the RFD."""
+    name = "slow"
+    description = ""
+    capabilities = {}
+
+    def validate_rfd(self, rfd):
+        return rfd.get("service") == self.name
+
+    def generate(self, rfd, **kwargs):
+        CALLS.append(rfd["id"])
+        time.sleep(rfd.get("delay", 0.0))
+        return [{"id": rfd["id"], "x": 1}]
+
+    def iter_records(self, rfd):
+        for i in range(rfd.get("batches", 1)):
+            time.sleep(rfd.get("delay", 0.0))
+            yield [{"id": rfd["id"], "x": 1}] * 10
+
+
+class BatchTool(SlowTool):
+    name = "batch"
+    supports_batch = True
+
+    def generate_batch(self, rfds, **kwargs):
+        CALLS.append([rfd["id"] for rfd in rfds])
+        return [self.generate(rfd) for rfd in rfds]
+
+
+@pytest.fixture
+def router():
+    CALLS.clear()
+    return RFDRouter(MCPClient(tools=[SlowTool, ReduceTool]))
+
+
+def tree(policy, n=5, delay=0.1, budget=0.25):
+    deps = [{"service": "slow", "id": i, "delay": delay} for i in range(n)]
+    return {"service": "slow", "id": "root", "dependencies": deps,
+            "deadline_s": budget, "on_deadline": policy}
+
+
+def test_budgets_nest_and_cap_timeouts():
+    assert deadline.remaining() is None and deadline.timeout(10) == 10
+    with deadline.budget(5):
+        with deadline.budget(60):                        # can't extend the outer budget
+            assert 4 < deadline.remaining() <= 5
+            assert deadline.timeout(30) <= 5 and deadline.timeout(1) == 1
+            assert 4 < deadline.forward({"a": 1})["deadline_s"] <= 5
+        with deadline.budget(0):
+            with pytest.raises(DeadlineExceeded):
+                deadline.timeout(10)
+    assert deadline.remaining() is None
+
+
+def test_dependency_tree_stops_at_the_deadline(router):
+    """
+    Why: A deep dependency tree ran for as long as it liked; there was no end-to-end bound.
+    How: five 0.1 s dependencies under a 0.25 s budget fail fast, and the
+         dependencies after the deadline never start.
+    """
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        router.fulfil(tree("fail"))
+    assert time.monotonic() - start < 0.6
+    assert 2 <= len(CALLS) <= 3
+
+
+def test_partial_policy_returns_what_finished(router):
+    out = router.fulfil(tree("partial"))
+    assert out["partial"] is True
+    ids = [r["id"] for r in out["records"]]
+    assert ids == list(range(len(ids))) and 2 <= len(ids) <= 3
+    assert "root" not in CALLS
+
+    full = router.fulfil(tree("partial", budget=5))
+    assert full["partial"] is False and len(full["records"]) == 6
+
+
+def test_streaming_reduce_keeps_partial_aggregates(router):
+    rfd = {"service": "reduce", "aggregates": ["count"], "deadline_s": 0.25, "on_deadline": "partial",
+           "dependencies": [{"service": "slow", "id": "s", "batches": 20, "delay": 0.05}]}
+    start = time.monotonic()
+    out = router.fulfil(rfd)
+    assert time.monotonic() - start < 0.6
+    assert out["partial"] is True
+    assert 0 < out["records"][0]["x_count"] < 200
+
+
+def test_batch_leaves_rfds_with_their_own_deadline_alone():
+    """
+    Why: Batched leaf RFDs ran in one shared call, ignoring their own deadline_s / on_deadline.
+    How: of three batchable RFDs the one with an exhausted budget is kept out of the
+         batch and fails on its own; the other two are still answered together.
+    """
+    CALLS.clear()
+    router = RFDRouter(MCPClient(tools=[BatchTool]))
+    rfds = [{"service": "batch", "id": 0}, {"service": "batch", "id": 1, "deadline_s": 0},
+            {"service": "batch", "id": 2}]
+
+    out = router.fulfil_batch(rfds, on_deadline="partial")
+    assert out[1] is None
+    assert [r["records"][0]["id"] for r in (out[0], out[2])] == [0, 2]
+    assert CALLS[0] == [0, 2] and 1 not in CALLS
+    with pytest.raises(DeadlineExceeded):
+        router.fulfil_batch(rfds)
+
+
+def test_outbound_timeout_follows_the_budget(mocker):
+    from datasolver import yield_matrix
+    resp = mocker.Mock(**{"json.return_value": {"data": []}})
+    get = mocker.patch("datasolver.yield_matrix.requests.get", return_value=resp)
+    with deadline.budget(2):
+        yield_matrix.get("http://pools")
+    assert get.call_args.kwargs["timeout"] <= 2
+    yield_matrix.get("http://pools")
+    assert get.call_args.kwargs["timeout"] == 10
@@ -0,0 +1,175 @@
+# tests/test_dynamodb_tool.py
+import sys
+import threading
+from decimal import Decimal
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from datasolver.providers.mcp.tools.dynamodb import DynamoDBTool
+from datasolver.util import aws
+
+
+@pytest.fixture
+def table(monkeypatch):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with mock_aws():
+        aws.reset()
+        ddb = boto3.resource("dynamodb")
+        t = ddb.create_table(
+            TableName="events",
+            KeySchema=[{"AttributeName": "pk", "KeyType": "HASH"},
+                       {"AttributeName": "sk", "KeyType": "RANGE"}],
+            AttributeDefinitions=[{"AttributeName": "pk", "AttributeType": "S"},
+                                  {"AttributeName": "sk", "AttributeType": "N"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        with t.batch_writer() as w:
+            for i in range(250):
+                w.put_item(Item={"pk": "hot" if i < 180 else "cold", "sk": i, "v": i * 2})
+        yield t
+        aws.reset()
+
+
+def test_query_follows_last_evaluated_key(table, mocker):
+    """
+    Why: Only the first page of Items was returned; large partitions were silently truncated.
+    How: 180 items in one partition, page_size 50 → 4 Query calls, every item yielded in order.
+    """
+    tool = DynamoDBTool()
+    spy = mocker.spy(tool.ddb.Table("events").meta.client, "query")
+    rfd = {"query": {"table_name": "events", "key_condition": "pk = :pk",
+                     "expression_values": {":pk": "hot"}, "page_size": 50}}
+
+    assert tool.validate_rfd(rfd)
+    rows = list(tool.iter_records(rfd))
+    assert [int(r["sk"]) for r in rows] == list(range(180))
+    assert spy.call_count == 4
+
+    capped = {"query": {**rfd["query"], "max_items": 60}}
+    assert len(tool.generate(capped)) == 60
+
+
+def test_parallel_scan_covers_all_segments(table):
+    tool = DynamoDBTool()
+    rfd = {"query": {"table_name": "events", "mode": "scan", "segments": 4, "page_size": 30,
+                     "filter_expression": "v >= :min", "expression_values": {":min": 100}}}
+    assert tool.validate_rfd(rfd)
+    rows = list(tool.iter_records(rfd))
+    assert sorted(int(r["sk"]) for r in rows) == list(range(50, 250))
+
+
+def test_batch_get_chunks_keys_and_skips_missing(table):
+    tool = DynamoDBTool()
+    keys = [{"pk": "cold", "sk": i} for i in range(180, 250)] + \
+           [{"pk": "hot", "sk": i} for i in range(0, 120)] + [{"pk": "nope", "sk": 1}]
+    rfd = {"query": {"table_name": "events", "keys": keys, "projection": "sk"}}
+    assert tool.validate_rfd(rfd)
+    rows = list(tool.iter_records(rfd))
+    assert sorted(int(r["sk"]) for r in rows) == list(range(120)) + list(range(180, 250))
+    assert all(set(r) == {"sk"} for r in rows)
+
+
+def test_batch_get_retries_unprocessed_keys(table, mocker):
+    tool = DynamoDBTool()
+    real = tool.ddb.batch_get_item
+    calls = []
+
+    def flaky(RequestItems):
+        calls.append(RequestItems)
+        if len(calls) == 1:                              # first call: everything unprocessed
+            return {"Responses": {}, "UnprocessedKeys": RequestItems}
+        return real(RequestItems=RequestItems)
+
+    mocker.patch.object(tool.ddb, "batch_get_item", side_effect=flaky)
+    mocker.patch("time.sleep")
+    rows = list(tool.iter_records({"query": {"table_name": "events", "keys": [{"pk": "hot", "sk": 1}]}}))
+    assert [int(r["sk"]) for r in rows] == [1] and len(calls) == 2
+
+
+def test_construction_is_cheap_and_clients_are_shared(table, mocker):
+    """
+    Why: Every DynamoDBTool built a fresh boto3 resource + client (~20 ms each, ~125 ms the first time).
+    How: constructing tools creates nothing; the low-level client is one object across
+         tools and threads, while resources stay per thread.
+    """
+    session = mocker.spy(boto3.session, "Session")
+    tools = [DynamoDBTool() for _ in range(10)]
+    assert session.call_count == 0
+
+    seen = {}
+
+    def grab(i):
+        seen[i] = (tools[i].client, tools[i].ddb)
+
+    threads = [threading.Thread(target=grab, args=(i,)) for i in range(4)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    clients = {id(c) for c, _ in seen.values()}
+    resources = {id(r) for _, r in seen.values()}
+    assert len(clients) == 1 and len(resources) == 4
+    assert tools[5].client is seen[0][0]
+
+
+def test_import_does_not_load_boto3():
+    import subprocess
+    code = "import sys; import datasolver.providers.mcp.tools.dynamodb; print('boto3' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
+
+
+def test_ingest_generated_records_in_parallel(table):
+    """
+    Why: Generated data could only be returned in memory, never materialised into a table.
+    How: 1,000 generated records (float sort keys → Decimal) written by 4 writers in
+         25-item batches; every item lands and the report accounts for all of them.
+    """
+    tool = DynamoDBTool()
+    rfd = {"num_records": 1000,
+           "schema": {"properties": {"pk": {"type": "string"}, "sk": {"type": "number"},
+                                     "tags": {"type": "list"}, "meta": {"type": "map"}}},
+           "ingest": {"table_name": "events", "writers": 4}}
+    assert tool.validate_rfd(rfd)
+
+    [report] = tool.generate(rfd)
+    assert report["items_written"] == 1000 and report["batches"] == 40
+    assert report["items_per_sec"] > 0
+
+    item = table.get_item(Key={"pk": "value_7", "sk": 7})["Item"]
+    assert item["meta"]["key2"] == 7 and item["tags"] == ["value_0", "value_1", "value_2"]
+    assert table.scan(Select="COUNT")["Count"] == 250 + 1000
+
+
+def test_ingest_retries_unprocessed_items_and_dedupes_keys(table, mocker):
+    tool = DynamoDBTool()
+    real = tool.client.batch_write_item
+    calls = []
+
+    def flaky(RequestItems, **kwargs):
+        calls.append(len(RequestItems["events"]))
+        if len(calls) == 1:                              # first call: half the batch is throttled
+            kept = RequestItems["events"][:10]
+            real(RequestItems={"events": kept}, **kwargs)
+            return {"UnprocessedItems": {"events": RequestItems["events"][10:]}}
+        return real(RequestItems=RequestItems, **kwargs)
+
+    mocker.patch.object(tool.client, "batch_write_item", side_effect=flaky)
+    mocker.patch("time.sleep")
+    records = [{"pk": "new", "sk": i % 20, "v": 1.5} for i in range(25)]
+    report = tool.ingest(records, "events", writers=1, key_names=["pk", "sk"])
+
+    assert calls == [20, 10]
+    assert report["items_written"] == 20 and report["retries"] == 1
+    assert table.get_item(Key={"pk": "new", "sk": 3})["Item"]["v"] == Decimal("1.5")
+
+
+def test_ingest_validation():
+    tool = DynamoDBTool()
+    assert tool.validate_rfd({"ingest": {"table_name": "t", "records": [{"pk": "a"}]}})
+    assert not tool.validate_rfd({"ingest": {"table_name": "t"}})
+    assert not tool.validate_rfd({"ingest": {"table_name": "t", "records": "nope"}})
@@ -0,0 +1,174 @@
+# tests/test_huggingface.py
+import contextlib
+
+import pytest
+
+from datasolver.providers import huggingface
+from datasolver.providers.huggingface import HuggingFaceProvider
+from datasolver.util.prompt_cache import PromptCache
+
+SCHEMA = {"properties": {
+    "title":   {"type": "string", "description": "Write a title"},
+    "summary": {"type": "string", "description": "Write a summary"},
+    "score":   {"type": "number"},
+}}
+
+
+class FakePipe:
+    """Stands in for a transformers text-generation pipeline; records every call.
+
+    Under a seed (see _seeded_rng) the seed is part of every text, as different
+    seeds give different samples.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.seed = None
+
+    def __call__(self, prompts, batch_size, max_length, num_return_sequences, **kw):
+        self.calls.append({"prompts": list(prompts), "batch_size": batch_size,
+                           "n": num_return_sequences, "seed": self.seed, **kw})
+        tag = "" if self.seed is None else f"s{self.seed} "
+        return [[{"generated_text": f"{p} #{i} {tag}"} for i in range(num_return_sequences)] for p in prompts]
+
+
+@pytest.fixture
+def pipe(monkeypatch, tmp_path):
+    fake, loads = FakePipe(), []
+    monkeypatch.setenv("HF_CACHE_PATH", str(tmp_path / "prompts.db"))
+    monkeypatch.setattr(huggingface, "_PIPELINES", {})
+    monkeypatch.setattr(huggingface, "_build_pipeline", lambda model, token, quantize: loads.append(model) or fake)
+
+    @contextlib.contextmanager
+    def seeded(seed):
+        fake.seed = seed
+        try:
+            yield
+        finally:
+            fake.seed = None
+    monkeypatch.setattr(huggingface, "_seeded_rng", seeded)
+    fake.loads = loads
+    return fake
+
+
+def test_model_loads_lazily_and_once_per_process(pipe):
+    """
+    Why: Loading the model in __init__ made every provider pay for it, even unused ones.
+    How: Two providers, nothing loaded until generation, then a single shared load.
+    """
+    a, b = HuggingFaceProvider(), HuggingFaceProvider()
+    assert pipe.loads == []
+    a.generate_dataset({"schema": SCHEMA, "num_records": 1})
+    b.generate_dataset({"schema": SCHEMA, "num_records": 1})
+    assert pipe.loads == ["gpt2"]
+    assert a.generator is b.generator is pipe
+
+
+def test_greedy_prompts_are_deduplicated_across_records(pipe, monkeypatch):
+    monkeypatch.setenv("HF_BATCH_SIZE", "4")
+    monkeypatch.setenv("HF_CHUNK_RECORDS", "10")
+    rows = HuggingFaceProvider().generate_dataset({"schema": SCHEMA, "num_records": 25})["data"]
+
+    assert len(rows) == 25
+    assert rows[0] == {"title": "Write a title #0", "summary": "Write a summary #0", "score": 0.0}
+    assert rows[-1] == rows[0]                        # greedy: same prompt, same completion
+    assert len(pipe.calls) == 1                       # 50 prompts → one batched call with 2
+    assert pipe.calls[0]["prompts"] == ["Write a title", "Write a summary"]
+    assert pipe.calls[0]["batch_size"] == 4
+
+
+def test_sampling_asks_for_one_sequence_per_copy(pipe, monkeypatch):
+    monkeypatch.setenv("HF_DO_SAMPLE", "1")
+    monkeypatch.setenv("HF_CHUNK_RECORDS", "6")
+    rows = HuggingFaceProvider().generate_dataset({"schema": SCHEMA, "num_records": 8})["data"]
+
+    assert [c["n"] for c in pipe.calls] == [6, 2]     # one call per chunk
+    assert all(c["do_sample"] and c["temperature"] == 0.7 for c in pipe.calls)
+    assert len({r["title"] for r in rows[:6]}) == 6   # every copy got its own sample
+
+
+def test_sampling_caps_sequences_per_call(pipe, monkeypatch):
+    """
+    Why: One distinct prompt repeated across a chunk asked for that many sequences in one call.
+    How: 10 copies with HF_MAX_RETURN_SEQUENCES=4 are generated in calls of 4, 4 and 2.
+    """
+    monkeypatch.setenv("HF_DO_SAMPLE", "1")
+    monkeypatch.setenv("HF_MAX_RETURN_SEQUENCES", "4")
+    rows = HuggingFaceProvider().generate_dataset({"schema": SCHEMA, "num_records": 10})["data"]
+
+    assert [c["n"] for c in pipe.calls] == [4, 4, 2]
+    assert all(c["prompts"] == ["Write a title", "Write a summary"] for c in pipe.calls)
+    assert len(rows) == 10 and all(r["title"].startswith("Write a title #") for r in rows)
+
+
+def test_seeded_sampling_differs_between_chunks(pipe, monkeypatch):
+    """
+    Why: Every chunk was re-seeded with HF_SEED itself, so chunk 2 repeated chunk 1's samples.
+    How: 8 records in chunks of 4 are sampled under two different derived seeds, none repeats.
+    """
+    monkeypatch.setenv("HF_DO_SAMPLE", "1")
+    monkeypatch.setenv("HF_SEED", "7")
+    monkeypatch.setenv("HF_CHUNK_RECORDS", "4")
+    monkeypatch.setenv("HF_CACHE", "0")
+    rows = HuggingFaceProvider().generate_dataset({"schema": SCHEMA, "num_records": 8})["data"]
+
+    assert len({r["title"] for r in rows}) == 8
+    assert len(pipe.calls) == 2 and pipe.calls[0]["seed"] != pipe.calls[1]["seed"]
+    assert all(c["seed"] is not None for c in pipe.calls)
+
+
+def test_seeded_samples_are_cached_per_chunk(pipe, monkeypatch):
+    """
+    Why: Sampled entries were keyed without the chunk, so later chunks (and later runs) got chunk 1's texts.
+    How: A multi-chunk seeded run stores one entry per chunk in the sqlite cache; a second run
+         replays it exactly, and a longer run only generates its new chunk.
+    """
+    monkeypatch.setenv("HF_DO_SAMPLE", "1")
+    monkeypatch.setenv("HF_SEED", "7")
+    monkeypatch.setenv("HF_CHUNK_RECORDS", "4")
+    first = HuggingFaceProvider()
+    rows = first.generate_dataset({"schema": SCHEMA, "num_records": 8})["data"]
+    assert len({r["title"] for r in rows}) == 8 and len(first.cache) == 4
+
+    second = HuggingFaceProvider()
+    assert second.generate_dataset({"schema": SCHEMA, "num_records": 8})["data"] == rows
+    assert len(pipe.calls) == 2 and second.stats["cache_hits"] == 4
+
+    longer = HuggingFaceProvider().generate_dataset({"schema": SCHEMA, "num_records": 12})["data"]
+    assert longer[:8] == rows and len({r["title"] for r in longer}) == 12
+    assert len(pipe.calls) == 3
+
+
+def test_completions_persist_across_providers(pipe, monkeypatch):
+    """
+    Why: Every RFD re-generated text for the same field descriptions from scratch.
+    How: A second provider (fresh in-memory state) is served entirely from the sqlite cache.
+    """
+    first = HuggingFaceProvider()
+    rows = first.generate_dataset({"schema": SCHEMA, "num_records": 3})["data"]
+    assert first.stats["cache_misses"] == 2 and first.stats["generated_tokens"] > 0
+    assert first.tokens_per_sec() > 0
+
+    second = HuggingFaceProvider()
+    assert second.generate_dataset({"schema": SCHEMA, "num_records": 3})["data"] == rows
+    assert len(pipe.calls) == 1 and second.stats["cache_hits"] == 2
+
+    monkeypatch.setenv("HF_MAX_LENGTH", "50")          # other params → other key
+    HuggingFaceProvider().generate_dataset({"schema": SCHEMA, "num_records": 1})
+    assert len(pipe.calls) == 2
+
+
+def test_unseeded_sampling_is_not_cached(pipe, monkeypatch):
+    monkeypatch.setenv("HF_DO_SAMPLE", "1")
+    for _ in range(2):
+        HuggingFaceProvider().generate_dataset({"schema": SCHEMA, "num_records": 2})
+    assert len(pipe.calls) == 2
+
+
+def test_prompt_cache_evicts_least_recently_used(tmp_path):
+    cache = PromptCache(tmp_path / "c.db", max_entries=2)
+    cache.put_many({"a": ["1"]})
+    cache.put_many({"b": ["2"]})
+    assert cache.get_many(["a"]) == {"a": ["1"]}       # touch a → b is now oldest
+    cache.put_many({"c": ["3"]})
+    assert len(cache) == 2 and cache.get_many(["a", "b", "c"]) == {"a": ["1"], "c": ["3"]}
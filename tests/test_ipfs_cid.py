@@ -0,0 +1,34 @@
+# tests/test_ipfs_cid.py
+import io
+
+from ipfsCid import CHUNK_SIZE, CIDIndex, compute_cid_stream
+
+
+def cid(data: bytes, version: int = 1) -> str:
+    return compute_cid_stream(io.BytesIO(data), version)
+
+
+def test_matches_ipfs_add_for_single_block_files():
+    """
+    Why: A locally computed CID is only useful if it equals what the IPFS node returns.
+    How: Known `ipfs add` outputs for small files, with and without --cid-version=1.
+    """
+    assert cid(b"") == "bafkreihdwdcefgh4dqkjv67uzcmw7ojee6xedzdetojuzjevtenxquvyku"
+    assert cid(b"hello world") == "bafkreifzjut3te2nhyekklss27nh3k72ysco7y32koao5eei66wof36n5e"
+    assert cid(b"hello world", 0) == "Qmf412jQZiuVUtdgnB36FXFX7xg5V6KEbSJ4dpQuhkLyfD"
+    assert cid(b"hello world\n", 0) == "QmT78zSuBmuS4z925WZfrqQ1qHaJ56DQaTfyMUF7F8ff5o"
+
+
+def test_multi_chunk_files_get_a_dag_pb_root():
+    data = bytes(range(256)) * (CHUNK_SIZE // 256) * 3 + b"tail"
+    root = cid(data)
+    assert root.startswith("bafybei")               # CIDv1 dag-pb sha2-256
+    assert root == cid(data)
+    assert root != cid(data[:-1])
+
+
+def test_index_roundtrip(tmp_path):
+    idx = CIDIndex(tmp_path / "idx.db")
+    assert idx.get("bafkx") is None
+    idx.put("bafkx", "ipfs://bafkx", 3)
+    assert CIDIndex(tmp_path / "idx.db").get("bafkx") == "ipfs://bafkx"
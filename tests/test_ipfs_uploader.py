@@ -1,19 +1,35 @@
 import pytest
 import requests
 import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import MagicMock
-from ipfsUploader import upload_to_ipfs
+
+import ipfsCid
+import ipfsUploader
+from ipfsCid import CIDIndex, compute_cid
+from ipfsUploader import IPFSUploader, KuboBackend, upload_to_ipfs
+
+
+@pytest.fixture(autouse=True)
+def pinata_env(monkeypatch, tmp_path):
+    monkeypatch.setenv("PINATA_API_KEY", "key")
+    monkeypatch.setenv("PINATA_SECRET_API_KEY", "secret")
+    monkeypatch.delenv("IPFS_BACKEND", raising=False)
+    monkeypatch.setattr(ipfsUploader, "_DEFAULT", None)
+    monkeypatch.setattr(ipfsCid, "INDEX_PATH", tmp_path / "cid_index.db")
+
 
 def test_upload_success(mocker):
     """
     Why: Verifies the happy path for IPFS uploads.
-    How: Mocks requests.post to simulate a successful API response from Pinata.
+    How: Mocks the pooled session's post to simulate a successful API response from Pinata.
     """
     # Arrange
     mock_response = MagicMock()
     mock_response.status_code = 200
     mock_response.json.return_value = {"IpfsHash": "QmTestCID"}
-    mocker.patch('requests.post', return_value=mock_response)
+    mocker.patch('requests.Session.post', return_value=mock_response)
 
     # Act
     result_uri = upload_to_ipfs("./sample_rfd.json")
@@ -24,7 +40,7 @@ def test_upload_success(mocker):
 def test_upload_failure(mocker):
     """
     Why: Ensures errors from Pinata are handled gracefully.
-    How: Mocks requests.post to simulate an API error.
+    How: Mocks the session post to simulate an API error.
     """
     mock_response = MagicMock()
     mock_response.status_code = 401  # Unauthorized
@@ -32,9 +48,116 @@ def test_upload_failure(mocker):
 
     mock_response.json.side_effect = json.JSONDecodeError("Expecting value", "doc", 0)
     
-    mocker.patch('requests.post', return_value=mock_response)
+    mocker.patch('requests.Session.post', return_value=mock_response)
 
 
     expected_error_msg = f"Failed to upload to IPFS: 401 - Invalid API Key"
     with pytest.raises(Exception, match=expected_error_msg):
-        upload_to_ipfs("./sample_rfd.json")
\ No newline at end of file
+        upload_to_ipfs("./sample_rfd.json")
+
+
+# --------------------------------------------------------------------------- #
+# Fake Kubo HTTP API: fails the first N requests with 503, then answers /add
+class FakeKubo(BaseHTTPRequestHandler):
+    fail_first = 0
+    bodies: list = []
+    lock = threading.Lock()
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        with self.lock:
+            FakeKubo.bodies.append(body)
+            fail = len(FakeKubo.bodies) <= FakeKubo.fail_first
+        if fail:
+            self.send_response(503); self.end_headers(); self.wfile.write(b"busy")
+            return
+        name = body.split(b'filename="')[1].split(b'"')[0].decode()
+        payload = json.dumps({"Name": name, "Hash": f"bafy{name}", "Size": str(len(body))})
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(payload.encode() + b"\n")
+
+    def log_message(self, *_):
+        pass
+
+
+@pytest.fixture
+def kubo():
+    FakeKubo.bodies, FakeKubo.fail_first = [], 0
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), FakeKubo)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{srv.server_address[1]}"
+    srv.shutdown()
+
+
+def test_streaming_upload_to_local_kubo_with_retry(kubo, tmp_path):
+    """
+    Why: Transient 5xx from the IPFS API should not fail a submission.
+    How: The fake server answers 503 twice; the third attempt streams the full file.
+    """
+    FakeKubo.fail_first = 2
+    f = tmp_path / "big.bin"
+    data = bytes(range(256)) * 20_000                # ~5 MB, several read() chunks
+    f.write_bytes(data)
+
+    up = IPFSUploader(KuboBackend(kubo), backoff=0.01, retries=3)
+    assert up.upload(str(f)) == "ipfs://bafybig.bin"
+    assert len(FakeKubo.bodies) == 3
+    assert data in FakeKubo.bodies[-1]
+
+
+def test_upload_many_in_parallel(kubo, tmp_path):
+    paths = []
+    for i in range(6):
+        p = tmp_path / f"f{i}.json"
+        p.write_text(json.dumps({"i": i}))
+        paths.append(str(p))
+
+    got = IPFSUploader(KuboBackend(kubo), max_workers=3).upload_many(paths)
+    assert got == {p: f"ipfs://bafyf{i}.json" for i, p in enumerate(paths)}
+
+
+def test_gives_up_after_retries(kubo, tmp_path):
+    FakeKubo.fail_first = 10
+    f = tmp_path / "x.json"
+    f.write_text("{}")
+    with pytest.raises(Exception, match="Failed to upload to IPFS: 503"):
+        IPFSUploader(KuboBackend(kubo), backoff=0.01, retries=1).upload(str(f))
+    assert len(FakeKubo.bodies) == 2
+
+
+def test_already_pinned_content_is_not_uploaded_again(kubo, tmp_path):
+    """
+    Why: Identical datasets (e.g. repeated yield_matrix answers) were re-uploaded every time.
+    How: Two files with the same bytes; only the first reaches the API, the second hits the index.
+    """
+    a, b = tmp_path / "a.json", tmp_path / "b.json"
+    a.write_text('{"same": true}')
+    b.write_text('{"same": true}')
+
+    up = IPFSUploader(KuboBackend(kubo), index=CIDIndex(tmp_path / "idx.db"))
+    first = up.upload(str(a))
+    assert up.upload(str(b)) == first
+    assert len(FakeKubo.bodies) == 1
+    assert CIDIndex(tmp_path / "idx.db").get(compute_cid(str(a))) == first
+
+
+def test_deferred_upload_returns_local_cid_first(kubo, tmp_path):
+    f = tmp_path / "d.json"
+    f.write_text('{"d": 1}')
+    up = IPFSUploader(KuboBackend(kubo), index=CIDIndex(tmp_path / "idx.db"))
+
+    uri, pending = up.upload_deferred(str(f))
+    assert uri == f"ipfs://{compute_cid(str(f))}"
+    assert pending.result(timeout=5) == "ipfs://bafyd.json"
+    assert len(FakeKubo.bodies) == 1
+
+    again, done = up.upload_deferred(str(f))       # indexed → no second request
+    assert done.done() and again == "ipfs://bafyd.json"
+    assert len(FakeKubo.bodies) == 1
+
+
+def test_pinata_is_asked_for_cidv1():
+    fields = ipfsUploader.PinataBackend().fields("x.json")
+    assert json.loads(fields["pinataOptions"]) == {"cidVersion": 1}
@@ -4,7 +4,15 @@ from unittest.mock import MagicMock
 from nftAuthorizer import NFTAuthorizer
 
 @pytest.fixture
-def mock_web3(mocker):
+def mock_web3(mocker, monkeypatch, tmp_path):
+    # NFTAuthorizer reads its RPC/contract config from the environment
+    abi = tmp_path / "nft_abi.json"
+    abi.write_text("[]")
+    monkeypatch.setenv("WEB3_RPC_URL", "http://127.0.0.1:8545")
+    monkeypatch.setenv("NFT_CONTRACT_ADDRESS", "0x" + "22" * 20)
+    monkeypatch.setenv("NFT_CONTRACT_ABI_PATH", str(abi))
+    monkeypatch.setenv("SOLVER_MOCK_MODE", "0")
+
     # This fixture creates a complex mock for the web3 library
     mock_w3_instance = MagicMock()
     mock_w3_instance.is_connected.return_value = True
@@ -45,4 +53,152 @@ def test_has_nft_false(mock_web3, mocker):
     has_nft = authorizer.has_nft("0xWalletWithoutNFT")
     
     # Assert
-    assert has_nft is False
\ No newline at end of file
+    assert has_nft is False
+
+def test_has_nft_is_cached(mock_web3):
+    """
+    Why: balanceOf used to be called for every RFD.
+    How: Two checks for the same wallet → one contract call; strict=True forces a fresh read.
+    """
+    call = mock_web3.eth.contract.return_value.functions.balanceOf.return_value.call
+    call.return_value = 1
+    authorizer = NFTAuthorizer()
+
+    assert authorizer.has_nft("0xWallet") and authorizer.has_nft("0xWallet")
+    assert call.call_count == 1
+
+    call.return_value = 0
+    assert authorizer.has_nft("0xWallet", strict=True) is False
+    assert call.call_count == 2
+
+
+def test_transfer_event_evicts_cached_owner(mock_web3):
+    """
+    Why: The cache must not keep authorising a wallet that sold its token.
+    How: Cache at head 100, then a Transfer from the wallet in block 101 evicts it.
+    """
+    contract = mock_web3.eth.contract.return_value
+    call = contract.functions.balanceOf.return_value.call
+    call.return_value = 1
+    mock_web3.eth.block_number = 100
+    authorizer = NFTAuthorizer()
+    authorizer.sync_transfers()                     # records head=100
+
+    assert authorizer.has_nft("0xSeller") is True
+
+    mock_web3.eth.block_number = 101
+    contract.events.Transfer.get_logs.return_value = [
+        {"blockNumber": 101, "args": {"from": "0xSELLER", "to": "0xBuyer"}},
+    ]
+    assert authorizer.sync_transfers() == 1
+    contract.events.Transfer.get_logs.assert_called_with(from_block=101, to_block=101)
+
+    call.return_value = 0
+    assert authorizer.has_nft("0xSeller") is False
+    assert call.call_count == 2
+
+
+def test_ownership_cache_ttl_and_block_awareness():
+    from nftAuthorizer import OwnershipCache
+
+    cache = OwnershipCache(ttl=60)
+    cache.put("0xA", 2, block=50)
+    cache.invalidate("0xa", block=50)               # same block → read already saw it
+    assert cache.get("0xA") == 2
+    cache.invalidate("0xa", block=51)
+    assert cache.get("0xA") is None
+
+    cache = OwnershipCache(ttl=0)
+    cache.put("0xB", 1, block=1)
+    assert cache.get("0xB") is None
+
+
+# --------------------------------------------------------------------------- #
+# Multicall batching
+ERC721_ABI = [
+    {"name": "balanceOf", "type": "function", "stateMutability": "view",
+     "inputs": [{"name": "owner", "type": "address"}],
+     "outputs": [{"name": "", "type": "uint256"}]},
+    {"name": "tokenOfOwnerByIndex", "type": "function", "stateMutability": "view",
+     "inputs": [{"name": "owner", "type": "address"}, {"name": "index", "type": "uint256"}],
+     "outputs": [{"name": "", "type": "uint256"}]},
+]
+
+
+class FakeMulticall:
+    """Answers aggregate3 from an in-memory owner → token ids map."""
+    def __init__(self, contract, holdings, broken=()):
+        self.contract, self.holdings, self.broken = contract, holdings, set(broken)
+        self.round_trips = 0
+        self.calls = 0
+        self.functions = self
+
+    def aggregate3(self, calls):
+        fake = self
+        class _Call:
+            def call(self, block_identifier="latest"):
+                fake.round_trips += 1
+                fake.calls += len(calls)
+                return [fake._answer(data) for _, _, data in calls]
+        return _Call()
+
+    def _answer(self, data):
+        fn, args = self.contract.decode_function_input(data)
+        owned = self.holdings.get(args["owner"].lower(), [])
+        if fn.fn_name == "balanceOf":
+            return (True, len(owned).to_bytes(32, "big"))
+        if (args["owner"].lower(), args["index"]) in self.broken:
+            return (False, b"")
+        return (True, owned[args["index"]].to_bytes(32, "big"))
+
+
+@pytest.fixture
+def real_codec_authorizer(mocker, monkeypatch, tmp_path):
+    import json as _json
+    from web3 import Web3 as RealWeb3
+
+    abi = tmp_path / "nft_abi.json"
+    abi.write_text(_json.dumps(ERC721_ABI))
+    monkeypatch.setenv("WEB3_RPC_URL", "http://127.0.0.1:8545")
+    monkeypatch.setenv("NFT_CONTRACT_ADDRESS", "0x" + "22" * 20)
+    monkeypatch.setenv("NFT_CONTRACT_ABI_PATH", str(abi))
+    monkeypatch.setenv("SOLVER_MOCK_MODE", "0")
+    mocker.patch("nftAuthorizer.Web3", return_value=RealWeb3())   # offline: encode/decode only
+    return NFTAuthorizer()
+
+
+def test_get_owned_token_ids_many_uses_two_round_trips(real_codec_authorizer):
+    """
+    Why: N+2 sequential calls per wallet is too slow for bulk checks.
+    How: Three wallets holding 3+0+2 tokens are resolved with two aggregate3 calls.
+    """
+    a, b, c = ("0x" + x * 40 for x in "abc")
+    auth = real_codec_authorizer
+    auth._mc = FakeMulticall(auth.contract, {a: [7, 8, 9], c: [42, 43]})
+
+    got = auth.get_owned_token_ids_many([a, b, c])
+
+    assert got == {a: [7, 8, 9], b: [], c: [42, 43]}
+    assert auth._mc.round_trips == 2
+    assert auth.has_nft(c) is True and auth.has_nft(b) is False   # balances warmed the cache
+    assert auth._mc.round_trips == 2
+
+
+def test_get_owned_token_ids_many_dedupes_wallets(real_codec_authorizer):
+    """
+    Why: A wallet listed twice was queried twice and its token ids came back doubled.
+    How: [a, a, c] costs 2 balanceOf + 5 tokenOfOwnerByIndex calls and lists each token once.
+    """
+    a, c = "0x" + "a" * 40, "0x" + "c" * 40
+    auth = real_codec_authorizer
+    auth._mc = FakeMulticall(auth.contract, {a: [7, 8, 9], c: [42, 43]})
+
+    assert auth.get_owned_token_ids_many([a, a, c]) == {a: [7, 8, 9], c: [42, 43]}
+    assert auth._mc.calls == 2 + 5
+
+
+def test_get_owned_token_ids_stops_at_first_failing_index(real_codec_authorizer):
+    a = "0x" + "a" * 40
+    auth = real_codec_authorizer
+    auth._mc = FakeMulticall(auth.contract, {a: [1, 2, 3]}, broken={(a, 1)})
+    assert auth.get_owned_token_ids(a) == [1]
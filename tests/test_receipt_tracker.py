@@ -0,0 +1,123 @@
+# tests/test_receipt_tracker.py
+from unittest.mock import MagicMock
+
+import pytest
+from web3.exceptions import TransactionNotFound
+
+from receiptTracker import ReceiptTracker, TxFailed
+
+
+class FakeChain:
+    """Receipts keyed by hash; everything else is 'not found'."""
+    def __init__(self):
+        self.receipts, self.sent = {}, []
+        self.eth = MagicMock()
+        self.eth.get_transaction_receipt.side_effect = self._receipt
+        self.eth.send_raw_transaction.side_effect = self._send
+
+    def _receipt(self, h):
+        if h not in self.receipts:
+            raise TransactionNotFound(h)
+        return self.receipts[h]
+
+    def _send(self, raw):
+        self.sent.append(raw)
+        return f"0xbump{len(self.sent)}"
+
+    @staticmethod
+    def to_hex(b):
+        return b
+
+
+def make(chain, **kw):
+    return ReceiptTracker(chain, sign=lambda tx: tx["gasPrice"], batch=False, **kw)
+
+
+def test_confirmed_tx_reports_success():
+    chain, seen = FakeChain(), []
+    tr  = make(chain)
+    fut = tr.track("0xaa", {"nonce": 1, "gasPrice": 100}, on_done=seen.append)
+
+    tr.poll_once()
+    assert not fut.done()
+
+    chain.receipts["0xaa"] = {"status": 1}
+    tr.poll_once()
+    assert fut.result(timeout=1) == {"status": 1}
+    assert seen == [True] and tr.pending() == 0
+
+
+def test_reverted_tx_reports_failure():
+    chain, seen = FakeChain(), []
+    tr  = make(chain)
+    fut = tr.track("0xaa", {"nonce": 1, "gasPrice": 100}, on_done=seen.append)
+    chain.receipts["0xaa"] = {"status": 0}
+    tr.poll_once()
+    with pytest.raises(TxFailed):
+        fut.result(timeout=1)
+    assert seen == [False]
+
+
+def test_stuck_tx_is_bumped_and_replacement_counts():
+    """
+    Why: Underpriced txs must not sit in the mempool forever.
+    How: stuck_after=0 → each poll re-signs with gas ×1.125; the replacement hash confirms.
+    """
+    chain, seen = FakeChain(), []
+    tr  = make(chain, stuck_after=0, max_bumps=2)
+    fut = tr.track("0xaa", {"nonce": 1, "gasPrice": 100}, on_done=seen.append)
+
+    tr.poll_once()
+    assert chain.sent == [113]
+
+    chain.receipts["0xbump1"] = {"status": 1}
+    tr.poll_once()
+    assert fut.result(timeout=1)["status"] == 1
+    assert seen == [True]
+
+
+def test_gives_up_after_max_bumps():
+    chain, seen = FakeChain(), []
+    tr  = make(chain, stuck_after=0, max_bumps=1)
+    fut = tr.track("0xaa", {"nonce": 1, "gasPrice": 100}, on_done=seen.append)
+    tr.poll_once()
+    tr.poll_once()
+    with pytest.raises(TxFailed):
+        fut.result(timeout=1)
+    assert seen == [False]
+
+
+def test_background_thread_confirms_without_blocking():
+    chain = FakeChain()
+    tr  = make(chain, poll_interval=0.01).start()
+    fut = tr.track("0xaa", {"nonce": 1, "gasPrice": 1})
+    chain.receipts["0xaa"] = {"status": 1}
+    assert fut.result(timeout=5)["status"] == 1
+    tr.stop(timeout=1)
+
+
+def test_batch_poll_mixes_mined_and_unmined():
+    """
+    Why: A batch of typed get_transaction_receipt calls raised for the whole batch whenever
+         one tx was unmined (the normal case), then fell back to one call per tx.
+    How: raw eth_getTransactionReceipt batch; null results stay pending, hex fields decode,
+         and no per-tx calls are made.
+    """
+    chain = FakeChain()
+    chain.provider = MagicMock()
+    chain.provider.make_batch_request.return_value = [
+        {"jsonrpc": "2.0", "id": 0, "result": {"status": "0x1", "blockNumber": "0x10"}},
+        {"jsonrpc": "2.0", "id": 1, "result": None},
+        {"jsonrpc": "2.0", "id": 2, "result": {"status": "0x0"}},
+    ]
+    tr = ReceiptTracker(chain, sign=lambda tx: tx["gasPrice"])
+    mined, unmined, reverted = (tr.track(h, {"nonce": i, "gasPrice": 1}) for i, h in enumerate(("0xa", "0xb", "0xc")))
+
+    tr.poll_once()
+    chain.provider.make_batch_request.assert_called_once_with(
+        [("eth_getTransactionReceipt", [h]) for h in ("0xa", "0xb", "0xc")])
+    assert mined.result(timeout=1) == {"status": 1, "blockNumber": 16}
+    with pytest.raises(TxFailed):
+        reverted.result(timeout=1)
+    assert not unmined.done() and tr.pending() == 1
+    chain.eth.get_transaction_receipt.assert_not_called()
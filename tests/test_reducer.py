@@ -1,7 +1,162 @@
-from datasolver.providers.mcp.tools.reducer import ReduceAvgTool
+import statistics
+
+import numpy as np
+import pytest
+
+from datasolver.aggregate import ColumnBuilder, aggregate
+from datasolver.providers.mcp.client import MCPClient
+from datasolver.providers.mcp.router import RFDRouter
+from datasolver.providers.mcp.tools.reducer import ReduceAvgTool, ReduceTool
+from datasolver.providers.mcp.tools.tool import MCPTool
 
 def test_avg():
     tool = ReduceAvgTool()
     rfd = {"service":"reduce_avg",
            "records":[{"x":1,"y":2},{"x":3,"y":4}]}
     assert tool.generate(rfd) == [{"x":2,"y":3}]
+
+
+def test_avg_ignores_non_numeric_and_missing_values():
+    tool = ReduceAvgTool()
+    rfd = {"service": "reduce_avg",
+           "records": [{"x": 1, "s": "a"}, {"x": None, "y": 2.5}, {"x": 4, "y": 0.5}, {}]}
+    assert tool.generate(rfd) == [{"x": 2.5, "y": 1.5}]
+    assert tool.generate({"service": "reduce_avg", "records": []}) == [{}]
+
+
+def test_numpy_scalars_are_numeric():
+    """
+    Why: Exact type checks dropped NumPy scalars, so np.float64 columns reduced to nothing.
+    How: pure and mixed NumPy/Python columns reduce the same way in both engines.
+    """
+    tool = ReduceAvgTool()
+    rfd = {"service": "reduce_avg", "records": [{"a": np.float64(1.5)}, {"a": np.float64(2.5)}]}
+    assert tool.generate(rfd) == [{"a": 2.0}]
+    mixed = {"service": "reduce_avg", "records": [{"a": 1, "b": "x"}, {"a": np.int64(3), "b": np.float32(2)}]}
+    assert tool.generate(mixed) == [{"a": 2.0, "b": 2.0}]
+    assert tool.generate({**mixed, "streaming": True}) == [{"a": 2.0, "b": 2.0}]
+
+
+def test_all_aggregates_grouped():
+    """
+    Why: ReduceAvgTool rescanned every record once per key and could only average.
+    How: every aggregate, per group, checked against statistics/numpy on the same data.
+    """
+    rng = np.random.default_rng(0)
+    records = [{"region": ["eu", "us", "ap"][i % 3], "latency": float(rng.gamma(2.0, 10.0)), "n": int(i)}
+               for i in range(3000)]
+    rfd = {"service": "reduce", "records": records, "group_by": "region",
+           "aggregates": ["mean", "sum", "min", "max", "count", "stddev", "median", "p95"]}
+    tool = ReduceTool()
+    assert tool.validate_rfd(rfd)
+    out = tool.generate(rfd)
+
+    assert [row["region"] for row in out] == ["eu", "us", "ap"]
+    for row in out:
+        lat = [r["latency"] for r in records if r["region"] == row["region"]]
+        n = [r["n"] for r in records if r["region"] == row["region"]]
+        assert row["latency_mean"] == pytest.approx(statistics.fmean(lat))
+        assert row["latency_stddev"] == pytest.approx(statistics.pstdev(lat))
+        assert row["latency_median"] == pytest.approx(statistics.median(lat))
+        assert row["latency_p95"] == pytest.approx(np.percentile(lat, 95))
+        assert (row["latency_min"], row["latency_max"]) == (min(lat), max(lat))
+        assert row["n_sum"] == sum(n) and type(row["n_sum"]) is int
+        assert row["n_count"] == 1000
+
+
+def test_column_builder_batches_match_single_pass():
+    records = [{"k": i % 7, "v": i * 0.5, "w": i} for i in range(1000)]
+    builder = ColumnBuilder(group_by=["k"])
+    for i in range(0, 1000, 128):
+        builder.add(records[i:i + 128])
+    assert builder.reduce(["mean", "max", "p50"]) == aggregate(records, ["mean", "max", "p50"], group_by=["k"])
+    assert builder.rows == 1000
+
+
+def test_unknown_aggregate_is_rejected():
+    tool = ReduceTool()
+    assert not tool.validate_rfd({"service": "reduce", "records": [], "aggregates": ["mode"]})
+    assert tool.validate_rfd({"service": "reduce", "records": [], "aggregates": ["p99.9"]})
+
+
+class RowsTool(MCPTool):
+    name = "rows"
+    description = "Emits the rows given in the RFD"
+    capabilities = {}
+
+    def validate_rfd(self, rfd):
+        return rfd.get("service") == self.name
+
+    def generate_data(self, rfd):
+        return rfd["rows"]
+
+    def generate(self, rfd, **kwargs):
+        return self.generate_data(rfd)
+
+    def cost(self, rfd):
+        return 1.0
+
+
+def test_router_feeds_dependency_records_into_reducer():
+    """
+    Why: Dependency records were merged next to a tool's output, so a reducer never saw them.
+    How: two dependencies produce rows; the reduce RFD returns only the aggregate over both.
+    """
+    router = RFDRouter(MCPClient(tools=[RowsTool, ReduceTool]))
+    rfd = {"service": "reduce", "aggregates": ["sum", "count"],
+           "dependencies": [{"service": "rows", "rows": [{"v": 1}, {"v": 2}]},
+                            {"service": "rows", "rows": [{"v": 3}]}]}
+    out = router.fulfil(rfd)
+    assert out["tool"] == "reduce"
+    assert out["records"] == [{"v_sum": 6, "v_count": 3}]
+
+
+class CountingStreamTool(MCPTool):
+    """Leaf tool that only streams: generate() would materialise and is forbidden."""
+    name = "stream"
+    description = "Streams n rows in chunks"
+    capabilities = {}
+
+    def validate_rfd(self, rfd):
+        return rfd.get("service") == self.name
+
+    def generate_data(self, rfd):
+        raise AssertionError("dependency records were materialised")
+
+    generate = generate_data
+
+    def iter_records(self, rfd):
+        for start in range(0, rfd["n"], 1000):
+            yield [{"k": rfd["k"], "v": i} for i in range(start, min(start + 1000, rfd["n"]))]
+
+    def cost(self, rfd):
+        return 1.0
+
+
+def test_router_streams_dependencies_into_partial_aggregates(mocker):
+    """
+    Why: fulfil() built every dependency's full record list before a reducer could start.
+    How: three streaming dependencies (never generate()d) each fold into a partial on the
+         router's thread pool; the merged result equals the exact aggregate.
+    """
+    router = RFDRouter(MCPClient(tools=[CountingStreamTool, ReduceTool]))
+    partial = mocker.spy(ReduceTool, "partial")
+    deps = [{"service": "stream", "k": k, "n": n} for k, n in (("a", 30_000), ("b", 5_000), ("a", 1_000))]
+    rfd = {"service": "reduce", "aggregates": ["count", "sum", "max", "distinct"], "group_by": "k",
+           "dependencies": deps}
+
+    out = router.fulfil(rfd)["records"]
+    assert partial.call_count == 3
+    assert out == [
+        {"k": "a", "v_count": 31_000, "v_sum": sum(range(30_000)) + sum(range(1_000)), "v_max": 29_999,
+         "v_distinct": pytest.approx(30_000, rel=0.03)},
+        {"k": "b", "v_count": 5_000, "v_sum": sum(range(5_000)), "v_max": 4_999,
+         "v_distinct": pytest.approx(5_000, rel=0.03)},
+    ]
+
+
+def test_reducer_accepts_iterables():
+    tool = ReduceTool()
+    rfd = {"service": "reduce", "records": ({"v": i} for i in range(10)), "aggregates": ["mean", "p50"]}
+    assert tool.validate_rfd(rfd)
+    assert tool.generate(rfd) == [{"v_mean": 4.5, "v_p50": 4.5}]
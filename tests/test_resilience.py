@@ -0,0 +1,156 @@
+# tests/test_resilience.py
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from datasolver import deadline
+from datasolver.util.resilience import CLOSED, HALF_OPEN, OPEN, Upstream, UpstreamUnavailable
+
+
+class FakeUpstream:
+    """Local HTTP server; `script` is popped per request as (delay_s, status), default (0, 200)."""
+
+    def __init__(self):
+        self.script, self.hits, self.version = [], 0, 1
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with lock:
+                    fake.hits += 1
+                    delay, status = fake.script.pop(0) if fake.script else (0.0, 200)
+                time.sleep(delay)
+                body = json.dumps({"data": [{"v": fake.version}]}).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.host = f"127.0.0.1:{self.server.server_port}"
+        self.url = f"http://{self.host}/pools"
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def fake():
+    server = FakeUpstream()
+    yield server
+    server.close()
+
+
+def test_slow_request_is_hedged(fake):
+    """
+    Why: One slow response from the single upstream showed up directly in our p99.
+    How: the first request stalls for 1 s; after the hedge delay a second request
+         is sent and its fast answer is returned.
+    """
+    up = Upstream(hedge_after=0.05, timeout=5)
+    fake.script = [(1.0, 200)]
+    start = time.monotonic()
+    assert up.get_json(fake.url) == {"data": [{"v": 1}]}
+    assert time.monotonic() - start < 0.5
+    assert up.counters["hedges"] == 1 and up.counters["hedge_wins"] == 1 and fake.hits == 2
+
+
+def test_hedge_delay_tracks_p95(fake):
+    up = Upstream(hedge_after=3.0, min_samples=5)
+    for _ in range(4):
+        up.get_json(fake.url)
+    assert up.hedge_delay(fake.host) == 3.0
+    up.get_json(fake.url)
+    assert up.hedge_delay(fake.host) < 0.5
+
+
+def test_breaker_opens_serves_snapshot_and_recovers(fake):
+    """
+    Why: A failing upstream was retried on every RFD and its errors surfaced to callers.
+    How: after 3 failures the host's breaker opens; calls stop reaching the server and
+         get the last good snapshot; after the cooldown one probe closes it again.
+    """
+    up = Upstream(failures=3, cooldown=0.2, hedge_after=5)
+    assert up.get_json(fake.url) == {"data": [{"v": 1}]}
+
+    fake.version = 2
+    fake.script = [(0, 500)] * 3
+    for _ in range(3):
+        assert up.get_json(fake.url) == {"data": [{"v": 1}]}      # snapshot
+    host = up.status()["hosts"][fake.host]
+    assert host["state"] == OPEN and host["trips"] == 1
+
+    hits = fake.hits
+    assert up.get_json(fake.url) == {"data": [{"v": 1}]}
+    assert fake.hits == hits and up.counters["short_circuits"] == 1
+
+    time.sleep(0.25)
+    breaker = up.breaker(fake.host)
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    breaker.release()
+    assert up.get_json(fake.url) == {"data": [{"v": 2}]}
+    assert up.status()["hosts"][fake.host]["state"] == CLOSED
+    assert up.counters["fallbacks"] == 4
+
+
+def test_failed_probe_reopens_and_no_snapshot_raises(fake):
+    up = Upstream(failures=1, cooldown=0.05, hedge_after=5)
+    fake.script = [(0, 500), (0, 500)]
+    with pytest.raises(UpstreamUnavailable):
+        up.get_json(fake.url)
+    time.sleep(0.1)
+    with pytest.raises(UpstreamUnavailable):
+        up.get_json(fake.url)                                     # the half-open probe fails
+    assert up.status()["hosts"][fake.host]["trips"] == 2
+
+
+def test_snapshot_survives_restart_on_disk(fake, tmp_path):
+    Upstream(snapshot_dir=tmp_path).get_json(fake.url)
+    fake.script = [(0, 503)]
+    assert Upstream(snapshot_dir=tmp_path, hedge_after=5).get_json(fake.url) == {"data": [{"v": 1}]}
+
+
+def test_client_errors_raise_without_fallback_or_breaker(fake):
+    """
+    Why: A 404 tripped the breaker and was answered from the snapshot, hiding a bad request.
+    How: with a snapshot in hand and failures=1, a 404 is raised as HTTPError and the
+         breaker stays closed; a following 500 still counts and falls back.
+    """
+    up = Upstream(failures=1, hedge_after=5)
+    up.get_json(fake.url)
+    fake.script = [(0, 404), (0, 500)]
+    with pytest.raises(requests.HTTPError):
+        up.get_json(fake.url)
+    assert up.status()["hosts"][fake.host]["state"] == CLOSED
+    assert up.counters["fallbacks"] == 0 and up.counters["failures"] == 0
+
+    assert up.get_json(fake.url) == {"data": [{"v": 1}]}
+    assert up.status()["hosts"][fake.host]["state"] == OPEN
+
+
+def test_corrupt_snapshot_counts_as_missing(fake, tmp_path):
+    up = Upstream(snapshot_dir=tmp_path, hedge_after=5)
+    up._snapshot_path(fake.url).write_text("{not json")
+    fake.script = [(0, 503)]
+    with pytest.raises(UpstreamUnavailable):
+        up.get_json(fake.url)
+
+
+def test_deadline_cut_does_not_trip_the_breaker(fake):
+    up = Upstream(failures=1, hedge_after=5, timeout=5)
+    fake.script = [(0.5, 200)]
+    with deadline.budget(0.1), pytest.raises(deadline.DeadlineExceeded):
+        up.get_json(fake.url)
+    assert up.status()["hosts"][fake.host]["state"] == CLOSED
@@ -0,0 +1,140 @@
+# tests/test_rfd_listener.py
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from rfdListener import BlockCheckpoint, RFDListener
+
+
+def make_event(block, idx, rfd_id, tx=None):
+    return {
+        "blockNumber": block, "logIndex": idx,
+        "transactionHash": tx or bytes([block % 256, idx]) * 16,
+        "args": {"rfdId": rfd_id, "name": f"n{rfd_id}", "description": "d", "schema": "{}"},
+    }
+
+
+@pytest.fixture
+def listener(mocker, tmp_path, monkeypatch):
+    abi = tmp_path / "abi.json"
+    abi.write_text("[]")
+    monkeypatch.setenv("WEB3_RPC_URL", "http://127.0.0.1:8545")
+    monkeypatch.setenv("EXCHANGE_CONTRACT_ADDRESS", "0x" + "11" * 20)
+    monkeypatch.setenv("EXCHANGE_CONTRACT_ABI_PATH", str(abi))
+    monkeypatch.setenv("RFD_START_BLOCK", "100")
+    monkeypatch.setenv("RFD_MAX_BLOCK_RANGE", "50")
+
+    w3 = MagicMock()
+    w3.eth.block_number = 199
+    mocker.patch("rfdListener.Web3", return_value=w3)
+    return RFDListener(checkpoint=BlockCheckpoint(tmp_path / "cp.json"))
+
+
+def logs_from(events, calls=None, max_span=None):
+    def get_logs(from_block, to_block):
+        if calls is not None:
+            calls.append((from_block, to_block))
+        if max_span and to_block - from_block + 1 > max_span:
+            raise ValueError("query returned more than 10000 results")
+        return [e for e in events if from_block <= e["blockNumber"] <= to_block]
+    return get_logs
+
+
+def test_backfill_walks_bounded_ranges_and_checkpoints(listener):
+    """
+    Why: Events emitted while the solver was down must not be lost.
+    How: Start block 100, head 199, range 50 → two getLogs calls; checkpoint = 199.
+    """
+    calls, got = [], []
+    events = [make_event(120, 0, "a"), make_event(180, 3, "b")]
+    listener.contract.events.RFDPosted.get_logs.side_effect = logs_from(events, calls)
+
+    assert listener.backfill(got.append) == 2
+    assert calls == [(100, 149), (150, 199)]
+    assert [r["rfd_id"] for r in got] == ["a", "b"]
+    assert listener.checkpoint.load() == 199
+
+
+def test_restart_resumes_from_checkpoint(listener, tmp_path):
+    listener.checkpoint.save(180)
+    calls = []
+    listener.contract.events.RFDPosted.get_logs.side_effect = logs_from([], calls)
+    listener.backfill(lambda rfd: None)
+    assert calls == [(181, 199)]
+
+
+def test_range_shrinks_when_node_refuses(listener):
+    calls, got = [], []
+    events = [make_event(b, 0, str(b)) for b in (105, 140, 190)]
+    listener.contract.events.RFDPosted.get_logs.side_effect = logs_from(events, calls, max_span=20)
+
+    assert listener.backfill(got.append) == 3
+    assert all(hi - lo + 1 <= 50 for lo, hi in calls)
+    assert listener.checkpoint.load() == 199
+
+
+def test_dedupes_on_tx_hash_and_log_index(listener):
+    got = []
+    dup = make_event(150, 1, "x", tx=b"\xaa" * 32)
+    listener._dispatch([dup, dup, make_event(150, 2, "y", tx=b"\xaa" * 32)], got.append)
+    listener._dispatch([dup], got.append)
+    assert [r["rfd_id"] for r in got] == ["x", "y"]
+
+
+def test_event_redelivered_when_callback_fails(listener):
+    """
+    Why: Events were marked seen before the callback ran, so one that failed was never retried.
+    How: the first callback raises; dispatching the same event again delivers it.
+    """
+    got = []
+    event = make_event(150, 1, "x")
+
+    def flaky(rfd):
+        if not got:
+            got.append(None)
+            raise RuntimeError("solver busy")
+        got.append(rfd["rfd_id"])
+
+    with pytest.raises(RuntimeError):
+        listener._dispatch([event], flaky)
+    listener._dispatch([event], flaky)
+    listener._dispatch([event], flaky)
+    assert got == [None, "x"]
+
+
+def test_transient_errors_retry_without_shrinking(listener, mocker):
+    """
+    Why: Any get_logs error halved the range, so a flaky connection collapsed it to single blocks.
+    How: two connection errors are retried with backoff on the same range; an error that
+         is neither transient nor a range refusal is raised as is.
+    """
+    sleep = mocker.patch("rfdListener.time.sleep")
+    calls = []
+    ok = logs_from([make_event(120, 0, "a")], calls)
+    outcomes = [ConnectionError("reset"), TimeoutError("read timed out")]
+
+    def get_logs(from_block, to_block):
+        if outcomes:
+            calls.append((from_block, to_block))
+            raise outcomes.pop(0)
+        return ok(from_block, to_block)
+    listener.contract.events.RFDPosted.get_logs.side_effect = get_logs
+
+    assert listener.backfill(lambda rfd: None) == 1
+    assert calls[:3] == [(100, 149)] * 3
+    assert [c.args[0] for c in sleep.call_args_list] == [1.0, 2.0]
+    assert listener._range == 50
+
+    listener.contract.events.RFDPosted.get_logs.side_effect = ValueError("invalid address")
+    with pytest.raises(ValueError):
+        listener.backfill(lambda rfd: None, to_block=250)
+    assert listener._range == 50
+
+
+def test_checkpoint_roundtrip(tmp_path):
+    cp = BlockCheckpoint(tmp_path / "state" / "cp.json")
+    assert cp.load() is None
+    cp.save(42)
+    assert cp.load() == 42
+    assert json.loads((tmp_path / "state" / "cp.json").read_text()) == {"block": 42}
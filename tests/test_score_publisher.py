@@ -0,0 +1,70 @@
+# tests/test_score_publisher.py
+from unittest.mock import MagicMock
+
+from eth_account import Account
+from eth_account.messages import encode_defunct
+
+import score_publisher
+from score_publisher import ScoreBatcher, build_attestations, rep_hash, to_bps
+
+KEYS = ["0x" + f"{i:064x}" for i in range(1, 6)]
+
+
+def test_attestation_recovers_to_provider():
+    """
+    Why: RewardGauge recovers the provider from the signature over repHash.
+    How: Sign locally and recover with the same eth-signed-message prefix.
+    """
+    acct = Account.from_key(KEYS[0])
+    [att] = build_attestations([(acct.address.lower(), 0.75)], KEYS[:1], epoch=7)
+
+    assert att.score_bps == 7500
+    assert att.rep_hash == rep_hash(acct.address, 7500, 7)
+    signer = Account.recover_message(encode_defunct(primitive=att.rep_hash), signature=att.signature)
+    assert signer == acct.address
+
+
+def test_unknown_providers_are_skipped():
+    atts = build_attestations([("0x" + "ab" * 20, 0.9)], KEYS[:1], epoch=0)
+    assert atts == []
+
+
+def test_to_bps_clamps():
+    assert to_bps(1.2) == 10_000
+    assert to_bps(-0.1) == 0
+    assert to_bps(0.4321) == 4321
+
+
+def test_publish_one_tx_per_batch():
+    """
+    Why: Epoch publishing must cost one tx per batch, not one per provider.
+    How: Five attestations with batch_size=2 → three submitScores txs, consecutive nonces.
+    """
+    scores = [(Account.from_key(k).address.lower(), 0.5) for k in KEYS]
+    atts   = build_attestations(scores, KEYS, epoch=1)
+
+    w3 = MagicMock()
+    w3.eth.get_transaction_count.return_value = 10
+    w3.eth.send_raw_transaction.side_effect = lambda raw: b"\x01" * 32
+    w3.to_hex.side_effect = lambda b: "0x" + bytes(b).hex()
+    contract = MagicMock()
+    contract.functions.submitScores.return_value.build_transaction.side_effect = lambda p: {
+        "to": "0x" + "11" * 20, "value": 0, "gas": 500_000, "gasPrice": 1,
+        "data": "0x", "nonce": p["nonce"], "chainId": p["chainId"],
+    }
+
+    hashes = ScoreBatcher(w3, contract, KEYS[0], batch_size=2, chain_id=31337).publish(atts)
+
+    assert len(hashes) == 3
+    assert w3.eth.get_transaction_count.call_count == 1
+    nonces = [c.args[0]["nonce"] for c in
+              contract.functions.submitScores.return_value.build_transaction.call_args_list]
+    assert nonces == [10, 11, 12]
+    sizes = [len(c.args[0]) for c in contract.functions.submitScores.call_args_list]
+    assert sizes == [2, 2, 1]
+
+
+def test_publish_noop_when_empty():
+    w3 = MagicMock()
+    assert ScoreBatcher(w3, MagicMock(), KEYS[0]).publish([]) == []
+    w3.eth.send_raw_transaction.assert_not_called()
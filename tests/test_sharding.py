@@ -0,0 +1,52 @@
+# tests/test_sharding.py
+import json, os
+
+import pytest
+
+from datasolver.providers.mock import MockProvider
+from datasolver.providers.mcp.tools.dynamodb import DynamoDBTool
+from datasolver.providers.mcp.tools.text_generator import TextGeneratorTool
+from datasolver.sharding import flatten_batches, generate_sharded, plan_shards, write_sharded
+
+RFD = json.load(open(os.path.join(os.path.dirname(__file__), "..", "sample_rfd.json")))
+
+
+def test_plan_covers_every_record_once():
+    shards = plan_shards(1_050, shard_size=100, seed=1)
+    assert [s.index for s in shards] == list(range(11))
+    assert sum(s.count for s in shards) == 1_050 and shards[-1].count == 50
+    assert all(a.stop == b.start for a, b in zip(shards, shards[1:]))
+    assert shards[0].seed_sequence().generate_state(2).tolist() != shards[1].seed_sequence().generate_state(2).tolist()
+    assert plan_shards(0) == []
+
+
+@pytest.mark.parametrize("workers", [2, 3])
+def test_mock_output_is_identical_for_any_worker_count(workers):
+    """
+    Why: Sharded generation must be reproducible no matter how many processes ran it.
+    How: Same seed and shard size, 1 vs N spawn-started workers, compare every record.
+    """
+    rfd = {**RFD, "num_records": 2_500, "seed": 42, "shard_size": 400}
+    inline   = MockProvider(workers=1).generate_dataset(rfd)["data"]
+    parallel = MockProvider(workers=workers).generate_dataset(rfd)["data"]
+    assert len(parallel) == 2_500
+    assert parallel == inline
+
+
+def test_tools_shard_with_absolute_record_indices():
+    rfd = {"schema": {"properties": {"k": {"type": "string"}, "v": {"type": "number"}}},
+           "num_records": 25, "shard_size": 10}
+    rows = list(flatten_batches(generate_sharded(DynamoDBTool, rfd, workers=2)))
+    assert [r["k"] for r in rows] == [f"value_{i}" for i in range(25)]
+    assert rows[24]["v"] == 24.0
+
+    text = list(flatten_batches(generate_sharded(TextGeneratorTool, {**rfd, "num_records": 12}, workers=1)))
+    assert len(text) == 12 and text[0]["v"] == 0.0
+
+
+def test_write_sharded_produces_one_file_per_shard(tmp_path):
+    rfd = {**RFD, "num_records": 250, "seed": 5, "shard_size": 100, "batch_size": 30}
+    paths = write_sharded(MockProvider, rfd, str(tmp_path / "out"), "jsonl", workers=2)
+    assert [os.path.basename(p) for p in paths] == [f"out.part0000{i}.jsonl" for i in range(3)]
+    rows = [json.loads(line) for p in paths for line in open(p)]
+    assert rows == MockProvider(batch_size=30, workers=1).generate_dataset(rfd)["data"]
@@ -0,0 +1,70 @@
+# tests/test_streaming.py
+import json, os, types
+
+from datasolver import DataSolver, ProviderType
+from datasolver.providers.mock import MockProvider
+from datasolver.providers.mcp.client import MCPClient
+from datasolver.providers.mcp.tools.reducer import ReduceAvgTool
+from datasolver.providers.provider import DataProvider
+
+RFD = json.load(open(os.path.join(os.path.dirname(__file__), "..", "sample_rfd.json")))
+
+
+class Probe(DataProvider):
+    """Yields n records and remembers how much of the output file existed half-way."""
+
+    def __init__(self, n, path, fail_at=None):
+        super().__init__()
+        self.n, self.path, self.fail_at, self.seen_bytes = n, path, fail_at, None
+
+    def generate_dataset(self, rfd):
+        raise AssertionError("solve() must not materialize the dataset")
+
+    def iter_records(self, rfd):
+        for i in range(self.n):
+            if i == self.n // 2:
+                self.seen_bytes = os.path.getsize(self.path)
+            if i == self.fail_at:
+                raise RuntimeError("boom")
+            yield {"i": i, "pad": "x" * 64}
+
+
+def solver_with(provider):
+    s = DataSolver(ProviderType.MOCK, output_format="jsonl")
+    s.provider = provider
+    return s
+
+
+def test_solve_writes_while_records_are_produced(tmp_path, monkeypatch):
+    """
+    Why: Materializing {"data": [...]} made memory grow linearly with num_records.
+    How: The probe checks the output file half-way through generation; rows must already be on disk.
+    """
+    monkeypatch.chdir(tmp_path)
+    probe = Probe(20_000, "data/rfd_s_solution.jsonl")
+    path = solver_with(probe).solve({"rfd_id": "s"})
+
+    assert path == "data/rfd_s_solution.jsonl"
+    assert probe.seen_bytes > 0
+    assert sum(1 for _ in open(path)) == 20_000
+
+
+def test_failed_generation_leaves_no_partial_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert solver_with(Probe(5_000, "data/rfd_f_solution.jsonl", fail_at=4_000)).solve({"rfd_id": "f"}) is None
+    assert not os.path.exists("data/rfd_f_solution.jsonl")
+
+
+def test_mock_iter_records_is_lazy_and_matches_generate_dataset():
+    it = MockProvider(batch_size=100).iter_records({**RFD, "num_records": 10**9})
+    assert isinstance(it, types.GeneratorType)
+    batch = next(it)
+    assert len(batch) == 100 and set(batch[0]) == set(RFD["schema"]["properties"])
+    assert len(MockProvider().generate_dataset({**RFD, "num_records": 7})["data"]) == 7
+
+
+def test_mcp_client_streams_from_a_matching_tool():
+    client = MCPClient(tools=[ReduceAvgTool])
+    rfd = {"service": "reduce_avg", "records": [{"x": 1}, {"x": 3}]}
+    assert list(client.iter_records(rfd)) == [{"x": 2.0}]
+    assert client.generate_dataset(rfd) == {"data": [{"x": 2.0}]}
@@ -0,0 +1,133 @@
+# tests/test_submit_solution.py
+import pathlib, sqlite3, tempfile, threading, os
+from unittest.mock import MagicMock
+
+import pytest
+
+import reputation
+import submitSolution
+from submitSolution import GasPriceOracle, NonceManager, SolutionSubmitter, SubmissionQueue
+
+
+def setup_function():
+    reputation.DB_PATH = pathlib.Path(tempfile.gettempdir()) / "axintera_test_submit.db"
+    if reputation.DB_PATH.exists():
+        os.remove(reputation.DB_PATH)
+    reputation.init_db()
+
+
+def test_nonce_manager_reserves_unique_nonces_concurrently():
+    """
+    Why: Concurrent submissions used to race on get_transaction_count.
+    How: 8 threads × 50 reservations must yield 400 distinct consecutive nonces, one RPC call.
+    """
+    w3 = MagicMock()
+    w3.eth.get_transaction_count.return_value = 5
+    nm = NonceManager(w3, "0xabc")
+    got, lock = [], threading.Lock()
+
+    def worker():
+        for _ in range(50):
+            n = nm.reserve()
+            with lock:
+                got.append(n)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+
+    assert sorted(got) == list(range(5, 405))
+    assert w3.eth.get_transaction_count.call_count == 1
+
+
+def test_nonce_manager_resync_refetches():
+    w3 = MagicMock()
+    w3.eth.get_transaction_count.side_effect = [0, 7]
+    nm = NonceManager(w3, "0xabc")
+    assert [nm.reserve(), nm.reserve()] == [0, 1]
+    nm.resync()
+    assert nm.reserve() == 7
+
+
+def test_gas_oracle_caches_until_refresh():
+    w3 = MagicMock()
+    type(w3.eth).gas_price = property(lambda _: 42)
+    oracle = GasPriceOracle(w3, refresh=3600)
+    assert oracle.get() == 42
+    type(w3.eth).gas_price = property(lambda _: 99)
+    assert oracle.get() == 42
+    oracle.invalidate()
+    assert oracle.get() == 99
+
+
+def test_submission_queue_propagates_results_and_errors():
+    def send(raw):
+        if raw == b"bad":
+            raise ValueError("rejected")
+        return raw[::-1]
+
+    q = SubmissionQueue(send, senders=2)
+    ok, bad = q.put(b"abc"), q.put(b"bad")
+    assert ok.result(timeout=5) == b"cba"
+    with pytest.raises(ValueError):
+        bad.result(timeout=5)
+    q.close()
+
+
+@pytest.fixture
+def submitter(mocker, tmp_path, monkeypatch):
+    abi = tmp_path / "abi.json"
+    abi.write_text("[]")
+    monkeypatch.setenv("WEB3_RPC_URL", "http://127.0.0.1:8545")
+    monkeypatch.setenv("EXCHANGE_CONTRACT_ADDRESS", "0x" + "11" * 20)
+    monkeypatch.setenv("EXCHANGE_CONTRACT_ABI_PATH", str(abi))
+    monkeypatch.setenv("PRIVATE_KEY", "0x" + "01" * 32)
+    monkeypatch.setenv("RECEIPT_POLL_SECS", "3600")
+
+    w3 = MagicMock()
+    w3.is_connected.return_value = True
+    w3.eth.get_transaction_count.return_value = 3
+    w3.eth.gas_price = 10
+    w3.eth.account.sign_transaction.side_effect = lambda tx, pk: MagicMock(raw_transaction=bytes([tx["nonce"]]))
+    w3.eth.send_raw_transaction.side_effect = lambda raw: raw
+    w3.to_hex.side_effect = lambda b: "0x" + bytes(b).hex()
+    w3.eth.contract.return_value.functions.submitSolution.return_value.build_transaction.side_effect = dict
+    mocker.patch("submitSolution.Web3", return_value=w3)
+    return SolutionSubmitter(), w3
+
+
+def test_submit_cid_uses_local_nonce_and_cached_gas(submitter):
+    """
+    Why: Steady-state submission should cost one RPC round-trip (send_raw_transaction).
+    How: Three submissions → nonces 3,4,5 with a single get_transaction_count.
+    """
+    sub, w3 = submitter
+    hashes = [sub.submit_cid(i, f"ipfs://cid{i}") for i in range(3)]
+    assert hashes == ["0x03", "0x04", "0x05"]
+    assert w3.eth.get_transaction_count.call_count == 1
+    assert sub.tracker.pending() == 3
+
+
+def test_reputation_waits_for_receipt(submitter):
+    """
+    Why: A broadcast tx is not a delivered solution.
+    How: No stats row after broadcast; success recorded once the tracker sees status=1.
+    """
+    sub, w3 = submitter
+    sub.submit_cid(1, "ipfs://x")
+    assert reputation.all_scores() == []
+
+    sub.tracker.batch = False
+    w3.eth.get_transaction_receipt.return_value = {"status": 1}
+    sub.tracker.poll_once()
+    with sqlite3.connect(reputation.DB_PATH) as c:
+        assert c.execute("SELECT served, success FROM providerstat").fetchone() == (1, 1)
+
+
+def test_submit_cid_failure_resyncs_nonce(submitter):
+    sub, w3 = submitter
+    w3.eth.send_raw_transaction.side_effect = ValueError("nonce too low")
+    assert sub.submit_cid(1, "ipfs://x") is None
+    w3.eth.send_raw_transaction.side_effect = lambda raw: raw
+    assert sub.submit_cid(2, "ipfs://y") == "0x03"
+    assert w3.eth.get_transaction_count.call_count == 2
@@ -0,0 +1,92 @@
+# tests/test_text_generator.py
+import re
+
+import numpy as np
+import pytest
+
+from datasolver.providers.mcp.tools.text_generator import TextGeneratorTool
+from datasolver.textgen import MarkovChain, WORD_LISTS, _infer_template, compile_template, compile_text
+
+SCHEMA = {
+    "properties": {
+        "name":    {"type": "string"},
+        "email":   {"type": "string", "format": "email"},
+        "sku":     {"type": "string", "template": "{choice:AX|BX}-{digits:6}"},
+        "status":  {"type": "string", "enum": ["open", "closed"]},
+        "review":  {"type": "string", "description": "customer review text"},
+        "created": {"type": "string", "format": "date"},
+        "score":   {"type": "number"},
+    }
+}
+
+
+def test_records_follow_the_schema():
+    """
+    Why: Every string field came back as the same constant sentence.
+    How: each field kind (inferred name, format, template, enum, Markov text, date)
+         produces varied values of the right shape; non-string fields keep their defaults.
+    """
+    rows = TextGeneratorTool().generate({"schema": SCHEMA, "num_records": 500, "seed": 7})
+    assert len(rows) == 500
+
+    first, last = zip(*(r["name"].split(" ", 1) for r in rows))
+    assert set(first) <= set(WORD_LISTS["first_name"]) and set(last) <= set(WORD_LISTS["last_name"])
+    assert all(re.fullmatch(r"[A-Za-z]+\.[A-Za-z]+\d+@[a-z.]+", r["email"]) for r in rows)
+    assert all(re.fullmatch(r"(AX|BX)-\d{6}", r["sku"]) for r in rows)
+    assert {r["status"] for r in rows} == {"open", "closed"}
+    assert all(re.fullmatch(r"2024-\d\d-\d\d", r["created"]) for r in rows)
+    assert all(r["review"][0].isupper() and r["review"][-1] in ".!?" for r in rows)
+    assert len({r["review"] for r in rows}) > 400
+    assert {r["score"] for r in rows} == {0.0}
+
+
+def test_seeded_output_is_reproducible_across_workers():
+    rfd = {"schema": SCHEMA, "num_records": 1000, "seed": 3}
+    a = TextGeneratorTool().generate(rfd, workers=1)
+    b = TextGeneratorTool().generate(rfd, workers=2)
+    assert a == b
+    assert a != TextGeneratorTool().generate({**rfd, "seed": 4})
+
+
+@pytest.mark.parametrize("field, template", [
+    ("customer_review", "{sentence}"), ("user_feedback", "{sentence}"), ("author_bio", "{sentence}"),
+    ("width", "{adjective} {noun}"), ("video", "{adjective} {noun}"), ("identity", "{adjective} {noun}"),
+    ("hotel", "{adjective} {noun}"), ("ethnicity", "{adjective} {noun}"),
+    ("user_id", "{choice:AX|BX|CX|DX}-{digits:6}"), ("productCode", "{choice:AX|BX|CX|DX}-{digits:6}"),
+    ("firstName", "{first_name}"), ("customer_name", "{first_name} {last_name}"),
+    ("emailAddress", "{first_name}.{last_name}{int:1-999}@{domain}"), ("company_name", "{company}"),
+])
+def test_name_hints_match_whole_words_head_noun_first(field, template):
+    """
+    Why: Hints matched as substrings in list order: "width" became a SKU, "hotel" a phone
+         number, "customer_review" a person's name.
+    How: the name is split into words and the last word with a hint decides.
+    """
+    assert _infer_template(field, {}) == template
+
+
+def test_template_placeholders():
+    col = compile_template("{{id}} {int:5-6}/{index} {word}", {"words": ["x"]}, np.random.default_rng(0))
+    out = col(np.arange(10, 13))
+    assert [s.split(" ")[0] for s in out] == ["{id}"] * 3
+    assert [s.split(" ")[1].split("/")[1] for s in out] == ["10", "11", "12"]
+    assert all(s.endswith(" x") and s.split(" ")[1].split("/")[0] in ("5", "6") for s in out)
+
+    with pytest.raises(ValueError, match="Unknown placeholder"):
+        compile_template("{nope}", {}, np.random.default_rng(0))
+
+
+def test_markov_chain_stays_in_corpus():
+    corpus = "the cat sat on the mat. the dog sat on the log. a bird sang on the wire."
+    chain = MarkovChain(corpus, order=2)
+    bigrams = set(zip(corpus.split(), corpus.split()[1:]))
+    for sentence in chain.sample(np.random.default_rng(1), 200, min_words=4, max_words=12):
+        words = sentence.lower().split()
+        assert all(pair in bigrams for pair in zip(words, words[1:]))
+        assert 4 <= len(words) <= 12 and sentence.endswith(".")
+
+
+def test_max_length_and_word_lists():
+    col = compile_text({"type": "string", "words": ["alpha", "beta"], "maxLength": 8}, np.random.SeedSequence(0))
+    out = col(np.arange(200))
+    assert all(len(s) <= 8 and set(s.split()) <= {"alpha", "beta", "al", "alp", "alph", "b", "be", "bet"} for s in out)
@@ -0,0 +1,104 @@
+# tests/test_tool_contract.py
+import asyncio
+
+import pytest
+
+from datasolver.providers.mcp.client import MCPClient
+from datasolver.providers.mcp.router import RFDRouter
+from datasolver.providers.mcp.tools.tool import MCPTool, ToolAdapter, adapt_tool, as_records
+from datasolver.providers.mcp.tools.yield_matrix_tool import YieldMatrixTool
+
+POOLS = {"data": [
+    {"chain": "Ethereum", "symbol": "usdc", "project": "aave", "apy": 0.05, "tvlUsd": 3e6},
+    {"chain": "Ethereum", "symbol": "USDC", "project": "comp", "apy": 0.30, "tvlUsd": 1e6},
+    {"chain": "Arbitrum", "symbol": "USDC", "project": "gmx",  "apy": 0.10, "tvlUsd": 2e6},
+    {"chain": "Ethereum", "symbol": "WETH", "project": "lido", "apy": 0.10, "tvlUsd": 9e6},
+    {"chain": "Solana",   "symbol": "SOL",  "project": "jito", "apy": 0.08, "tvlUsd": 5e6},
+]}
+
+
+class LegacyTool:
+    """Pre-contract shape: capabilities is a method and generate_data returns an envelope."""
+    name = "legacy"
+
+    def capabilities(self):
+        return {"inputs": ["n"]}
+
+    def validate_rfd(self, rfd):
+        return rfd.get("service") == self.name
+
+    def generate_data(self, rfd):
+        return {"rows": [{"i": i} for i in range(rfd.get("n", 2))]}
+
+
+class ContractTool(MCPTool):
+    name = "contract"
+    description = "Implements only generate()"
+    capabilities = {}
+
+    def validate_rfd(self, rfd):
+        return rfd.get("service") == self.name
+
+    def generate(self, rfd, **kwargs):
+        return [{"n": rfd.get("n")}]
+
+
+def test_legacy_tools_are_adapted_to_the_contract():
+    """
+    Why: Tools disagreed on capabilities (property vs method) and on generate's return type.
+    How: a plain legacy object is wrapped; every entry point returns lists of records.
+    """
+    tool = adapt_tool(LegacyTool())
+    assert isinstance(tool, ToolAdapter)
+    assert tool.capabilities == {"inputs": ["n"]} and tool.cost({}) == 1.0
+    assert tool.generate({"n": 3}) == [{"i": 0}, {"i": 1}, {"i": 2}]
+    assert asyncio.run(tool.agenerate({"n": 1})) == [{"i": 0}]
+    assert tool.generate_batch([{"n": 1}, {"n": 0}]) == [[{"i": 0}], []]
+    assert list(tool.iter_records({})) == [{"i": 0}, {"i": 1}]
+
+    native = ContractTool()
+    assert adapt_tool(native) is native
+    assert native.generate_data({"n": 4}) == [{"n": 4}]
+    assert asyncio.run(native.agenerate({"n": 5})) == [{"n": 5}]
+
+
+def test_tool_must_implement_generate():
+    with pytest.raises(TypeError, match="must implement generate"):
+        class Empty(MCPTool):
+            name = description = "empty"
+            capabilities = {}
+
+            def validate_rfd(self, rfd):
+                return True
+
+
+def test_as_records():
+    assert as_records(None) == []
+    assert as_records({"data": [1]}) == [1] and as_records({"x": 1}) == [{"x": 1}]
+    assert as_records(iter([{"a": 1}])) == [{"a": 1}]
+
+
+def test_yield_matrix_returns_records_and_batches_on_one_snapshot(mocker):
+    """
+    Why: YieldMatrixTool.generate returned a dict, and every chain/asset combo refetched the pools.
+    How: generate returns the ranked rows; a parent RFD with three yield_matrix
+         dependencies fetches the snapshot once through generate_batch.
+    """
+    get = mocker.patch("datasolver.yield_matrix.get", return_value=POOLS)
+    tool = YieldMatrixTool()
+    assert tool.capabilities["service"] == "yield_matrix"
+
+    rows = tool.generate({"service": "yield_matrix", "chains": ["eth", "arb"], "assets": ["usdc"], "depth": "top_2"})
+    assert [(r["protocol"], r["rank"]) for r in rows] == [("comp", 1), ("gmx", 2)]
+    assert tool.generate_data({"service": "yield_matrix", "chains": ["sol"], "assets": ["SOL"]}) == \
+        {"rows": [{"protocol": "jito", "chain": "solana", "asset": "SOL", "apy": 8.0, "tvl": 5.0, "risk": "low", "rank": 1}]}
+    get.reset_mock()
+
+    router = RFDRouter(MCPClient(tools=[YieldMatrixTool, ContractTool]))
+    deps = [{"service": "yield_matrix", "chains": [c], "assets": [a]}
+            for c, a in (("eth", "usdc"), ("eth", "weth"), ("sol", "sol"))]
+    out = router.fulfil({"service": "contract", "n": 1, "dependencies": deps, "aggregation": "concat"})
+
+    assert get.call_count == 1
+    assert [r.get("protocol") for r in out["records"]] == ["comp", "aave", "lido", "jito", None]
+    assert out["records"][-1] == {"n": 1}
@@ -0,0 +1,90 @@
+# tests/test_worker_pool.py
+import threading, time
+
+from rfdWorkerPool import RFDWorkerPool, Stage
+
+
+def collect():
+    done, lock = {}, threading.Lock()
+    def on_done(rfd_id, result):
+        with lock:
+            done[rfd_id] = result
+    return done, on_done
+
+
+def test_slow_rfd_does_not_stall_the_rest():
+    """
+    Why: One slow process_rfd used to block ingestion of every later RFD.
+    How: 4 workers; a 0.5s RFD runs while 8 fast ones finish around it.
+    """
+    done, on_done = collect()
+    order = []
+
+    def work(rfd):
+        time.sleep(0.5 if rfd["rfd_id"] == "slow" else 0.01)
+        order.append(rfd["rfd_id"])
+        return {"rfd_id": rfd["rfd_id"]}
+
+    pool = RFDWorkerPool([Stage("generate", work, workers=4)], on_done=on_done, metrics_interval=0).start()
+    for rid in ["slow"] + [f"fast{i}" for i in range(8)]:
+        assert pool.submit({"rfd_id": rid})
+    pool.stop()
+
+    assert order[-1] == "slow"
+    assert len(done) == 9
+    m = pool.metrics()
+    assert m["completed"] == 9 and m["stages"]["generate"]["ok"] == 9
+
+
+def test_stages_chain_and_failures_stop_early():
+    done, on_done = collect()
+    stages = [
+        Stage("generate", lambda rfd: {"id": rfd["rfd_id"]} if rfd["rfd_id"] != "bad" else False, 2),
+        Stage("publish",  lambda r: {**r, "uri": f"ipfs://{r['id']}"}, 2),
+    ]
+    pool = RFDWorkerPool(stages, on_done=on_done, metrics_interval=0).start()
+    for rid in ("a", "bad", "b"):
+        pool.submit({"rfd_id": rid})
+    pool.stop()
+
+    assert done["a"] == {"id": "a", "uri": "ipfs://a"}
+    assert done["bad"] is None
+    assert pool.metrics()["stages"]["generate"]["failed"] == 1
+    assert pool.metrics()["stages"]["publish"]["ok"] == 2
+
+
+def test_deadline_drops_expired_rfds_between_stages():
+    done, on_done = collect()
+    stages = [Stage("generate", lambda rfd: (time.sleep(0.2), rfd)[1], 1),
+              Stage("submit",   lambda r: r, 1)]
+    pool = RFDWorkerPool(stages, deadline=0.1, on_done=on_done, metrics_interval=0).start()
+    pool.submit({"rfd_id": "late"})
+    pool.submit({"rfd_id": "roomy", "deadline_secs": 10})
+    pool.stop()
+
+    assert done["late"] is None
+    assert done["roomy"] == {"rfd_id": "roomy", "deadline_secs": 10}
+    assert pool.metrics()["stages"]["submit"]["expired"] >= 1
+
+
+def test_zero_deadline_is_a_deadline():
+    done, on_done = collect()
+    pool = RFDWorkerPool([Stage("generate", lambda rfd: rfd, 1)], deadline=10, on_done=on_done,
+                         metrics_interval=0).start()
+    pool.submit({"rfd_id": "zero", "deadline_secs": 0})
+    pool.stop()
+
+    assert done["zero"] is None
+    assert pool.metrics()["stages"]["generate"]["expired"] == 1
+
+
+def test_bounded_queue_applies_backpressure():
+    gate = threading.Event()
+    pool = RFDWorkerPool([Stage("generate", lambda r: gate.wait() or r, 1)],
+                         queue_size=1, metrics_interval=0).start()
+    assert pool.submit({"rfd_id": 1})
+    time.sleep(0.05)                         # worker picks #1 up and blocks
+    assert pool.submit({"rfd_id": 2})
+    assert pool.submit({"rfd_id": 3}, timeout=0.05) is False
+    gate.set()
+    pool.stop()
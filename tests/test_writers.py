@@ -0,0 +1,80 @@
+# tests/test_writers.py
+import gzip, json
+
+import pytest
+
+from datasolver import DataSolver
+from datasolver.writers import FORMATS, open_writer, resolve_format
+
+RECORDS = [{"id": i, "name": f"n{i}", "tags": ["a", "b"], "meta": {"ok": i % 2 == 0}} for i in range(25)]
+
+
+@pytest.mark.parametrize("records", [RECORDS, []])
+def test_json_writer_is_byte_identical_to_json_dump(tmp_path, records):
+    """
+    Why: Consumers of the historical pretty JSON output must not notice the streaming writer.
+    How: Write in small batches and compare to json.dump(indent=2) of the whole dataset.
+    """
+    with open_writer("json", str(tmp_path / "out")) as w:
+        w.write(records, batch_size=7)
+    assert (tmp_path / "out.json").read_text() == json.dumps({"data": records}, indent=2)
+
+
+def write(records, path_stem, fmt):
+    with open_writer(fmt, path_stem) as w:
+        w.write(records)
+    return w.path
+
+
+def test_jsonl_and_gzip_roundtrip(tmp_path):
+    plain = write(RECORDS, str(tmp_path / "a"), "jsonl")
+    gz    = write(RECORDS, str(tmp_path / "b"), "jsonl.gz")
+    assert [json.loads(l) for l in open(plain)] == RECORDS
+    assert [json.loads(l) for l in gzip.open(gz, "rt")] == RECORDS
+
+
+def test_zstd_roundtrip(tmp_path):
+    zstandard = pytest.importorskip("zstandard")
+    path = write(RECORDS, str(tmp_path / "z"), "jsonl.zst")
+    with open(path, "rb") as fh:
+        text = zstandard.ZstdDecompressor().stream_reader(fh).read().decode()
+    assert [json.loads(l) for l in text.splitlines()] == RECORDS
+
+
+def test_parquet_roundtrip(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    with open_writer("parquet", str(tmp_path / "p")) as w:
+        w.write(RECORDS, batch_size=10)               # several row groups, one schema
+    assert pq.read_table(w.path).to_pylist() == RECORDS
+
+
+def test_format_resolution(monkeypatch):
+    monkeypatch.delenv("DATASET_FORMAT", raising=False)
+    assert resolve_format({}) == "json"
+    assert resolve_format({}, "jsonl.gz") == "jsonl.gz"
+    monkeypatch.setenv("DATASET_FORMAT", "jsonl")
+    assert resolve_format({}) == "jsonl"
+    assert resolve_format({}, "jsonl.gz") == "jsonl"            # env beats the configured default
+    assert resolve_format({"output_format": "JSON"}, "jsonl.gz") == "json"
+    with pytest.raises(ValueError):
+        resolve_format({"output_format": "xml"})
+
+    monkeypatch.setattr(FORMATS["parquet"], "available", classmethod(lambda cls: False))
+    assert resolve_format({"output_format": "parquet"}) == "jsonl.gz"
+
+
+def test_from_env_agrees_with_resolve_format(tmp_path, monkeypatch):
+    """
+    Why: from_env applied $DATASET_FORMAT over the config while resolve_format put the
+         configured default first, so the two documented opposite precedences.
+    How: the config's output_format applies until $DATASET_FORMAT is set; an RFD's wins over both.
+    """
+    cfg = tmp_path / "config.json"
+    cfg.write_text(json.dumps({"provider_type": "mock", "output_format": "jsonl.gz"}))
+    monkeypatch.delenv("PROVIDER_TYPE", raising=False)
+    monkeypatch.delenv("DATASET_FORMAT", raising=False)
+    solver = DataSolver.from_env(str(cfg))
+    assert resolve_format({}, solver.output_format) == "jsonl.gz"
+    monkeypatch.setenv("DATASET_FORMAT", "jsonl")
+    assert resolve_format({}, DataSolver.from_env(str(cfg)).output_format) == "jsonl"
+    assert resolve_format({"output_format": "json"}, solver.output_format) == "json"